@@ -15,4 +15,9 @@ along with RADWave.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from .altiwave import waveAnalysis
+from .store import timeSeriesStore
+from .geodesy import geodesicDistance
+from .spatialindex import spaceTimeIndex
+from .tracks import trackCatalog
+from .stream import streamCollocator
 from . import documentation
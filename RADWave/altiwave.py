@@ -3,6 +3,7 @@
 # Copyright (c) 2020 Tristan Salles
 # Licensed under the GNU LGPL Version 3
 
+import os
 import re
 import math
 import time
@@ -10,7 +11,14 @@ import numpy as np
 import pandas as pd
 
 from functools import reduce
-from scipy.spatial import cKDTree as _cKDTree
+
+from .store import timeSeriesStore
+from . import geodesy
+from .geodesy import geodesicDistance
+from .spatialindex import spaceTimeIndex
+from .tracks import trackCatalog
+from .stream import streamCollocator
+from . import render
 
 # For readthedoc...
 try:
@@ -21,53 +29,15 @@ except ImportError:
     print("netCDF4 is required and needs to be installed via pip")
     pass
 
-# For readthedoc...
-try:
-    import cartopy
-    import cartopy.geodesic
-    import cartopy.crs as ccrs
-    import cartopy.feature as cfeature  
-    from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
-except ImportError:
-    print("cartopy is required and needs to be installed via pip")
-    pass
-
-# For readthedoc...
-try:
-    import pymannkendall as mk
-except ImportError:
-    print("pymannkendall is required and needs to be installed via pip")
-    pass
-
-# For readthedoc...
-try:
-    import seaborn as sns
-except ImportError:
-    print("seaborn is required and needs to be installed via pip")
-    pass
-
-# For readthedoc...
-try:
-    import shapely
-    from shapely.geometry.polygon import LinearRing
-except ImportError:
-    print("shapely is required and needs to be installed via pip")
-    pass
-
-# For readthedoc...
-try:
-    import geopy.distance
-except ImportError:
-    print("geopy is required and needs to be installed via pip")
-    pass
-
-import matplotlib.pyplot as plt
-from matplotlib.transforms import offset_copy
-from pandas.plotting import register_matplotlib_converters
+# Cartopy, seaborn, shapely, pymannkendall and matplotlib are imported by the
+# plotting functions, so that importing RADWave for the ingestion and the
+# analysis functions stays fast
 
-register_matplotlib_converters()
+# Maximum number of region masks cached for the in-memory time series
+_maxmasks = 32
 
-plt.rcParams["mathtext.fontset"] = "cm"
+# Number of rows of the on-disk time series store loaded at once
+_blocksize = 1000000
 
 
 class waveAnalysis(object):
@@ -152,6 +122,10 @@ class waveAnalysis(object):
 
         self.cyclone_data = None
         self.timeseries = None
+        self.tsstore = None
+        self.climatology = None
+        self.time_units = None
+        self.dtype = np.dtype(np.float64)
 
         if altimeterURL is not None:
             try:
@@ -252,7 +226,11 @@ class waveAnalysis(object):
         return getFiles
 
     def processAltimeterData(
-        self, max_qc=5, altimeter_pick="all", saveCSV="altimeterData.csv"
+        self,
+        max_qc=5,
+        altimeter_pick="all",
+        saveCSV="altimeterData.csv",
+        dtype="float64",
     ):
         """
         From the list of OPeNDAP data URL’s this function extracts the
@@ -281,6 +259,7 @@ class waveAnalysis(object):
             max_qc: maximum quality control flag that will be used for significant wave height [default: 5]
             altimeter_pick (list): list of satellites to use for the analysis as an example AODN portal provide the record from 10 satellites for altimeter data [default: 'all']
             saveCSV (str): filename used to save processed altimeter data obtained from the OPeNDAP web service [default: 'altimeterData.csv']
+            dtype (str): floating point precision of the loaded altimeter variables, 'float32' halves the memory footprint of long records [default: 'float64']
         """
 
         print("Processing Altimeter Dataset \n")
@@ -410,6 +389,7 @@ class waveAnalysis(object):
 
         if p > 0:
             self.saveCSV = saveCSV
+            combineframe = combineframe.sort_values(by=["time"], kind="mergesort")
             combineframe.to_csv(
                 str(self.saveCSV),
                 columns=["lat", "lon", "wh", "time", "ws"],
@@ -428,11 +408,7 @@ class waveAnalysis(object):
             data = altiData.sort_values(by=["time"])
             data = data.replace(r"^\s*$", np.nan, regex=True)
             data = data.dropna()
-            self.lat = np.asarray(data.values[:, 0], dtype=np.float64)
-            self.lon = np.asarray(data.values[:, 1], dtype=np.float64)
-            self.wh = np.asarray(data.values[:, 2], dtype=np.float64)
-            self.times = data.values[:, 3]
-            self.ws = np.asarray(data.values[:, 4], dtype=np.float64)
+            self._storeAltimeterData(data, dtype)
             print(
                 " \nProcessing altimeter dataset took: ",
                 int(time.process_time() - t0),
@@ -441,7 +417,7 @@ class waveAnalysis(object):
         else:
             print("No altimeter data found...")
 
-    def readAltimeterData(self, saveCSV=None):
+    def readAltimeterData(self, saveCSV=None, dtype="float64"):
         """
         In case where the *processAltimeterData* function has already been
         executed, one can load directly the processed data from the created CSV
@@ -449,6 +425,7 @@ class waveAnalysis(object):
 
         Args:
             saveCSV (str): filename used to save processed altimeter data obtained from the OPeNDAP web service [default: None]
+            dtype (str): floating point precision of the loaded altimeter variables, 'float32' halves the memory footprint of long records [default: 'float64']
         """
 
         if saveCSV is not None:
@@ -479,11 +456,30 @@ class waveAnalysis(object):
         data = data.replace(r"^\s*$", np.nan, regex=True)
         data = data.dropna()
 
-        self.lat = np.asarray(data.values[:, 0], dtype=np.float64)
-        self.lon = np.asarray(data.values[:, 1], dtype=np.float64)
-        self.wh = np.asarray(data.values[:, 2], dtype=np.float64)
-        self.times = data.values[:, 3]
-        self.ws = np.asarray(data.values[:, 4], dtype=np.float64)
+        self._storeAltimeterData(data, dtype)
+
+    def _storeAltimeterData(self, data, dtype="float64"):
+        """
+        Stores the processed altimeter variables as numpy arrays of the
+        requested precision.
+
+        The recorded time is always kept in double precision as it is
+        expressed in days since a reference date far in the past.
+
+        Args:
+            data (dataframe): processed altimeter data sorted by time with the columns *lat*, *lon*, *wh*, *time* & *ws*
+            dtype (str): floating point precision of the altimeter variables [default: 'float64']
+        """
+
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError("Error dtype needs to be either float32 or float64")
+
+        self.lat = np.asarray(data.iloc[:, 0], dtype=self.dtype)
+        self.lon = np.asarray(data.iloc[:, 1], dtype=self.dtype)
+        self.wh = np.asarray(data.iloc[:, 2], dtype=self.dtype)
+        self.times = np.asarray(data.iloc[:, 3], dtype=np.float64)
+        self.ws = np.asarray(data.iloc[:, 4], dtype=self.dtype)
 
     def plotCycloneTracks(
         self,
@@ -493,6 +489,9 @@ class waveAnalysis(object):
         extent=None,
         fsize=(12, 10),
         fsave=None,
+        resolution="10m",
+        basemap=True,
+        show=True,
     ):
         """
         This function **plots** and **saves** in a figure a specific cyclone
@@ -510,6 +509,9 @@ class waveAnalysis(object):
             extent (int): geographical extent of the figure following the convention [lon min,lon max,lat min,lat max]  [default: None]
             fsize : size of the image [default: (12,10)]
             fsave (str): saved image name without extension that will be written as a PNG file [default: None]
+            resolution (str): resolution of the coastlines ('10m', '50m' or '110m'), no land nor coastline are drawn when set to None [default: '10m']
+            basemap (bool): draw the land and coastlines from an image rendered once for each extent and resolution and reused by the following maps (see **render.basemap**) [default: True]
+            show (bool): show the figure and print information, when False the figure is only returned [default: True]
 
         Note:
             This function relies on **cartopy** and **matplotlib** libraries.
@@ -521,45 +523,36 @@ class waveAnalysis(object):
         Warning:
             The cyclone tracks contains the following variables *lon*,
             *lat* & *datetime*.
+
+        Returns:
+            fig (Figure): matplotlib figure (only when *show* is False)
+            ax (GeoAxes): map axes (only when *show* is False)
         """
 
+        import cartopy.crs as ccrs
+        from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
+        from matplotlib.transforms import offset_copy
+
+        plt = render.pyplot()
+
         # Initialize figure
         fig = plt.figure(figsize=fsize)
 
-        # Create a GeoAxes
-        ax = fig.add_subplot(1, 1, 1, projection=ccrs.PlateCarree())
-
-        # Limit the extent of the map to a small longitude/latitude range
+        # Create a GeoAxes limited to a small longitude/latitude range
         if extent is None:
-            ax.set_extent(
-                [self.lonmin, self.lonmax, self.latmin, self.latmax],
-                crs=ccrs.PlateCarree(),
-            )
-        else:
-            ax.set_extent(
-                [extent[0], extent[1], extent[2], extent[3]], crs=ccrs.PlateCarree()
-            )
-
-        # Add map elements
-        ax.set_facecolor(cfeature.COLORS['water'])
-        ax.add_feature(cfeature.LAND)
-        ax.coastlines(resolution="10m")
+            extent = [self.lonmin, self.lonmax, self.latmin, self.latmax]
+        ax = render.geoAxes(fig, extent, resolution, basemap)
 
         # Cyclone track
         clon = self.cyclone["lon"].to_numpy()
         clat = self.cyclone["lat"].to_numpy()
-        for k in range(len(clon) - 1):
-            plt.plot(
-                [clon[k], clon[k + 1]],
-                [clat[k], clat[k + 1]],
-                color="r",
-                linewidth=3,
-                alpha=0.5,
-                transform=ccrs.PlateCarree(),
-                zorder=1,
+        ax.add_collection(
+            render.trackCollection(
+                clon, clat, colors="r", linewidths=3, alpha=0.5, zorder=1
             )
+        )
 
-        plt.scatter(
+        ax.scatter(
             [clon],
             [clat],
             marker="o",
@@ -579,24 +572,22 @@ class waveAnalysis(object):
         cycloneday = self.cyclone["datetime"].dt.day
         cyclonemonth = self.cyclone["datetime"].dt.month
         cyclonehour = self.cyclone["datetime"].dt.hour
-        cyclonedate = []
-        for k in range(len(clon)):
-            cyclonedate.append(
-                str(cycloneday[k])
-                + "/"
-                + str(cyclonemonth[k])
-                + "\n "
-                + str(cyclonehour[k])
-                + "h"
-            )
+        cyclonedate = (
+            cycloneday.astype(str)
+            + "/"
+            + cyclonemonth.astype(str)
+            + "\n "
+            + cyclonehour.astype(str)
+            + "h"
+        ).to_numpy()
         ax.set_title(
             title
             + " records starting on the "
-            + str(cycloneday[0])
+            + str(cycloneday.iloc[0])
             + "/"
-            + str(cyclonemonth[0])
+            + str(cyclonemonth.iloc[0])
             + "/"
-            + str(cycloneyear[0])
+            + str(cycloneyear.iloc[0])
         )
 
         for k in range(3, len(clon), 4):
@@ -612,18 +603,18 @@ class waveAnalysis(object):
                 zorder=10,
             )
 
-            plt.scatter(
-                clon[k],
-                clat[k],
-                marker="o",
-                color="navy",
-                s=markersize,
-                edgecolor="black",
-                linewidth=0.5,
-                alpha=1,
-                transform=ccrs.PlateCarree(),
-                zorder=10,
-            )
+        ax.scatter(
+            clon[3::4],
+            clat[3::4],
+            marker="o",
+            color="navy",
+            s=markersize,
+            edgecolor="black",
+            linewidth=0.5,
+            alpha=1,
+            transform=ccrs.PlateCarree(),
+            zorder=10,
+        )
 
         gl = ax.gridlines(
             crs=ccrs.PlateCarree(),
@@ -638,10 +629,15 @@ class waveAnalysis(object):
         gl.xformatter = LONGITUDE_FORMATTER
         gl.yformatter = LATITUDE_FORMATTER
 
+        if fsave is not None:
+            fig.savefig(fsave, dpi=100)
+
+        if not show:
+            return fig, ax
+
         plt.show()
 
         if fsave is not None:
-            fig.savefig(fsave, dpi=100)
             print("Figure saved: ", fsave)
 
     def visualiseData(
@@ -653,6 +649,13 @@ class waveAnalysis(object):
         zoom=4,
         fsize=(12, 10),
         fsave=None,
+        resolution="10m",
+        basemap=True,
+        density=None,
+        threshold=100000,
+        colorby=None,
+        nx=400,
+        show=True,
     ):
         """
         This function **plots** and **saves** in a figure the geographical
@@ -660,6 +663,11 @@ class waveAnalysis(object):
         track has also been loaded during the initialisation phase of the
         waveAnalysis class, the cyclone path is also added to the figure.
 
+        For large datasets, the records are binned onto a grid of pixels
+        that is drawn as a single image (density mode), showing either the
+        number of records or the mean significant wave height of each
+        pixel.
+
         Args:
             title (str): title for the figure [default: "Altimeter data coordinates"]
             extent (int): geographical extent of the figure following the convention [lon min,lon max,lat min,lat max]  [default: None]
@@ -668,6 +676,13 @@ class waveAnalysis(object):
             zoom (int): given target zoom for the target domain background (must be a value >= 1) [default: 4]
             fsize : size of the image [default: (12,10)]
             fsave (str): saved image name without extension that will be written as a PNG file [default: None]
+            resolution (str): resolution of the coastlines ('10m', '50m' or '110m'), no land nor coastline are drawn when set to None [default: '10m']
+            basemap (bool): draw the land and coastlines from an image rendered once for each extent and resolution and reused by the following maps (see **render.basemap**) [default: True]
+            density (bool): draw the density of records instead of each record, by default the density mode is used when the number of records is above *threshold* [default: None]
+            threshold (int): number of records above which the density mode is used [default: 100000]
+            colorby (str): colour the pixels in density mode by the mean of a variable instead of the number of records, only 'wh' is available [default: None]
+            nx (int): number of pixels along the longitude in density mode [default: 400]
+            show (bool): show the figure and print information, when False the figure is only returned [default: True]
 
         Note:
             This function relies on **cartopy** and **matplotlib** libraries.
@@ -675,43 +690,66 @@ class waveAnalysis(object):
         Todo:
             There are some plotting problems for dataset spanning beyond the 180
             degree meridian that will need to be fixed.
+
+        Returns:
+            fig (Figure): matplotlib figure (only when *show* is False)
+            ax (GeoAxes): map axes (only when *show* is False)
         """
 
+        import cartopy.crs as ccrs
+        from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
+        from matplotlib.colors import LogNorm
+        from matplotlib.transforms import offset_copy
+        from shapely.geometry.polygon import LinearRing
+
+        plt = render.pyplot()
+
         # Initialize figure
         fig = plt.figure(figsize=fsize)
 
-        # Create a GeoAxes
-        ax = fig.add_subplot(1, 1, 1, projection=ccrs.PlateCarree())
-        
-        # Limit the extent of the map to a small longitude/latitude range
+        # Create a GeoAxes limited to a small longitude/latitude range
         if extent is None:
-            ax.set_extent(
-                [self.lonmin, self.lonmax, self.latmin, self.latmax],
-                crs=ccrs.PlateCarree(),
-            )
-        else:
-            ax.set_extent(
-                [extent[0], extent[1], extent[2], extent[3]], crs=ccrs.PlateCarree()
-            )
+            extent = [self.lonmin, self.lonmax, self.latmin, self.latmax]
+        ax = render.geoAxes(fig, extent, resolution, basemap)
 
         # Add map elements
         ax.set_title(title)
 
-        ax.set_facecolor(cfeature.COLORS['water'])
-        ax.add_feature(cfeature.LAND)
-        ax.coastlines(resolution="10m")
-
-        ax.scatter(
-            [self.lon],
-            [self.lat],
-            marker="o",
-            color="coral",
-            s=markersize,
-            edgecolor="black",
-            linewidth=0.5,
-            alpha=0.7,
-            transform=ccrs.PlateCarree(),
-        )
+        if density is None:
+            density = len(self.lon) > threshold
+        if density:
+            values = None
+            label = "Number of records"
+            if colorby == "wh":
+                values = self.wh
+                label = "Mean significant wave height (m)"
+            elif colorby is not None:
+                raise ValueError("Error colorby only accepts 'wh'")
+            grid = render.densityGrid(self.lon, self.lat, extent, nx, values)
+            img = ax.imshow(
+                grid,
+                origin="lower",
+                extent=[extent[0], extent[1], extent[2], extent[3]],
+                transform=ccrs.PlateCarree(),
+                cmap="viridis",
+                norm=LogNorm() if values is None else None,
+                interpolation="nearest",
+                zorder=2,
+            )
+            ax.set_extent(extent, crs=ccrs.PlateCarree())
+            fig.colorbar(img, ax=ax, shrink=0.6, pad=0.1, label=label)
+        else:
+            ax.scatter(
+                [self.lon],
+                [self.lat],
+                marker="o",
+                color="coral",
+                s=markersize,
+                edgecolor="black",
+                linewidth=0.5,
+                alpha=0.7,
+                transform=ccrs.PlateCarree(),
+            )
 
         # Use the cartopy interface to create a matplotlib transform object
         # for the Geodetic coordinate system.
@@ -722,16 +760,11 @@ class waveAnalysis(object):
         if self.cyclone is not None:
             clon = self.cyclone["lon"].to_numpy()
             clat = self.cyclone["lat"].to_numpy()
-            for k in range(len(clon) - 1):
-                plt.plot(
-                    [clon[k], clon[k + 1]],
-                    [clat[k], clat[k + 1]],
-                    color="navy",
-                    linewidth=3,
-                    alpha=1.0,
-                    transform=ccrs.PlateCarree(),
-                    zorder=1,
+            ax.add_collection(
+                render.trackCollection(
+                    clon, clat, colors="navy", linewidths=3, alpha=1.0, zorder=1
                 )
+            )
 
         # Add a marker for a given city.
         if addcity is not None:
@@ -790,10 +823,15 @@ class waveAnalysis(object):
         gl.xformatter = LONGITUDE_FORMATTER
         gl.yformatter = LATITUDE_FORMATTER
 
+        if fsave is not None:
+            fig.savefig(fsave, dpi=100)
+
+        if not show:
+            return fig, ax
+
         plt.show()
 
         if fsave is not None:
-            fig.savefig(fsave, dpi=100)
             print("Figure saved: ", fsave)
 
     def _waveAge(self, H, U, grav=9.80665):
@@ -923,7 +961,7 @@ class waveAnalysis(object):
 
         return P
 
-    def generateTimeSeries(self, days=30):
+    def generateTimeSeries(self, days=30, dtype=None, chunksize=None, storePath=None):
         """
         Time series of wave characteristics are obtained via both the
         significant wave height and wind speed parameters from the altimeter
@@ -938,25 +976,91 @@ class waveAnalysis(object):
             * wave average energy density (J/m2)  'energy' & 'energy_rolling'
             * wave group velocity (m/s)  'speed' & 'speed_rolling'
 
+        When the processed altimeter dataset does not fit in memory, the time
+        series can be generated **by chunks**: the processed CSV file is read
+        in time-ordered blocks of *chunksize* records, each block being
+        completed by the records of the previous one that still fall in the
+        moving average window. The resulting time series is written to an
+        on-disk columnar store (see **timeSeriesStore**) which is then used by
+        the *slice*, *plotTimeSeries*, *computeSeasonalCharacteristics* and
+        *computeClimatology* functions, the cyclone and station matching
+        functions needing the time series in memory.
+
         Args:
             days (int): moving average window for time series calculation [default: '30']
+            dtype (str): floating point precision of the time series, 'float32' also stores the *day*, *month* & *year* columns as small integers. When set to None the precision of the loaded altimeter data is used [default: None]
+            chunksize (int): number of processed altimeter records read at once, when set to None the altimeter data loaded in memory is used [default: None]
+            storePath (str): directory of the on-disk time series store used when *chunksize* is set, by default the name of the processed CSV file followed by '_timeseries' [default: None]
 
         Note:
             The class **waveAnalysis()** saves a pandas dataframe called
             **timeseries** that stores the wave time series
             for further analysis.
 
+        Warning:
+            To generate the time series by chunks, the processed CSV file
+            needs to be sorted by time, which is the case for files written
+            by the *processAltimeterData* function.
+
+        Returns:
+            timeseries (dataframe): pandas dataframe containing time series of wave characteristics (or the on-disk **timeSeriesStore** when *chunksize* is set)
+        """
+        if dtype is None:
+            dtype = self.dtype
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError("Error dtype needs to be either float32 or float64")
+
+        # Days averaged parameters.
+        self.days = int(days)
+
+        if chunksize is not None:
+            return self._generateTimeSeriesChunks(dtype, int(chunksize), storePath)
+
+        wavedf = self._waveFrame(
+            self.times,
+            np.asarray(self.wh, dtype=dtype),
+            np.asarray(self.ws, dtype=dtype),
+            np.asarray(self.lon, dtype=dtype),
+            np.asarray(self.lat, dtype=dtype),
+        )
+        self.T = wavedf["period"].to_numpy()
+        self.we = wavedf["energy"].to_numpy()
+        self.speed = wavedf["speed"].to_numpy()
+        self.power1 = wavedf["power"].to_numpy()
+
+        meanwave = wavedf.rolling(str(self.days) + "D", on="date", min_periods=1).mean()
+
+        self.wh_rolling = meanwave["wh"].astype(dtype)
+        self.period_rolling = meanwave["period"].astype(dtype)
+        self.power_rolling = meanwave["power"].astype(dtype)
+        self.speed_rolling = meanwave["speed"].astype(dtype)
+        self.energy_rolling = meanwave["energy"].astype(dtype)
+
+        self.timeseries = self._timeSeriesFrame(wavedf, meanwave, dtype)
+        self.tsstore = None
+
+        return self.timeseries
+
+    def _waveFrame(self, times, wh, ws, lon, lat):
+        """
+        Computes the wave parameters for a set of altimeter records.
+
+        Args:
+            times (numpy array): altimeter recorded time expressed in *time_units*
+            wh (numpy array): significant wave height in metres
+            ws (numpy array): surface wind speed in metres per second
+            lon (numpy array): altimeter longitudes
+            lat (numpy array): altimeter latitudes
+
         Returns:
-            timeseries (dataframe): pandas dataframe containing time series of wave characteristics
+            wavedf (dataframe): pandas dataframe containing the date and wave parameters of each record
         """
-        # Compute wave parameters
-        self.T = self.wavePeriod(self.wh, self.ws)
-        self.we = self.meanEnergy(self.wh)
-        self.speed = self.waveGroupVelocity(self.T)
-        self.power1 = self.waveEnergyFlux(self.wh, self.T)
+
+        period = self.wavePeriod(wh, ws)
 
         sort_time = netCDF4.num2date(
-            self.times.astype(float),
+            np.asarray(times, dtype=float),
             self.time_units,
             only_use_cftime_datetimes=False,
             only_use_python_datetimes=True,
@@ -964,285 +1068,715 @@ class waveAnalysis(object):
 
         wavedf = pd.DataFrame(
             data={
-                "date": sort_time,
-                "wh": self.wh,
-                "period": self.T,
-                "energy": self.we,
-                "speed": self.speed,
-                "power": self.power1,
-                "lon": self.lon,
-                "lat": self.lat,
+                "date": pd.to_datetime(sort_time),
+                "wh": wh,
+                "period": period,
+                "energy": self.meanEnergy(wh),
+                "speed": self.waveGroupVelocity(period),
+                "power": self.waveEnergyFlux(wh, period),
+                "lon": lon,
+                "lat": lat,
             }
         )
 
-        # Days averaged parameters.
-        self.days = int(days)
+        return wavedf
 
-        meanwave = wavedf.rolling(str(self.days) + "D", on="date", min_periods=1).mean()
+    def _timeSeriesFrame(self, wavedf, meanwave, dtype):
+        """
+        Assembles the time series dataframe from the instantaneous and moving
+        averaged wave parameters.
+
+        Args:
+            wavedf (dataframe): instantaneous wave parameters returned by *_waveFrame*
+            meanwave (dataframe): moving averaged wave parameters
+            dtype (numpy dtype): floating point precision of the time series
 
-        self.wh_rolling = meanwave["wh"]
-        self.period_rolling = meanwave["period"]
-        self.power_rolling = meanwave["power"]
-        self.speed_rolling = meanwave["speed"]
-        self.energy_rolling = meanwave["energy"]
+        Returns:
+            timeseries (dataframe): pandas dataframe indexed by date
+        """
 
-        self.timeseries = pd.DataFrame(
+        # The dataframe is indexed by date so that time intervals can be
+        # extracted by binary search (see the *slice* function)
+        timeseries = pd.DataFrame(
             data={
-                "date": sort_time,
-                "wh": self.wh,
-                "wh_rolling": self.wh_rolling,
-                "period": self.T,
-                "period_rolling": self.period_rolling,
-                "power": self.power1,
-                "power_rolling": self.power_rolling,
-                "energy": self.we,
-                "energy_rolling": self.energy_rolling,
-                "speed": self.speed,
-                "speed_rolling": self.speed_rolling,
-                "lat": self.lat,
-                "lon": self.lon,
-            }
+                "date": wavedf["date"].to_numpy(),
+                "wh": wavedf["wh"].to_numpy(),
+                "wh_rolling": meanwave["wh"].to_numpy(dtype=dtype),
+                "period": wavedf["period"].to_numpy(),
+                "period_rolling": meanwave["period"].to_numpy(dtype=dtype),
+                "power": wavedf["power"].to_numpy(),
+                "power_rolling": meanwave["power"].to_numpy(dtype=dtype),
+                "energy": wavedf["energy"].to_numpy(),
+                "energy_rolling": meanwave["energy"].to_numpy(dtype=dtype),
+                "speed": wavedf["speed"].to_numpy(),
+                "speed_rolling": meanwave["speed"].to_numpy(dtype=dtype),
+                "lat": wavedf["lat"].to_numpy(),
+                "lon": wavedf["lon"].to_numpy(),
+            },
+            index=pd.DatetimeIndex(wavedf["date"]),
         )
+        timeseries.index.name = None
+        if not timeseries.index.is_monotonic_increasing:
+            timeseries = timeseries.sort_index(kind="mergesort")
+
+        timeseries["day"] = timeseries["date"].dt.day
+        timeseries["month"] = timeseries["date"].dt.month
+        timeseries["year"] = timeseries["date"].dt.year
+        if dtype == np.float32:
+            timeseries = timeseries.astype(
+                {"day": np.int8, "month": np.int8, "year": np.int16}
+            )
 
-        self.timeseries["day"] = self.timeseries["date"].dt.day
-        self.timeseries["month"] = self.timeseries["date"].dt.month
-        self.timeseries["year"] = self.timeseries["date"].dt.year
-
-        return self.timeseries
+        return timeseries
 
-    def plotTimeSeries(self, time="all", series="H", fsize=(12, 5), fsave=None):
+    def _generateTimeSeriesChunks(self, dtype, chunksize, storePath=None):
         """
-        This function **plots** and **saves** in a figure a time series for a
-        specific parameter from the processed altimeter data.
-
-        The choices of time series to plot are:
+        Generates the time series by time-ordered blocks of the processed
+        altimeter CSV file and writes them to an on-disk store.
 
-            * 'H': for wave height,
-            * 'T': for wave period,
-            * 'P': for wave power,
-            * 'E': for wave energy, and
-            * 'Cg': for wave group velocity
+        Args:
+            dtype (numpy dtype): floating point precision of the time series
+            chunksize (int): number of processed altimeter records read at once
+            storePath (str): directory of the on-disk time series store [default: None]
 
-        It also provides the following information:
+        Returns:
+            tsstore (timeSeriesStore): on-disk store containing the time series
+        """
 
-            * Maximum parameter value
-            * Mean parameter value
-            * Median parameter value
-            * 95th percentile parameter value
+        if getattr(self, "saveCSV", None) is None:
+            raise ValueError(
+                "The time series is generated by chunks from the processed \
+                             altimeter data file which is not defined, you need \
+                             to run the **processAltimeterData()** or \
+                             **readAltimeterData()** function first."
+            )
 
-        Args:
-            time (list): extent of years to plot for plotting time series from 1995 to 2010 user will set 'time' to [1995,2010], to plot the entire record use the keyword 'all' [default: 'all']
-            series (str): name of the series to plot choices are: 'H', 'T', 'P', 'E' and 'Cg' [default: 'H']
-            fsize : size of the image [default: (12,5)]
-            fsave (str): saved image name without extension that will be written as a PNG file [default: None]
-        """
+        if self.time_units is None:
+            ncs = NetCDFFile(self.allURL[0][0])
+            self.time_units = ncs.variables["TIME"].units
 
-        if time == "all":
-            tmpdf = self.timeseries.copy()
-        else:
-            tmpdf = self.timeseries.copy()
-            tmpdf = tmpdf[
-                (tmpdf["date"].dt.year > time[0]) & (tmpdf["date"].dt.year < time[1])
-            ]
+        if storePath is None:
+            storePath = os.path.splitext(str(self.saveCSV))[0] + "_timeseries"
 
-        if series == "H":
-            fig, ax1 = plt.subplots(figsize=fsize)
-            ax1.plot(tmpdf.date, tmpdf.wh, color="lightgrey", label="wave height $H_s$")
-            ax1.plot(
-                tmpdf.date,
-                tmpdf.wh_rolling,
-                color="blue",
-                label=str(self.days) + "-Day Average $H_s$",
-            )
+        store = timeSeriesStore(storePath, mode="w", days=self.days)
+        window = pd.Timedelta(days=self.days)
+        overlap = None
+        lasttime = None
 
-            ax1.legend(
-                labels=["wave height $H_s$", str(self.days) + "-Day Average $H_s$"],
-                loc="upper left",
+        reader = pd.read_csv(
+            str(self.saveCSV),
+            sep=r"\s+",
+            engine="c",
+            header=0,
+            na_filter=False,
+            chunksize=chunksize,
+        )
+        for altiData in reader:
+            data = altiData.replace(r"^\s*$", np.nan, regex=True)
+            data = data.dropna()
+            if data.shape[0] == 0:
+                continue
+
+            times = np.asarray(data.iloc[:, 3], dtype=np.float64)
+            if np.any(np.diff(times) < 0) or (
+                lasttime is not None and times[0] < lasttime
+            ):
+                store.close()
+                raise ValueError(
+                    "The processed altimeter data file needs to be sorted \
+                                 by time to generate the time series by chunks."
+                )
+            lasttime = times[-1]
+
+            wavedf = self._waveFrame(
+                times,
+                np.asarray(data.iloc[:, 2], dtype=dtype),
+                np.asarray(data.iloc[:, 4], dtype=dtype),
+                np.asarray(data.iloc[:, 1], dtype=dtype),
+                np.asarray(data.iloc[:, 0], dtype=dtype),
             )
-            ax1.set_ylabel("H$_s$ (m)", style="italic", fontsize=12)
-
-            print("Max wave height: {:0.3f} m".format(max(tmpdf.wh)))
-            print("Mean wave height: {:0.3f} m".format(np.mean(tmpdf.wh)))
-            print("Median wave height: {:0.3f} m".format(np.median(tmpdf.wh)))
-            print(
-                "95th percentile wave height: {:0.3f} m".format(
-                    np.percentile(tmpdf.wh, 95)
+            nb = wavedf.shape[0]
+
+            # Previous records still inside the moving average window
+            if overlap is not None:
+                wavedf = pd.concat([overlap, wavedf], ignore_index=True)
+            meanwave = wavedf.rolling(
+                str(self.days) + "D", on="date", min_periods=1
+            ).mean()
+            store.append(
+                self._timeSeriesFrame(
+                    wavedf.iloc[-nb:], meanwave.iloc[-nb:], dtype
                 )
             )
 
-        elif series == "T":
-            fig, ax1 = plt.subplots(figsize=fsize)
-            ax1.plot(
-                tmpdf.date,
-                tmpdf.period,
-                color="lightgrey",
-                label="wave period T$_\mathit{z}$",
-            )
-            ax1.plot(
-                tmpdf.date,
-                tmpdf.period_rolling,
-                color="blue",
-                label=str(self.days) + "-Day Average $H_s$",
-            )
+            overlap = wavedf[wavedf["date"] > wavedf["date"].iloc[-1] - window]
 
-            ax1.legend(
-                labels=[
-                    "wave period T$_\mathit{z}$",
-                    str(self.days) + "-Day Average T$_\mathit{z}$",
-                ],
-                loc="upper left",
-            )
-            ax1.set_ylabel("T$_\mathit{z}$ (s)", style="italic", fontsize=12)
+        store.close()
+        self.timeseries = None
+        self.tsstore = store
 
-            print("Max wave period: {:0.3f} s".format(max(tmpdf.period)))
-            print("Mean wave period: {:0.3f} s".format(np.mean(tmpdf.period)))
-            print("Median wave period: {:0.3f} s".format(np.median(tmpdf.period)))
-            print(
-                "95th percentile wave period: {:0.3f} s".format(
-                    np.percentile(tmpdf.period, 95)
-                )
-            )
+        return self.tsstore
 
-        elif series == "P":
-            fig, ax1 = plt.subplots(figsize=fsize)
-            ax1.plot(tmpdf.date, tmpdf.power, color="lightgrey", label="wave power P")
-            ax1.plot(
-                tmpdf.date,
-                tmpdf.power_rolling,
-                color="blue",
-                label=str(self.days) + "-Day Average $\mathit{P}$",
-            )
+    def readTimeSeriesStore(self, storePath):
+        """
+        In case where the time series has already been generated by chunks,
+        one can open directly the on-disk time series store.
 
-            ax1.legend(
-                labels=[
-                    "wave power $\mathit{P}$",
-                    str(self.days) + "-Day Average $\mathit{P}$",
-                ],
-                loc="upper left",
-            )
-            ax1.set_ylabel("P (kW/m)", style="italic", fontsize=12)
+        Args:
+            storePath (str): directory of the on-disk time series store
 
-            print("Max wave power: {:0.3f} kW/m".format(max(tmpdf.power)))
-            print("Mean wave power: {:0.3f} kW/m".format(np.mean(tmpdf.power)))
-            print("Median wave power: {:0.3f} kW/m".format(np.median(tmpdf.power)))
-            print(
-                "95th percentile wave power: {:0.3f} kW/m".format(
-                    np.percentile(tmpdf.power, 95)
-                )
-            )
+        Returns:
+            tsstore (timeSeriesStore): on-disk store containing the time series
+        """
 
-        elif series == "Cg":
-            fig, ax1 = plt.subplots(figsize=fsize)
-            ax1.plot(
-                tmpdf.date,
-                tmpdf.speed,
-                color="lightgrey",
-                label="wave celerity $\mathit{C}$",
-            )
-            ax1.plot(
-                tmpdf.date,
-                tmpdf.speed_rolling,
-                color="blue",
-                label=str(self.days) + "-Day Average $\mathit{C}$",
-            )
+        self.tsstore = timeSeriesStore(storePath, mode="r")
+        self.days = self.tsstore.days
+        self.timeseries = None
 
-            ax1.legend(
-                labels=[
-                    "wave celerity $\mathit{C}$",
-                    str(self.days) + "-Day Average $\mathit{C}$",
-                ],
-                loc="upper left",
-            )
-            ax1.set_ylabel("C (m/s)", style="italic", fontsize=12)
+        return self.tsstore
 
-            print("Max wave celerity: {:0.3f} m/s".format(max(tmpdf.speed)))
-            print("Mean wave celerity: {:0.3f} m/s".format(np.mean(tmpdf.speed)))
-            print("Median wave celerity: {:0.3f} m/s".format(np.median(tmpdf.speed)))
-            print(
-                "95th percentile wave celerity: {:0.3f} m/s".format(
-                    np.percentile(tmpdf.speed, 95)
-                )
-            )
+    def slice(self, start=None, end=None, columns=None):
+        """
+        This function extracts the part of the **timeseries** dataframe
+        recorded between two dates.
 
-        elif series == "E":
-            fig, ax1 = plt.subplots(figsize=fsize)
-            ax1.plot(
-                tmpdf.date,
-                tmpdf.energy,
-                color="lightgrey",
-                label="wave energy $\mathit{E}$",
-            )
-            ax1.plot(
-                tmpdf.date,
-                tmpdf.energy_rolling,
-                color="blue",
-                label=str(self.days) + "-Day Average $\mathit{E}$",
-            )
+        As the dataframe is sorted and indexed by date, the bounds of the
+        interval are found by binary search and the returned dataframe is a
+        view of the original one (no copy and no scan of the entire record).
+        When the time series has been generated by chunks, only the requested
+        rows and columns are loaded from the on-disk store.
 
-            ax1.legend(
-                labels=[
-                    "wave energy $\mathit{E}$",
-                    str(self.days) + "-Day Average $\mathit{E}$",
-                ],
-                loc="upper left",
-            )
-            ax1.set_ylabel("E (J/m$^2$)", style="italic", fontsize=12)
+        Args:
+            start: first date to consider, any value understood by *pandas.Timestamp* such as '2005-01-01' (included) [default: None]
+            end: last date to consider, any value understood by *pandas.Timestamp* (excluded) [default: None]
+            columns (list): columns to extract, all columns are returned when set to None [default: None]
 
-            print("Max wave energy: {:0.3f} J/m2".format(max(tmpdf.energy)))
-            print("Mean wave energy: {:0.3f} J/m2".format(np.mean(tmpdf.energy)))
-            print("Median wave energy: {:0.3f} J/m2".format(np.median(tmpdf.energy)))
-            print(
-                "95th percentile wave energy: {:0.3f} J/m2".format(
-                    np.percentile(tmpdf.energy, 95)
-                )
-            )
+        Returns:
+            tmpdf (dataframe): pandas dataframe containing the time series for the chosen time interval
+        """
 
-        else:
+        if self.timeseries is None:
+            if self.tsstore is not None:
+                return self.tsstore.slice(start, end, columns)
             raise ValueError(
-                "Not recognised series... choices are H, P, T, \
-                             Cg, E"
+                "The time series dataframe does not exist, you \
+                              need to run the **generateTimeSeries()** function \
+                              first."
             )
 
-        ax1.set_xlim(min(tmpdf.date), max(tmpdf.date))
-        ax1.set_xlabel("Year", fontsize=12)
+        i0, i1 = self._bounds(start, end)
+        tmpdf = self.timeseries.iloc[i0:i1]
+        if columns is not None:
+            tmpdf = tmpdf[columns]
 
-        ax1.grid(True, linewidth=0.5, color="k", alpha=0.1, linestyle="-")
-        ax1.tick_params(labelcolor="k", labelsize="medium", width=3)
+        return tmpdf
 
-        plt.show()
+    def _bounds(self, start=None, end=None):
+        """
+        Finds by binary search the positions of the **timeseries** records
+        recorded between two dates.
 
-        if fsave is not None:
-            fig.savefig(fsave, dpi=100)
-            print("Figure saved: ", fsave)
+        Args:
+            start: first date to consider (included) [default: None]
+            end: last date to consider (excluded) [default: None]
 
-    def close2Track(self, radius=2.0, dtmax=6):
+        Returns:
+            i0 (int): position of the first record
+            i1 (int): position following the last record
         """
-        From all cyclone tracks, this function finds the closest processed
-        altimeter geographical locations that have been recorded in the
-        database.
-        In addition to their coordinates, the altimeter dataset has to be
-        recorded during a user defined time lapse close enough to the cyclone
-        path time at each position.
 
-        The recorded dataframe **cyclone_data** contains the
-        following variables:
+        index = self.timeseries.index
+        if start is None:
+            i0 = 0
+        else:
+            i0 = index.searchsorted(pd.Timestamp(start), side="left")
+        if end is None:
+            i1 = len(index)
+        else:
+            i1 = index.searchsorted(pd.Timestamp(end), side="left")
 
-            * altimeter significant wave height (m) 'wH'
-            * altimeter wave period (s)  'period'
-            * altimeter wave energy flux (kW/m)  'power'
-            * altimeter wave average energy density (J/m2)  'energy'
-            * altimeter wave group velocity (m/s)  'speed'
-            * distance between altimeter coordinates and cyclone path (km) 'dist'
-            * cyclone date (datetime)  'cdate'
-            * difference in time between recorded cyclone date and altimeter data for specific position (hours)  'hours'
-            * cyclone latitude position  'clat'
-            * cyclone longitude position  'clon'
-            * altimeter data latitude position  'lat'
-            * altimeter data longitude position  'lon'
+        return i0, max(i0, i1)
+
+    def _regionMask(self, lonlat):
+        """
+        Returns the mask of the **timeseries** records located inside a
+        geographical box. The masks are cached for each box until a new time
+        series is assigned, so that sweeping several regions over the same
+        time series only compares the coordinates once per region.
 
         Args:
-            radius (float): maximum radius distance in degree between cyclone position and altimeter data coordinates [default: '2.']
-            dtmax (float): maximum difference in time between recorded cyclone date and picked altimeter data (hours) [default: '6.']
+            lonlat (list): geographical box following the convention [lon min,lon max,lat min,lat max]
+
+        Returns:
+            mask (numpy array): boolean mask over all the records
+        """
+
+        key = tuple(float(x) for x in lonlat)
+        if key not in self._masks:
+            lon = self.timeseries["lon"].to_numpy()
+            lat = self.timeseries["lat"].to_numpy()
+            if len(self._masks) >= _maxmasks:
+                del self._masks[next(iter(self._masks))]
+            self._masks[key] = (
+                (lon >= key[0]) & (lon <= key[1]) & (lat >= key[2]) & (lat <= key[3])
+            )
+
+        return self._masks[key]
+
+    def plotTimeSeries(
+        self,
+        time="all",
+        series="H",
+        fsize=(12, 5),
+        fsave=None,
+        decimate="minmax",
+        npts=5000,
+        stats=False,
+        show=True,
+        lonlat=None,
+    ):
+        """
+        This function **plots** and **saves** in a figure a time series for a
+        specific parameter from the processed altimeter data.
+
+        The choices of time series to plot are:
+
+            * 'H': for wave height,
+            * 'T': for wave period,
+            * 'P': for wave power,
+            * 'E': for wave energy, and
+            * 'Cg': for wave group velocity
+
+        It also provides the following information:
+
+            * Maximum parameter value
+            * Mean parameter value
+            * Median parameter value
+            * 95th percentile parameter value
+
+        Long records are decimated before plotting so that each line holds at
+        most *npts* points, either with the *minmax* method (lowest and highest
+        value of regular buckets of points, which keeps every peak) or with
+        the *lttb* method (Largest-Triangle-Three-Buckets). The statistics are
+        always computed on the complete series.
+
+        When a geographical box is given, only the records located inside it
+        are plotted and their moving average is computed over the same
+        number of days as in *generateTimeSeries*.
+
+        Args:
+            time (list): extent of years to plot for plotting time series from 1995 to 2010 user will set 'time' to [1995,2010], to plot the entire record use the keyword 'all' [default: 'all']
+            series (str): name of the series to plot choices are: 'H', 'T', 'P', 'E' and 'Cg' [default: 'H']
+            fsize : size of the image [default: (12,5)]
+            fsave (str): saved image name without extension that will be written as a PNG file [default: None]
+            decimate (str): decimation method either 'minmax' or 'lttb', all points are plotted when set to None [default: 'minmax']
+            npts (int): maximum number of points plotted for each line [default: 5000]
+            stats (bool): when True the statistics are returned instead of printed [default: False]
+            show (bool): show the figure and print information, when False the figure is only returned [default: True]
+            lonlat (list): geographical extent of the records to plot following the convention [lon min,lon max,lat min,lat max], all records are used if set to None [default: None]
+
+        Returns:
+            fig (Figure): matplotlib figure (only when *show* is False)
+            ax (Axes): figure axes (only when *show* is False)
+            stats (dict): maximum, mean, median and 95th percentile of the series (only when *stats* is True)
+        """
+
+        plt = render.pyplot()
+
+        var = {
+            "H": ("wh", "wave height", "m", "$H_s$", "H$_s$ (m)"),
+            "T": (
+                "period",
+                "wave period",
+                "s",
+                r"T$_\mathit{z}$",
+                r"T$_\mathit{z}$ (s)",
+            ),
+            "P": ("power", "wave power", "kW/m", r"$\mathit{P}$", "P (kW/m)"),
+            "Cg": ("speed", "wave celerity", "m/s", r"$\mathit{C}$", "C (m/s)"),
+            "E": ("energy", "wave energy", "J/m2", r"$\mathit{E}$", "E (J/m$^2$)"),
+        }
+        if series not in var:
+            raise ValueError(
+                "Not recognised series... choices are H, P, T, \
+                             Cg, E"
+            )
+        key, name, unit, symbol, ylabel = var[series]
+        if self.timeseries is None and self.tsstore is None:
+            raise ValueError(
+                "The time series dataframe does not exist, you \
+                              need to run the **generateTimeSeries()** function \
+                              first."
+            )
+
+        start, end = None, None
+        if time != "all":
+            start = pd.Timestamp(time[0] + 1, 1, 1)
+            end = pd.Timestamp(time[1], 1, 1)
+
+        # Each block of records is decimated with its share of the points
+        nb = self._seriesCount(start, end, lonlat)
+        points = {key: ([], []), key + "_rolling": ([], [])}
+        for tdf in self._seriesBlocks(key, start, end, lonlat):
+            date = tdf["date"].to_numpy()
+            share = max(3, int(npts * len(tdf) / max(nb, 1)))
+            for column, (x, y) in points.items():
+                values = tdf[column].to_numpy()
+                ids = slice(None)
+                if decimate is not None:
+                    ids = render.decimate(date, values, share, decimate)
+                x.append(date[ids])
+                y.append(values[ids])
+
+        # Statistics of the complete series
+        summary = self._seriesSummary(key, start, end, lonlat)
+
+        labels = [name + " " + symbol, str(self.days) + "-Day Average " + symbol]
+        fig, ax1 = plt.subplots(figsize=fsize)
+        for (x, y), color, label in zip(points.values(), ["lightgrey", "blue"], labels):
+            date = np.concatenate(x)
+            ax1.plot(date, np.concatenate(y), color=color, label=label)
+
+        ax1.legend(labels=labels, loc="upper left")
+        ax1.set_ylabel(ylabel, style="italic", fontsize=12)
+
+        if show and not stats:
+            print("Max {}: {:0.3f} {}".format(name, summary["max"], unit))
+            print("Mean {}: {:0.3f} {}".format(name, summary["mean"], unit))
+            print("Median {}: {:0.3f} {}".format(name, summary["median"], unit))
+            print("95th percentile {}: {:0.3f} {}".format(name, summary["p95"], unit))
+
+        ax1.set_xlim(date.min(), date.max())
+        ax1.set_xlabel("Year", fontsize=12)
+
+        ax1.grid(True, linewidth=0.5, color="k", alpha=0.1, linestyle="-")
+        ax1.tick_params(labelcolor="k", labelsize="medium", width=3)
+
+        if fsave is not None:
+            fig.savefig(fsave, dpi=100)
+
+        if not show:
+            if stats:
+                return fig, ax1, summary
+            return fig, ax1
+
+        plt.show()
+
+        if fsave is not None:
+            print("Figure saved: ", fsave)
+
+        if stats:
+            return summary
+
+    def _seriesCount(self, start=None, end=None, lonlat=None):
+        """
+        Counts the records of the time series recorded between two dates and
+        located inside a geographical box.
+
+        Args:
+            start: first date to consider (included) [default: None]
+            end: last date to consider (excluded) [default: None]
+            lonlat (list): geographical extent following the convention [lon min,lon max,lat min,lat max], all records are counted if set to None [default: None]
+
+        Returns:
+            nb (int): number of records
+        """
+
+        if self.timeseries is not None:
+            i0, i1 = self._bounds(start, end)
+            if lonlat is None:
+                return i1 - i0
+            return int(self._regionMask(lonlat)[i0:i1].sum())
+
+        i0, i1 = self.tsstore._bounds(start, end)
+        if lonlat is None:
+            return i1 - i0
+        nb = 0
+        for tdf in self.tsstore.blocks(start, end, ["lon", "lat"], _blocksize):
+            nb += int(
+                (
+                    (tdf.lon >= lonlat[0])
+                    & (tdf.lon <= lonlat[1])
+                    & (tdf.lat >= lonlat[2])
+                    & (tdf.lat <= lonlat[3])
+                ).sum()
+            )
+
+        return nb
+
+    def _seriesBlocks(self, key, start=None, end=None, lonlat=None):
+        """
+        Iterates over the records of a wave parameter and of its moving
+        average recorded between two dates, by blocks when the time series is
+        read from an on-disk store.
+
+        When a geographical box is given, only the records located inside it
+        are kept and their moving average is computed over the same number of
+        days, the records of the previous block still inside the moving
+        average window being carried over.
+
+        Args:
+            key (str): name of the wave parameter
+            start: first date to consider (included) [default: None]
+            end: last date to consider (excluded) [default: None]
+            lonlat (list): geographical extent following the convention [lon min,lon max,lat min,lat max], all records are used if set to None [default: None]
+
+        Yields:
+            tdf (dataframe): pandas dataframe with the columns *date*, *key* & *key_rolling*
+        """
+
+        columns = ["date", key, key + "_rolling"]
+        if lonlat is not None:
+            columns = ["date", "lon", "lat", key]
+
+        if self.timeseries is not None:
+            blocks = [self.slice(start, end, columns)]
+        else:
+            blocks = self.tsstore.blocks(start, end, columns, _blocksize)
+
+        window = pd.Timedelta(days=self.days)
+        overlap = None
+        for tdf in blocks:
+            if lonlat is None:
+                yield tdf
+                continue
+
+            # Moving average of the records of the region only
+            tdf = tdf[
+                (tdf.lon >= lonlat[0])
+                & (tdf.lon <= lonlat[1])
+                & (tdf.lat >= lonlat[2])
+                & (tdf.lat <= lonlat[3])
+            ]
+            if tdf.shape[0] == 0:
+                continue
+            values = pd.Series(
+                tdf[key].to_numpy(dtype=np.float64),
+                index=pd.DatetimeIndex(tdf["date"]),
+            )
+            if overlap is not None:
+                values = pd.concat([overlap, values])
+            rolling = values.rolling(str(self.days) + "D", min_periods=1).mean()
+            overlap = values[values.index > values.index[-1] - window]
+            yield tdf.assign(**{key + "_rolling": rolling.to_numpy()[-len(tdf) :]})
+
+    def _seriesSummary(self, key, start=None, end=None, lonlat=None, nbins=4096):
+        """
+        Computes the maximum, mean, median and 95th percentile of a wave
+        parameter recorded between two dates.
+
+        The in-memory series is summarised directly. For an on-disk store the
+        percentiles are found exactly without loading the complete column:
+        the records are counted in *nbins* regular bins, and only the values
+        of the bins holding the required ranks are then loaded and sorted.
+
+        Args:
+            key (str): name of the wave parameter
+            start: first date to consider (included) [default: None]
+            end: last date to consider (excluded) [default: None]
+            lonlat (list): geographical extent following the convention [lon min,lon max,lat min,lat max], all records are used if set to None [default: None]
+            nbins (int): number of bins used to locate the percentiles in the store [default: 4096]
+
+        Returns:
+            summary (dict): maximum, mean, median and 95th percentile of the series
+        """
+
+        def values():
+            for tdf in self._seriesBlocks(key, start, end, lonlat):
+                yield tdf[key].to_numpy(dtype=np.float64)
+
+        if self.timeseries is not None:
+            i0, i1 = self._bounds(start, end)
+            data = self.timeseries[key].to_numpy()[i0:i1].astype(np.float64)
+            if lonlat is not None:
+                data = data[self._regionMask(lonlat)[i0:i1]]
+            if len(data) == 0:
+                raise ValueError("Error no altimeter records in the selection")
+            median, p95, vmax = np.percentile(data, [50, 95, 100])
+            return {"max": vmax, "mean": data.mean(), "median": median, "p95": p95}
+
+        # Number of records, extrema and sum
+        nb, total = 0, 0.0
+        vmin, vmax = np.inf, -np.inf
+        for data in values():
+            if len(data) > 0:
+                nb += len(data)
+                total += data.sum()
+                vmin = min(vmin, data.min())
+                vmax = max(vmax, data.max())
+        if nb == 0:
+            raise ValueError("Error no altimeter records in the selection")
+
+        # Ranks of the sorted values used by the linear interpolation
+        pos = (nb - 1) * np.array([0.5, 0.95])
+        ranks = np.unique(
+            np.concatenate([np.floor(pos), np.minimum(np.floor(pos) + 1, nb - 1)])
+        ).astype(np.int64)
+
+        def bins(data):
+            if vmax == vmin:
+                return np.zeros(len(data), dtype=np.int64)
+            ids = ((data - vmin) / (vmax - vmin) * nbins).astype(np.int64)
+            return np.minimum(ids, nbins - 1)
+
+        count = np.zeros(nbins, dtype=np.int64)
+        for data in values():
+            count += np.bincount(bins(data), minlength=nbins)
+        first = np.cumsum(count) - count
+        rbins = np.searchsorted(np.cumsum(count), ranks, side="right")
+
+        # Values of the bins holding the ranks
+        picked = {b: [] for b in np.unique(rbins)}
+        for data in values():
+            ids = bins(data)
+            for b in picked:
+                picked[b].append(data[ids == b])
+        picked = {b: np.sort(np.concatenate(v)) for b, v in picked.items()}
+        sorted_values = {r: picked[b][r - first[b]] for r, b in zip(ranks, rbins)}
+
+        quantiles = []
+        for p in pos:
+            k = int(np.floor(p))
+            k1 = min(k + 1, nb - 1)
+            quantiles.append(
+                sorted_values[k] + (p - k) * (sorted_values[k1] - sorted_values[k])
+            )
+
+        return {
+            "max": vmax,
+            "mean": total / nb,
+            "median": quantiles[0],
+            "p95": quantiles[1],
+        }
+
+    @property
+    def timeseries(self):
+        """
+        Pandas dataframe containing the wave time series (see
+        *generateTimeSeries*). Assigning a new dataframe discards the cached
+        spatiotemporal index and region masks.
+        """
+
+        return self._timeseries
+
+    @timeseries.setter
+    def timeseries(self, timeseries):
+
+        self._timeseries = timeseries
+        self._index = None
+        self._masks = {}
+
+    def _indexFile(self):
+        """
+        Returns the name of the file used to persist the spatiotemporal index
+        next to the processed altimeter data file.
+        """
+
+        if getattr(self, "saveCSV", None) is None:
+            raise ValueError(
+                "The spatiotemporal index is saved next to the processed \
+                             altimeter data file which is not defined."
+            )
+
+        return os.path.splitext(str(self.saveCSV))[0] + "_index.pkl"
+
+    def spatialIndex(self, persist=False):
+        """
+        This function returns the spatiotemporal index of the altimeter
+        records of the **timeseries** dataframe used to find the records close
+        to cyclone tracks (see **spaceTimeIndex**).
+
+        The index and its KD-trees are cached on the class and reused by
+        subsequent calls (for example when sweeping over several *radius* and
+        *dtmax* values) until a new time series is generated.
+
+        Args:
+            persist (bool): load the index saved next to the processed altimeter data file when it matches the current time series [default: False]
+
+        Returns:
+            index (spaceTimeIndex): spatiotemporal index of the altimeter records
+        """
+
+        if self.timeseries is None:
+            if self.tsstore is not None:
+                raise ValueError(
+                    "The time series is held in an on-disk store, the \
+                                 spatiotemporal index needs the **timeseries** \
+                                 dataframe in memory: run the \
+                                 **generateTimeSeries()** function without \
+                                 chunksize first."
+                )
+            raise ValueError(
+                "The time series dataframe does not exist, you \
+                              need to run the **generateTimeSeries()** function \
+                              first."
+            )
+
+        if self._index is None:
+            index = spaceTimeIndex(
+                self.timeseries["lon"].to_numpy(),
+                self.timeseries["lat"].to_numpy(),
+                self.timeseries["date"].to_numpy(),
+            )
+            if persist and os.path.isfile(self._indexFile()):
+                saved = spaceTimeIndex.load(self._indexFile(), index.fingerprint)
+                if saved is not None:
+                    index = saved
+            self._index = index
+
+        return self._index
+
+    def close2Track(
+        self, radius=2.0, dtmax=6, radius_km=None, persist=False, interpolate=False
+    ):
+        """
+        From all cyclone tracks, this function finds the closest processed
+        altimeter geographical locations that have been recorded in the
+        database.
+        In addition to their coordinates, the altimeter dataset has to be
+        recorded during a user defined time lapse close enough to the cyclone
+        path time at each position.
+
+        The recorded dataframe **cyclone_data** contains the
+        following variables:
+
+            * altimeter significant wave height (m) 'wH'
+            * altimeter wave period (s)  'period'
+            * altimeter wave energy flux (kW/m)  'power'
+            * altimeter wave average energy density (J/m2)  'energy'
+            * altimeter wave group velocity (m/s)  'speed'
+            * distance between altimeter coordinates and cyclone path (km) 'dist'
+            * cyclone date (datetime)  'cdate'
+            * difference in time between recorded cyclone date and altimeter data for specific position (hours)  'hours'
+            * cyclone latitude position  'clat'
+            * cyclone longitude position  'clon'
+            * altimeter data latitude position  'lat'
+            * altimeter data longitude position  'lon'
+
+        Args:
+            radius (float): maximum radius distance in degree between cyclone position and altimeter data coordinates [default: '2.']
+            dtmax (float): maximum difference in time between recorded cyclone date and picked altimeter data (hours) [default: '6.']
+            radius_km (float): maximum great-circle distance in kilometres between cyclone position and altimeter data coordinates, when set *radius* is not used [default: None]
+            persist (bool): save the spatiotemporal index next to the processed altimeter data file so that it can be reused in later sessions (see *spatialIndex*) [default: False]
+            interpolate (bool): compare each altimeter record to the storm centre interpolated at the record time instead of the listed cyclone positions [default: False]
+
+        Note:
+            With *interpolate*, the storm centre is interpolated along the
+            great circle joining the two cyclone positions that bracket the
+            altimeter record time, and *dtmax* is not used. Records outside
+            the time span of the track are not considered. The dataframe
+            then gives the interpolated centre in 'clon' & 'clat', the
+            record time in 'date', the difference in time with the closest
+            listed position in 'hours' and the bearing (degrees clockwise
+            from north) of the record from the storm centre in 'bearing'.
+            As the storm-relative distance no longer includes the motion of
+            the storm during *dtmax*, much smaller radii can be used.
+
+        Note:
+            Searching with *radius_km* is performed on cartesian coordinates
+            on the unit sphere, which avoids the distortion of degree radii
+            at high latitudes and handles tracks crossing the 180 degree
+            meridian.
 
         Note:
             The class **waveAnalysis()** saves a pandas dataframe called
@@ -1250,7 +1784,683 @@ class waveAnalysis(object):
             path coordinates for further analysis.
 
         Returns:
-            cycdata (dataframe): pandas dataframe containing cyclone track information
+            cycdata (dataframe): pandas dataframe containing cyclone track information
+        """
+
+        if self.cyclone is None:
+            raise ValueError(
+                "There is no cyclone path loaded in the class, \
+                             this needs to be done during the class \
+                             initialisation..."
+            )
+
+        self.cyclone_data, cid = self._matchTrack(
+            self.cyclone, radius, dtmax, radius_km, persist, interpolate=interpolate
+        )
+
+        return self.cyclone_data
+
+    def _matchTrack(
+        self,
+        track,
+        radius,
+        dtmax,
+        radius_km,
+        persist,
+        workers=1,
+        interpolate=False,
+        storms=None,
+    ):
+        """
+        Finds the altimeter records close in space and time to each position
+        of a track.
+
+        Args:
+            track (dataframe): track positions with the columns *lon*, *lat* & *datetime*
+            radius (float): maximum radius distance in degree
+            dtmax (float): maximum difference in time (hours)
+            radius_km (float): maximum great-circle distance in kilometres, when set *radius* is not used
+            persist (bool): save the spatiotemporal index next to the processed altimeter data file
+            workers (int): number of threads used to query the spatiotemporal index [default: 1]
+            interpolate (bool): interpolate the track positions to the altimeter record times [default: False]
+            storms (numpy array): storm identifier of each position, consecutive positions are only interpolated within a storm [default: None]
+
+        Returns:
+            cycdata (dataframe): pandas dataframe containing the matched altimeter records
+            cid (numpy array): index of the track position (or of the first position of the interpolated segment) of each matched record
+        """
+
+        # Get cyclone positions
+        cXY = np.zeros((track.shape[0], 2))
+        cXY[:, 0] = track["lon"].to_numpy()
+        cXY[:, 1] = track["lat"].to_numpy()
+        cdate = track["datetime"]
+        if cdate.dt.tz is not None:
+            cdate = cdate.dt.tz_convert(None)
+
+        # Search for altimeter points close to cyclone track in space and time
+        index = self.spatialIndex(persist=persist)
+        if interpolate:
+            cid, aid, dhours, cXY, cbearing = self._interpolateTrack(
+                index, cXY, cdate.to_numpy(), radius, radius_km, workers, storms
+            )
+        else:
+            cid, aid, dhours = index.query(
+                cXY[:, 0],
+                cXY[:, 1],
+                cdate.to_numpy(),
+                radius=radius,
+                dtmax=dtmax,
+                radius_km=radius_km,
+                workers=workers,
+            )
+            cXY = cXY[cid]
+        if persist and index.modified:
+            index.save(self._indexFile())
+
+        alat = self.timeseries["lat"].to_numpy()[aid]
+        alon = self.timeseries["lon"].to_numpy()[aid]
+        dist = geodesicDistance(cXY[:, 0], cXY[:, 1], alon, alat)
+        if interpolate:
+            date = pd.Series(self.timeseries["date"].to_numpy()[aid])
+            tz = track["datetime"].dt.tz
+            if tz is not None:
+                date = date.dt.tz_localize("UTC").dt.tz_convert(tz)
+        else:
+            date = track["datetime"].iloc[cid].reset_index(drop=True)
+
+        data = {
+            "period": self.timeseries["period"].to_numpy()[aid],
+            "speed": self.timeseries["speed"].to_numpy()[aid],
+            "power": self.timeseries["power"].to_numpy()[aid],
+            "energy": self.timeseries["energy"].to_numpy()[aid],
+            "dist": np.round(dist, 3),
+            "date": date,
+            "wH": self.timeseries["wh"].to_numpy()[aid],
+            "lon": alon,
+            "lat": alat,
+            "clon": cXY[:, 0],
+            "clat": cXY[:, 1],
+            "hours": np.round(dhours, 3),
+        }
+        if interpolate:
+            data["bearing"] = np.round(cbearing, 3)
+
+        return pd.DataFrame(data), cid
+
+    def _interpolateTrack(self, index, cXY, cdate, radius, radius_km, workers, storms):
+        """
+        Finds the altimeter records close to the storm centre interpolated at
+        the time of each record.
+
+        Each altimeter record recorded between two consecutive positions is
+        attached to the segment joining them. The records that can be close
+        to a segment are first retrieved from the spatiotemporal index around
+        its middle, with half the segment duration as time window and the
+        radius enlarged by half the segment length, the segments being
+        searched by groups of similar duration and length. The storm centre
+        is then interpolated along the great circle to each candidate record
+        time and the exact radius criterion is applied.
+
+        Args:
+            index (spaceTimeIndex): spatiotemporal index of the altimeter records
+            cXY (numpy array): track positions (lon, lat)
+            cdate (numpy array): track dates as numpy datetime64 values (sorted within each storm)
+            radius (float): maximum radius distance in degree
+            radius_km (float): maximum great-circle distance in kilometres, when set *radius* is not used
+            workers (int): number of threads used to query the spatiotemporal index
+            storms (numpy array): storm identifier of each position
+
+        Returns:
+            cid (numpy array): index of the first position of the segment of each matched record
+            aid (numpy array): indices of the matched altimeter records
+            dhours (numpy array): altimeter time minus closest position time (hours)
+            cXY (numpy array): interpolated storm centre (lon, lat) of each matched record
+            cbearing (numpy array): bearing of each matched record from the storm centre (degrees)
+        """
+
+        nb = cXY.shape[0]
+        cns = cdate.astype("datetime64[ns]").astype(np.int64)
+        nxt = np.minimum(np.arange(nb) + 1, nb - 1)
+        last = nxt == np.arange(nb)
+        if storms is not None:
+            storms = np.asarray(storms)
+            last |= storms[nxt] != storms
+        seg = np.flatnonzero(~last)
+        nxt = nxt[seg]
+        seghours = (cns[nxt] - cns[seg]) / 3.6e12
+        seglen = geodesy.haversine(cXY[seg, 0], cXY[seg, 1], cXY[nxt, 0], cXY[nxt, 1])
+
+        # Candidate records around the middle of each segment
+        if radius_km is None:
+            search_km = np.radians(radius) * geodesy.EARTH_RADIUS
+        else:
+            search_km = radius_km
+        mlon, mlat = geodesy.greatCircle(
+            cXY[seg, 0], cXY[seg, 1], cXY[nxt, 0], cXY[nxt, 1], 0.5
+        )
+        mdate = (cns[seg] + (cns[nxt] - cns[seg]) // 2).astype("datetime64[ns]")
+
+        # Segments are grouped by duration and by 25 km length classes, each
+        # group being searched with its own half-duration and half-length
+        lclass = np.ceil(seglen / 25.0)
+        groups = np.unique(np.column_stack([seghours, lclass]), axis=0)
+        qids, aids, dhs = [], [], []
+        candidates = 0
+        for hours, length in groups:
+            ids = np.flatnonzero((seghours == hours) & (lclass == length))
+            qid, aid, dh = index.query(
+                mlon[ids],
+                mlat[ids],
+                mdate[ids],
+                dtmax=0.5 * hours + 1.0e-6,
+                radius_km=1.000001 * (search_km + 0.5 * 25.0 * length),
+                workers=workers,
+            )
+            candidates += index.candidates
+            qids.append(ids[qid])
+            aids.append(aid)
+            dhs.append(dh)
+        index.candidates = candidates
+        qid = np.concatenate(qids + [np.zeros(0, dtype=np.int64)])
+        aid = np.concatenate(aids + [np.zeros(0, dtype=np.int64)])
+        dhours = np.concatenate(dhs + [np.zeros(0)])
+
+        # Records recorded during each segment, the last position of a storm
+        # being included in its last segment
+        dt = seghours[qid]
+        dhours = dhours + (mdate[qid] - cdate[seg[qid]]) / np.timedelta64(1, "h")
+        end = last[nxt[qid]]
+        inseg = (dhours >= 0.0) & ((dhours < dt) | (end & (dhours <= dt)))
+        cid = seg[qid[inseg]]
+        nid = nxt[qid[inseg]]
+        aid = aid[inseg]
+        dhours = dhours[inseg]
+        dt = dt[inseg]
+
+        # Storm centre at the altimeter record time
+        frac = np.where(dt > 0.0, dhours / np.maximum(dt, 1.0e-12), 0.0)
+        clon, clat = geodesy.greatCircle(
+            cXY[cid, 0], cXY[cid, 1], cXY[nid, 0], cXY[nid, 1], frac
+        )
+        alon = self.timeseries["lon"].to_numpy()[aid]
+        alat = self.timeseries["lat"].to_numpy()[aid]
+        if radius_km is None:
+            dlon = np.mod(alon - clon + 180.0, 360.0) - 180.0
+            inside = np.hypot(dlon, alat - clat) <= radius
+        else:
+            inside = geodesy.haversine(clon, clat, alon, alat) <= radius_km
+        cid = cid[inside]
+        aid = aid[inside]
+        dhours = dhours[inside]
+        dhours = np.where(dhours > 0.5 * dt[inside], dhours - dt[inside], dhours)
+        clon = clon[inside]
+        clat = clat[inside]
+        cbearing = geodesy.bearing(clon, clat, alon[inside], alat[inside])
+
+        return cid, aid, dhours, np.column_stack([clon, clat]), cbearing
+
+    def readCycloneCatalog(self, catalogCSV, stormid="sid", columns=None):
+        """
+        This function loads a catalog of cyclone tracks containing several
+        storms (such as IBTrACS) that can then be matched at once against the
+        altimeter dataset with the *matchCatalog* function.
+
+        The tracks are stored in a compact **trackCatalog** structure that
+        can be queried by storm name, year or bounding box, and saved in
+        binary form with its *save* function. Loading the saved '.npz' file
+        instead of the csv file avoids parsing the catalog again.
+
+        Args:
+            catalogCSV (str): path of the csv file containing the cyclone tracks with in the header a storm identifier column and the following names *lon*, *lat* & *datetime* (optionally *pressure* & *name*), or of a catalog saved in '.npz' format
+            stormid (str): name of the column identifying each storm [default: 'sid']
+            columns (dict): renaming of the catalog columns to the expected names, for IBTrACS: {'SID': 'sid', 'NAME': 'name', 'LON': 'lon', 'LAT': 'lat', 'ISO_TIME': 'datetime', 'WMO_PRES': 'pressure'} [default: None]
+
+        Note:
+            Rows with a date that cannot be parsed (such as the units line of
+            IBTrACS files) are discarded. Dates with a time zone are
+            converted to UTC.
+
+        Returns:
+            catalog (trackCatalog): cyclone tracks sorted by storm and date
+        """
+
+        self.stormid = stormid
+        if str(catalogCSV).endswith(".npz"):
+            self.catalog = trackCatalog.load(catalogCSV)
+            return self.catalog
+
+        try:
+            with open(str(catalogCSV)) as file:
+                pass
+        except IOError as e:
+            print("Unable to open file ", str(catalogCSV))
+
+        catalog = pd.read_csv(
+            str(catalogCSV),
+            sep=r",",
+            engine="c",
+            header=0,
+            na_filter=False,
+            low_memory=False,
+        )
+        if columns is not None:
+            catalog = catalog.rename(columns=columns)
+        column_list = (stormid, "lat", "lon", "datetime")
+        for col in column_list:
+            if col not in catalog.columns:
+                raise ValueError(
+                    "Columns "
+                    + stormid
+                    + ", lat, lon and datetime are \
+                                     required in the cyclone catalog file"
+                )
+
+        self.catalog = trackCatalog.fromFrame(catalog, stormid)
+
+        return self.catalog
+
+    def selectStorm(self, storm):
+        """
+        This function sets the track of one storm of the catalog loaded with
+        *readCycloneCatalog* as the cyclone path used by the *close2Track*,
+        *plotCycloneTracks* and *plotCycloneAltiPoint* functions.
+
+        Args:
+            storm (str): storm identifier
+
+        Returns:
+            cyclone (dataframe): pandas dataframe containing the storm track
+        """
+
+        if getattr(self, "catalog", None) is None:
+            raise ValueError(
+                "There is no cyclone catalog loaded in the class, \
+                             you need to run the readCycloneCatalog() \
+                             function before."
+            )
+
+        self.cyclone = self.catalog.track(storm)
+
+        return self.cyclone
+
+    def matchCatalog(
+        self,
+        radius=2.0,
+        dtmax=6,
+        radius_km=None,
+        nprocs=1,
+        storms=None,
+        interpolate=False,
+    ):
+        """
+        This function performs the *close2Track* search for all the storms of
+        the catalog loaded with *readCycloneCatalog*.
+
+        All the positions of the catalog are queried at once against the
+        spatiotemporal index shared by all storms, the index query can be
+        distributed over several threads.
+
+        The recorded dataframe **catalog_data** contains the same variables
+        as the **cyclone_data** dataframe (see *close2Track*) and a first
+        column with the storm identifier.
+
+        Args:
+            radius (float): maximum radius distance in degree between cyclone position and altimeter data coordinates [default: '2.']
+            dtmax (float): maximum difference in time between recorded cyclone date and picked altimeter data (hours) [default: '6.']
+            radius_km (float): maximum great-circle distance in kilometres between cyclone position and altimeter data coordinates, when set *radius* is not used [default: None]
+            nprocs (int): number of threads used to query the spatiotemporal index, -1 uses all processors [default: 1]
+            storms (list): identifiers of the storms to match, such as returned by the *byName*, *byYear* or *byBox* functions of the catalog, all storms are used when set to None [default: None]
+            interpolate (bool): compare each altimeter record to the storm centre interpolated at the record time (see *close2Track*) [default: False]
+
+        Returns:
+            catdata (dataframe): pandas dataframe in long format containing the altimeter records matched to each storm
+        """
+
+        if getattr(self, "catalog", None) is None:
+            raise ValueError(
+                "There is no cyclone catalog loaded in the class, \
+                             you need to run the readCycloneCatalog() \
+                             function before."
+            )
+
+        track = self.catalog.frame(storms, self.stormid)
+        catdata, cid = self._matchTrack(
+            track,
+            radius,
+            dtmax,
+            radius_km,
+            False,
+            workers=nprocs,
+            interpolate=interpolate,
+            storms=track[self.stormid].to_numpy(),
+        )
+        catdata.insert(0, self.stormid, track[self.stormid].to_numpy()[cid])
+        self.catalog_data = catdata
+
+        return self.catalog_data
+
+    def stormComposite(
+        self, data=None, variable="wH", rmax=500.0, dr=50.0, nsectors=4, by=None
+    ):
+        """
+        This function builds a storm-relative composite of the altimeter
+        records matched to cyclone tracks, by binning the records on a polar
+        grid centred on the storm eye (distance and bearing from the storm
+        centre).
+
+        The bins are accumulated at once for all records (and storms), so
+        that composites of millions of matches can be computed.
+
+        Args:
+            data (dataframe): matched records returned by *close2Track* or *matchCatalog*, by default the **cyclone_data** dataframe is used [default: None]
+            variable (str): name of the variable to composite [default: 'wH']
+            rmax (float): maximum distance from the storm centre (km) [default: 500.]
+            dr (float): width of the radial bins (km) [default: 50.]
+            nsectors (int): number of bearing sectors starting from the north and going clockwise (4 for quadrants) [default: 4]
+            by (str): column identifying each storm (such as 'sid' for *catalog_data*), a composite is then computed for each storm [default: None]
+
+        Note:
+            When the records do not provide the bearing from the storm
+            centre (see the *interpolate* option of *close2Track*), it is
+            computed from the 'clon', 'clat', 'lon' & 'lat' columns.
+
+        Returns:
+            composite (dict): radial bin edges 'radius' (km), sector edges 'bearing' (degrees), and for each bin the number of records 'count', the mean 'mean' and sample standard deviation 'std' (n - 1) of the variable (arrays of shape [nb radii, nb sectors], with an additional first dimension for each storm listed in 'storms' when *by* is set)
+        """
+
+        if data is None:
+            data = getattr(self, "cyclone_data", None)
+        if data is None:
+            raise ValueError(
+                "There is no matched cyclone data, you need to run the \
+                             close2Track() function before."
+            )
+        if dr <= 0.0 or rmax <= 0.0 or nsectors < 1:
+            raise ValueError("Error rmax, dr and nsectors need to be positive")
+
+        nr = int(np.ceil(rmax / dr))
+        dist = data["dist"].to_numpy(dtype=np.float64)
+        if "bearing" in data.columns:
+            azimuth = data["bearing"].to_numpy(dtype=np.float64)
+        else:
+            azimuth = geodesy.bearing(
+                data["clon"].to_numpy(),
+                data["clat"].to_numpy(),
+                data["lon"].to_numpy(),
+                data["lat"].to_numpy(),
+            )
+        values = data[variable].to_numpy(dtype=np.float64)
+
+        # Flat bin number of each record
+        ir = np.floor(dist / dr).astype(np.int64)
+        isec = np.floor(np.mod(azimuth, 360.0) * nsectors / 360.0).astype(np.int64)
+        isec = np.minimum(isec, nsectors - 1)
+        keep = (dist < nr * dr) & np.isfinite(values)
+        shape = (nr, nsectors)
+        if by is not None:
+            storms, istorm = np.unique(data[by].to_numpy(), return_inverse=True)
+            shape = (len(storms), nr, nsectors)
+            ids = np.ravel_multi_index((istorm[keep], ir[keep], isec[keep]), shape)
+        else:
+            ids = np.ravel_multi_index((ir[keep], isec[keep]), shape)
+
+        size = int(np.prod(shape))
+        count = np.bincount(ids, minlength=size)
+        total = np.bincount(ids, weights=values[keep], minlength=size)
+        total2 = np.bincount(ids, weights=values[keep] ** 2, minlength=size)
+        # The standard deviation uses n - 1 as the other statistics
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            var = np.maximum(total2 - total * mean, 0.0) / (count - 1)
+        var[count == 1] = np.nan
+
+        composite = {
+            "radius": np.arange(nr + 1) * dr,
+            "bearing": np.linspace(0.0, 360.0, nsectors + 1),
+            "count": count.reshape(shape),
+            "mean": mean.reshape(shape),
+            "std": np.sqrt(var).reshape(shape),
+        }
+        if by is not None:
+            composite["storms"] = storms
+        self.composite = composite
+
+        return composite
+
+    def readStations(self, stationsCSV, recordsCSV, stationid="station", columns=None):
+        """
+        This function loads the positions and records of fixed stations
+        (such as wave buoys) used to validate the altimeter dataset with the
+        *matchStations* function.
+
+        Args:
+            stationsCSV (str): path of the csv file containing the stations with in the header a station identifier column and the following names *lon* & *lat*
+            recordsCSV (str): path of the csv file containing the station records with in the header the station identifier column, *datetime* and the recorded variables (such as the significant wave height)
+            stationid (str): name of the column identifying each station [default: 'station']
+            columns (dict): renaming of the columns of both files to the expected names [default: None]
+
+        Note:
+            Rows with a date that cannot be parsed are discarded and dates
+            with a time zone are converted to UTC.
+
+        Returns:
+            stations (dataframe): pandas dataframe containing the stations positions
+        """
+
+        for filename in (stationsCSV, recordsCSV):
+            try:
+                with open(str(filename)) as file:
+                    pass
+            except IOError as e:
+                print("Unable to open file ", str(filename))
+
+        stations = pd.read_csv(str(stationsCSV), sep=r",", engine="c", header=0)
+        records = pd.read_csv(str(recordsCSV), sep=r",", engine="c", header=0)
+        if columns is not None:
+            stations = stations.rename(columns=columns)
+            records = records.rename(columns=columns)
+        for col in (stationid, "lon", "lat"):
+            if col not in stations.columns:
+                raise ValueError(
+                    "Columns "
+                    + stationid
+                    + ", lon and lat are required in the \
+                                     stations file"
+                )
+        for col in (stationid, "datetime"):
+            if col not in records.columns:
+                raise ValueError(
+                    "Columns "
+                    + stationid
+                    + " and datetime are required in the \
+                                     station records file"
+                )
+
+        date = pd.to_datetime(records["datetime"], errors="coerce")
+        if date.dt.tz is not None:
+            date = date.dt.tz_convert(None)
+        records = records.assign(datetime=date)
+        records = records[records["datetime"].notna()]
+
+        self.stationid = stationid
+        self.stations = stations.astype(
+            {stationid: str, "lon": np.float64, "lat": np.float64}
+        ).reset_index(drop=True)
+        self.station_records = (
+            records.astype({stationid: str})
+            .sort_values(by="datetime", kind="mergesort")
+            .reset_index(drop=True)
+        )
+
+        return self.stations
+
+    def matchStations(self, radius_km=50.0, dtmax=1.0, nprocs=1):
+        """
+        This function pairs the altimeter records with the records of the
+        stations loaded with *readStations*.
+
+        The altimeter records located within *radius_km* of each station are
+        found for all stations at once with a spatial query of the
+        spatiotemporal index shared with *close2Track*. Each of them is then
+        paired with the station record that is closest in time, provided it
+        was recorded less than *dtmax* hours apart.
+
+        The recorded dataframe **station_data** contains the following
+        variables:
+
+            * station identifier
+            * altimeter date (datetime)  'date'
+            * altimeter significant wave height (m)  'wH'
+            * altimeter data longitude and latitude positions  'lon' & 'lat'
+            * station longitude and latitude positions  'slon' & 'slat'
+            * distance between altimeter coordinates and station (km)  'dist'
+            * station record date (datetime)  'sdate'
+            * difference in time between the altimeter and station records (hours)  'hours'
+            * all the variables of the station records
+
+        Args:
+            radius_km (float): maximum great-circle distance in kilometres between station and altimeter data coordinates [default: 50.]
+            dtmax (float): maximum difference in time between station and altimeter records (hours) [default: 1.]
+            nprocs (int): number of threads used to query the spatiotemporal index, -1 uses all processors [default: 1]
+
+        Returns:
+            stationdata (dataframe): pandas dataframe containing the paired altimeter and station records
+        """
+
+        if getattr(self, "stations", None) is None:
+            raise ValueError(
+                "There is no station loaded in the class, \
+                             you need to run the readStations() \
+                             function before."
+            )
+        if dtmax <= 0.0:
+            raise ValueError("Error dtmax needs to be positive")
+
+        # Altimeter records around each station
+        index = self.spatialIndex()
+        sid, aid = index.queryRadius(
+            self.stations["lon"].to_numpy(),
+            self.stations["lat"].to_numpy(),
+            radius_km,
+            workers=nprocs,
+        )
+        slon = self.stations["lon"].to_numpy()[sid]
+        slat = self.stations["lat"].to_numpy()[sid]
+        alon = self.timeseries["lon"].to_numpy()[aid]
+        alat = self.timeseries["lat"].to_numpy()[aid]
+        pairs = pd.DataFrame(
+            {
+                self.stationid: self.stations[self.stationid].to_numpy()[sid],
+                "date": self.timeseries["date"].to_numpy()[aid],
+                "wH": self.timeseries["wh"].to_numpy()[aid],
+                "lon": alon,
+                "lat": alat,
+                "slon": slon,
+                "slat": slat,
+                "dist": np.round(geodesicDistance(slon, slat, alon, alat), 3),
+            }
+        ).sort_values(by="date", kind="mergesort")
+
+        # Closest station record in time
+        records = self.station_records.rename(columns={"datetime": "sdate"})
+        stationdata = pd.merge_asof(
+            pairs,
+            records,
+            left_on="date",
+            right_on="sdate",
+            by=self.stationid,
+            tolerance=pd.Timedelta(hours=dtmax),
+            direction="nearest",
+            allow_exact_matches=True,
+        )
+        stationdata = stationdata[stationdata["sdate"].notna()]
+        hours = (stationdata["date"] - stationdata["sdate"]).dt.total_seconds()
+        hours = hours.to_numpy() / 3600.0
+        stationdata = stationdata[np.abs(hours) < dtmax]
+
+        # Station date and time difference follow the paired columns
+        sdate = stationdata.pop("sdate")
+        loc = stationdata.columns.get_loc("dist") + 1
+        stationdata.insert(loc, "sdate", sdate)
+        stationdata.insert(loc + 1, "hours", np.round(hours[np.abs(hours) < dtmax], 3))
+        self.station_data = stationdata.sort_values(
+            by=[self.stationid, "date"], kind="mergesort"
+        ).reset_index(drop=True)
+
+        return self.station_data
+
+    def _waveParameters(self, wh, ws):
+        """
+        Computes the wave parameters reported for the altimeter records
+        matched to a cyclone track.
+
+        Args:
+            wh (numpy array): significant wave height in metres
+            ws (numpy array): surface wind speed in metres per second
+
+        Returns:
+            waves (dict): wave period, group velocity, energy flux, energy density and significant wave height
+        """
+
+        wh = np.asarray(wh, dtype=np.float64)
+        period = self.wavePeriod(wh, np.asarray(ws, dtype=np.float64))
+
+        return {
+            "period": period,
+            "speed": self.waveGroupVelocity(period),
+            "power": self.waveEnergyFlux(wh, period),
+            "energy": self.meanEnergy(wh),
+            "wH": wh,
+        }
+
+    def streamTrack(self, radius=2.0, dtmax=6, radius_km=None, latency=24.0):
+        """
+        This function creates a **streamCollocator** that performs the
+        *close2Track* search incrementally, as new cyclone positions and
+        altimeter observations arrive during an active cyclone.
+
+        New positions are passed to its *addTrack(lon, lat, date)* function
+        and new altimeter observations to its *addAltimeter(lon, lat, date,
+        wh=wh, ws=ws)* function. Both return only the new matches, with the
+        wave parameters of the **cyclone_data** dataframe (see
+        *close2Track*). The collocator only retains the data of the last
+        *dtmax* hours, or of the last *dtmax* plus *latency* hours while the
+        other source has not caught up.
+
+        Args:
+            radius (float): maximum radius distance in degree between cyclone position and altimeter data coordinates [default: '2.']
+            dtmax (float): maximum difference in time between recorded cyclone date and picked altimeter data (hours) [default: '6.']
+            radius_km (float): maximum great-circle distance in kilometres between cyclone position and altimeter data coordinates, when set *radius* is not used [default: None]
+            latency (float): maximum delay between the arrival of the cyclone positions and of the altimeter observations (hours) [default: 24.]
+
+        Returns:
+            collocator (streamCollocator): incremental cyclone collocator
+        """
+
+        return streamCollocator(
+            radius=radius,
+            dtmax=dtmax,
+            radius_km=radius_km,
+            waves=self._waveParameters,
+            latency=latency,
+        )
+
+    def _cycloneFrames(self, extent, addcity, markersize, resolution, basemap):
+        """
+        Gathers for each cyclone path position the altimeter data matched by
+        *close2Track* and the arguments used to draw its map.
+
+        Args:
+            extent (list): geographical extent of the figure following the convention [lon min,lon max,lat min,lat max]
+            addcity (list): defined a specific location using the following convention ['City Name', longitude, latitude]
+            markersize (int): size of the markers used to specify cyclone tracks
+            resolution (str): resolution of the coastlines, no land nor coastline are drawn when set to None
+            basemap (bool): draw the land and coastlines from the cached image of the extent
+
+        Returns:
+            frames (list): keyword arguments of each position (see **render.cycloneAltiFrame**)
+            matched (dict): indices of the altimeter data matched to each position
         """
 
         if self.cyclone is None:
@@ -1260,80 +2470,54 @@ class waveAnalysis(object):
                              initialisation..."
             )
 
-        # Get altimeter positions
-        XY = np.zeros((self.timeseries.shape[0], 2))
-        XY[:, 0] = self.timeseries["lon"].to_numpy()
-        XY[:, 1] = self.timeseries["lat"].to_numpy()
+        if self.cyclone_data is None:
+            raise ValueError(
+                "There is no altimeter data defined based on \
+                             cyclone path, you need to run the \
+                             close2Track(radius=2., dtmax=6) function before."
+            )
 
-        # Get cyclone positions
-        cXY = np.zeros((self.cyclone.shape[0], 2))
-        cXY[:, 0] = self.cyclone["lon"].to_numpy()
-        cXY[:, 1] = self.cyclone["lat"].to_numpy()
-
-        # Search for closest altimeter points to cyclone track
-        tree = _cKDTree(XY)
-        pts = tree.query_ball_point(cXY, r=radius)
-
-        # Get the ones that are in the right time interval...
-        clon = []
-        clat = []
-        aT = []
-        aC = []
-        aP = []
-        aE = []
-        aH = []
-        alat = []
-        alon = []
-        cdate = []
-        difft = []
-        dist = []
-
-        for k in range(len(pts)):
-            ngbhs = len(pts[k])
-            if ngbhs > 0:
-                for p in range(ngbhs):
-                    delta_time = self.timeseries.date.iloc[
-                        pts[k][p]
-                    ] - self.cyclone.datetime.iloc[k].replace(tzinfo=None)
-                    dhours = delta_time.total_seconds() / 3600.0
-                    if abs(dhours) < dtmax:
-                        difft.append(round(dhours, 3))
-                        clon.append(cXY[k, 0])
-                        clat.append(cXY[k, 1])
-                        cdate.append(self.cyclone["datetime"].iloc[k])
-                        d = geopy.distance.geodesic(
-                            (cXY[k, 1], cXY[k, 0]),
-                            (
-                                self.timeseries["lat"].iloc[pts[k][p]],
-                                self.timeseries["lon"].iloc[pts[k][p]],
-                            ),
-                        ).km
-                        dist.append(round(d, 3))
-                        aT.append(self.timeseries["period"].iloc[pts[k][p]])
-                        aC.append(self.timeseries["speed"].iloc[pts[k][p]])
-                        aP.append(self.timeseries["power"].iloc[pts[k][p]])
-                        aE.append(self.timeseries["energy"].iloc[pts[k][p]])
-                        aH.append(self.timeseries["wh"].iloc[pts[k][p]])
-                        alat.append(self.timeseries["lat"].iloc[pts[k][p]])
-                        alon.append(self.timeseries["lon"].iloc[pts[k][p]])
+        cycdata = self.cyclone_data
+        unill = cycdata[["clat", "clon", "date"]]
+        unill = unill.drop_duplicates()
+        if extent is None:
+            extent = [self.lonmin, self.lonmax, self.latmin, self.latmax]
+
+        # Altimeter data matched to each cyclone path position
+        matched = cycdata.groupby(["clon", "clat"], sort=False).indices
+        alon = cycdata["lon"].to_numpy()
+        alat = cycdata["lat"].to_numpy()
+
+        d = geodesicDistance(
+            cycdata["clon"].iloc[0],
+            cycdata["clat"].iloc[0],
+            cycdata["clon"].iloc[0],
+            cycdata["clat"].iloc[0] + 2.0,
+        )
+        d = round(float(d), 3) * 1.5
 
-        data = {
-            "period": aT,
-            "speed": aC,
-            "power": aP,
-            "energy": aC,
-            "dist": dist,
-            "date": cdate,
-            "wH": aH,
-            "lon": alon,
-            "lat": alat,
-            "clon": clon,
-            "clat": clat,
-            "hours": difft,
-        }
-        self.cyclone_data = pd.DataFrame(data)
+        frames = []
+        for p in range(unill.shape[0]):
+            centre = (unill.clon.iloc[p], unill.clat.iloc[p])
+            ids = matched[centre]
+            frames.append(
+                {
+                    "clon": self.cyclone["lon"].to_numpy(),
+                    "clat": self.cyclone["lat"].to_numpy(),
+                    "centre": centre,
+                    "date": unill.date.iloc[p],
+                    "alon": alon[ids],
+                    "alat": alat[ids],
+                    "extent": extent,
+                    "radius_km": d,
+                    "addcity": addcity,
+                    "markersize": markersize,
+                    "resolution": resolution,
+                    "cache": basemap,
+                }
+            )
 
-        return self.cyclone_data
+        return frames, matched
 
     def plotCycloneAltiPoint(
         self,
@@ -1343,12 +2527,23 @@ class waveAnalysis(object):
         markersize=100,
         zoom=4,
         fsize=(12, 10),
+        resolution="10m",
+        basemap=True,
+        outdir=None,
+        nprocs=1,
+        dpi=100,
+        show=True,
     ):
         """
         This function **plots** a series of figures of the geographical
         coordinates for processed altimeter data close to each cyclone path
         position.
 
+        When an output directory is given, the figures are not shown but
+        rendered with the Agg backend and written to files, possibly in
+        several worker processes. This batch mode is much faster to produce
+        the frames of a whole storm.
+
         Args:
             showinfo (bool): show considered cyclone path coordiantes and associated recorded time and associate wave parameters [default: False]
             extent (int): geographical extent of the figure following the convention [lon min,lon max,lat min,lat max]  [default: None]
@@ -1356,6 +2551,12 @@ class waveAnalysis(object):
             markersize (int): size of the markers used to specify cyclone tracks [default: 100]
             zoom (int): given target zoom for the target domain background (must be a value >= 1) [default: 4]
             fsize : size of the image [default: (12,10)]
+            resolution (str): resolution of the coastlines ('10m', '50m' or '110m'), no land nor coastline are drawn when set to None [default: '10m']
+            basemap (bool): draw the land and coastlines from an image rendered once for each extent and resolution and reused by the following maps (see **render.basemap**) [default: True]
+            outdir (str): directory where the figures are saved as 'frame_XXXX.png' files instead of being shown [default: None]
+            nprocs (int): number of worker processes used to render the figures in batch mode, None uses all processors [default: 1]
+            dpi (int): resolution of the saved figures [default: 100]
+            show (bool): show the figures and print information, when False the figures are only returned [default: True]
 
         Note:
             This function relies on **cartopy** and **matplotlib** libraries.
@@ -1363,30 +2564,47 @@ class waveAnalysis(object):
         Todo:
             There are some plotting problems for dataset spanning beyond the
             180 degree meridian that will need to be fixed.
-        """
 
-        if self.cyclone is None:
-            raise ValueError(
-                "There is no cyclone path loaded in the class, \
-                             this needs to be done during the class \
-                             initialisation..."
-            )
+        Returns:
+            paths (list): file names of the saved figures in batch mode
+            figures (list): matplotlib figure and map axes of each cyclone path position (only when *show* is False)
+        """
 
-        if self.cyclone_data is None:
-            raise ValueError(
-                "There is no altimeter data defined based on \
-                             cyclone path, you need to run the \
-                             close2Track(radius=2., dtmax=6) function before."
+        frames, matched = self._cycloneFrames(
+            extent, addcity, markersize, resolution, basemap
+        )
+        cycdata = self.cyclone_data
+        unill = cycdata[["clat", "clon", "date"]].drop_duplicates()
+        if extent is None:
+            extent = [self.lonmin, self.lonmax, self.latmin, self.latmax]
+
+        # Batch rendering of the figures to files, the map background is
+        # rendered beforehand so that forked workers inherit it
+        if outdir is not None:
+            if basemap and resolution is not None:
+                render.basemap(extent, resolution)
+            paths = render.framePaths(outdir, len(frames))
+            return render.renderFrames(
+                render.cycloneAltiFrame,
+                frames,
+                paths,
+                fsize=fsize,
+                dpi=dpi,
+                nprocs=nprocs,
             )
 
-        unill = self.cyclone_data[["clat", "clon", "date"]]
-        unill = unill.drop_duplicates()
+        plt = render.pyplot()
+        if not show:
+            figures = []
+            for frame in frames:
+                fig = plt.figure(figsize=fsize)
+                figures.append((fig, render.cycloneAltiFrame(fig, **frame)))
+            return figures
 
         # Loop over recorded cyclone path position
         for p in range(unill.shape[0]):
 
-            cyclons = unill.clon.iloc[p]
-            cyclats = unill.clat.iloc[p]
+            cyclons, cyclats = frames[p]["centre"]
 
             if showinfo:
                 print(" ")
@@ -1403,179 +2621,152 @@ class waveAnalysis(object):
                 print("")
 
             fig = plt.figure(figsize=fsize)
-            ax = fig.add_subplot(1, 1, 1, projection=ccrs.PlateCarree())
-            if extent is None:
-                ax.set_extent(
-                    [self.lonmin, self.lonmax, self.latmin, self.latmax],
-                    crs=ccrs.PlateCarree(),
-                )
-            else:
-                ax.set_extent(
-                    [extent[0], extent[1], extent[2], extent[3]], crs=ccrs.PlateCarree()
-                )
+            render.cycloneAltiFrame(fig, **frames[p])
 
-            ax.set_facecolor(cfeature.COLORS['water'])
-            ax.add_feature(cfeature.LAND)
-            ax.coastlines(resolution="10m")
+            plt.show()
 
-            geodetic_transform = ccrs.PlateCarree()._as_mpl_transform(ax)
-            text_transform = offset_copy(geodetic_transform, units="dots", x=-12)
+            if showinfo:
+                for k in matched[(cyclons, cyclats)]:
+                    print(
+                        "Altimeter point ("
+                        + str(round(cycdata.lon[k], 1))
+                        + ","
+                        + str(round(cycdata.lat[k], 1))
+                        + ") records dt: "
+                        + str(round(cycdata.hours[k], 2))
+                        + "h"
+                    )
+                    print("    +    Power ", round(cycdata.power[k], 2), "kW/m")
+                    print("    +   Energy ", round(cycdata.energy[k], 2), "J/m2")
+                    print("    + Celerity ", round(cycdata.speed[k], 2), "m/s")
+                    print("    +   Period ", round(cycdata.period[k], 2), "s")
+                    print("    +   Height ", round(cycdata.wH[k], 2), "m")
+                    print(" ")
+
+    def animateCyclone(
+        self,
+        path,
+        fps=2,
+        extent=None,
+        addcity=None,
+        markersize=100,
+        fsize=(12, 10),
+        resolution="10m",
+        basemap=True,
+        dpi=100,
+    ):
+        """
+        This function **animates** the altimeter data close to each cyclone
+        path position (see *plotCycloneAltiPoint*) and writes the animation
+        to a GIF or MP4 file.
 
-            # Cyclone track
-            clon = self.cyclone["lon"].to_numpy()
-            clat = self.cyclone["lat"].to_numpy()
-            for k in range(len(clon) - 1):
-                plt.plot(
-                    [clon[k], clon[k + 1]],
-                    [clat[k], clat[k + 1]],
-                    color="k",
-                    linewidth=1,
-                    alpha=1.0,
-                    transform=ccrs.PlateCarree(),
-                    zorder=1,
-                )
-            plt.scatter(
-                [clon],
-                [clat],
-                marker="o",
-                color="w",
-                s=markersize * 0.5,
-                edgecolor="black",
-                linewidth=0.5,
-                alpha=1,
-                transform=ccrs.PlateCarree(),
-                zorder=5,
-            )
+        The map background, the cyclone track and the gridlines are drawn
+        once, only the current cyclone position, its circle and the matched
+        altimeter data are updated for each frame.
 
-            cycdata = self.cyclone_data
-            ax.set_title(
-                "Altimeter data close to cyclone path point ("
-                + str(cyclons)
-                + ","
-                + str(cyclats)
-                + ") at "
-                + str(unill.date.iloc[p])
-            )
-            plt.scatter(
-                cyclons,
-                cyclats,
-                marker="o",
-                s=markersize * 3,
-                color="k",
-                edgecolor="black",
-                linewidth=1,
-                alpha=1,
-                transform=ccrs.PlateCarree(),
-                zorder=5,
-            )
+        Args:
+            path (str): animation file name either a GIF ('.gif') or a MP4 ('.mp4', requires ffmpeg) file
+            fps (int): number of frames (cyclone path positions) per second [default: 2]
+            extent (int): geographical extent of the figure following the convention [lon min,lon max,lat min,lat max]  [default: None]
+            addcity (list): defined a specific location using the following convention ['City Name', longitude, latitude] [default: None]
+            markersize (int): size of the markers used to specify cyclone tracks [default: 100]
+            fsize : size of the image [default: (12,10)]
+            resolution (str): resolution of the coastlines ('10m', '50m' or '110m'), no land nor coastline are drawn when set to None [default: '10m']
+            basemap (bool): draw the land and coastlines from an image rendered once for each extent and resolution (see **render.basemap**) [default: True]
+            dpi (int): resolution of the frames [default: 100]
 
-            for k in range(cycdata.shape[0]):
-                if cycdata.clon[k] == cyclons:
-                    if cycdata.clat[k] == cyclats:
-                        plt.scatter(
-                            cycdata.lon[k],
-                            cycdata.lat[k],
-                            marker="o",
-                            s=markersize * 2,
-                            edgecolor="k",
-                            linewidth=1,
-                            alpha=1,
-                            transform=ccrs.PlateCarree(),
-                            zorder=5,
-                        )
+        Note:
+            This function relies on **cartopy** and **matplotlib** libraries.
 
-            # Add a marker for a given city.
-            if addcity is not None:
-                name_city = addcity[0]
-                lon_city = addcity[1]
-                lat_city = addcity[2]
-                ax.scatter(
-                    lon_city,
-                    lat_city,
-                    marker="o",
-                    color="navy",
-                    s=100,
-                    edgecolor="black",
-                    linewidth=0.5,
-                    alpha=0.7,
-                    transform=ccrs.PlateCarree(),
-                )
+        Returns:
+            path (str): animation file name
+        """
 
-                ax.text(
-                    lon_city,
-                    lat_city,
-                    name_city,
-                    verticalalignment="center",
-                    horizontalalignment="right",
-                    transform=text_transform,
-                    bbox=dict(facecolor="white", alpha=0.5, boxstyle="round"),
-                )
+        frames, _ = self._cycloneFrames(
+            extent, addcity, markersize, resolution, basemap
+        )
 
-            d = geopy.distance.geodesic(
-                (cycdata.clat[0], cycdata.clon[0]),
-                (cycdata.clat[0] + 2.0, cycdata.clon[0]),
-            ).km
-            d = round(d, 3) * 1.5
-
-            circle_points = cartopy.geodesic.Geodesic().circle(
-                lon=cyclons,
-                lat=cyclats,
-                radius=d * 1000.0,
-                n_samples=100,
-                endpoint=False,
-            )
-            geom = shapely.geometry.Polygon(circle_points)
-            ax.add_geometries(
-                (geom,),
-                crs=cartopy.crs.PlateCarree(),
-                facecolor="None",
-                edgecolor="k",
-                linewidth=1.5,
-                zorder=31,
-            )
+        return render.saveAnimation(path, frames, fsize=fsize, dpi=dpi, fps=fps)
 
-            gl = ax.gridlines(
-                crs=ccrs.PlateCarree(),
-                draw_labels=True,
-                linewidth=0.5,
-                color="k",
-                alpha=0.5,
-                linestyle="--",
+    def generateReport(
+        self, region=None, outdir="report", resolution="10m", dpi=100, nprocs=None
+    ):
+        """
+        This function **renders** all the standard figures of a region and
+        writes them as PNG files in an output directory:
+
+            * 'altimeter_data': map of the altimeter data (see *visualiseData*),
+            * 'cyclone_tracks': map of the cyclone track when one is loaded (see *plotCycloneTracks*),
+            * 'timeseries_X': time series of each wave parameter within the region (see *plotTimeSeries*), and
+            * 'seasonal_X_Y': seasonal characteristics of each wave parameter within the region (see *computeSeasonalCharacteristics*).
+
+        The time series and seasonal figures are only rendered once the time
+        series has been generated. The figures are rendered with the Agg
+        backend in worker processes (a single one when *nprocs* is 1), the
+        figures of the current session are left open, and nothing is shown
+        nor printed.
+
+        Args:
+            region (list): geographical extent of the report following the convention [lon min,lon max,lat min,lat max], the extent of the altimeter data is used if set to None [default: None]
+            outdir (str): directory where the figures are saved [default: 'report']
+            resolution (str): resolution of the coastlines ('10m', '50m' or '110m'), no land nor coastline are drawn when set to None [default: '10m']
+            dpi (int): resolution of the saved figures [default: 100]
+            nprocs (int): number of worker processes, None uses all processors [default: None]
+
+        Returns:
+            paths (list): file names of the saved figures
+        """
+
+        if region is None:
+            region = [self.lonmin, self.lonmax, self.latmin, self.latmax]
+        os.makedirs(str(outdir), exist_ok=True)
+
+        def paths(*names):
+            return [os.path.join(str(outdir), name + ".png") for name in names]
+
+        tasks = [
+            (
+                "visualiseData",
+                {"extent": region, "resolution": resolution},
+                paths("altimeter_data"),
+            )
+        ]
+        if self.cyclone is not None:
+            tasks.append(
+                (
+                    "plotCycloneTracks",
+                    {"extent": region, "resolution": resolution},
+                    paths("cyclone_tracks"),
+                )
             )
-            gl.top_labels = False
-            gl.left_labels = False
-            gl.xformatter = LONGITUDE_FORMATTER
-            gl.yformatter = LATITUDE_FORMATTER
+        if self.timeseries is not None or self.tsstore is not None:
+            for series in ["H", "T", "P", "E", "Cg"]:
+                tasks.append(
+                    (
+                        "plotTimeSeries",
+                        {"series": series, "lonlat": region},
+                        paths("timeseries_" + series),
+                    )
+                )
+            for series in ["wh", "period", "power", "energy", "speed"]:
+                name = "seasonal_" + series + "_"
+                tasks.append(
+                    (
+                        "computeSeasonalCharacteristics",
+                        {"series": series, "lonlat": region},
+                        paths(name + "heatmap", name + "distribution", name + "sd"),
+                    )
+                )
 
-            plt.show()
+        # The map background is rendered beforehand so that forked workers
+        # inherit it
+        if resolution is not None:
+            render.basemap(region, resolution)
 
-            if showinfo:
-                cycdata = self.cyclone_data
-                cyclons = unill.clon.iloc[p]
-                cyclats = unill.clat.iloc[p]
-                for k in range(cycdata.shape[0]):
-                    if cycdata.clon[k] == cyclons:
-                        if cycdata.clat[k] == cyclats:
-                            print(
-                                "Altimeter point ("
-                                + str(round(cycdata.lon[k], 1))
-                                + ","
-                                + str(round(cycdata.lat[k], 1))
-                                + ") records dt: "
-                                + str(round(cycdata.hours[k], 2))
-                                + "h"
-                            )
-                            print("    +    Power ", round(cycdata.power[k], 2), "kW/m")
-                            print(
-                                "    +   Energy ", round(cycdata.energy[k], 2), "J/m2"
-                            )
-                            print("    + Celerity ", round(cycdata.speed[k], 2), "m/s")
-                            print("    +   Period ", round(cycdata.period[k], 2), "s")
-                            print("    +   Height ", round(cycdata.wH[k], 2), "m")
-                            print(" ")
+        return render.renderReport(self, tasks, dpi=dpi, nprocs=nprocs)
 
     def computeSeasonalCharacteristics(
-        self, series="wh", time=None, lonlat=None, fsave=None, plot=True
+        self, series="wh", time=None, lonlat=None, fsave=None, plot=True, show=True
     ):
         """
         This function allows  the user to analyse the seasonal characteristics
@@ -1587,6 +2778,12 @@ class waveAnalysis(object):
         wave paraneter characteristics as a heatmap, a box plot and a standard
         deviation graph.
 
+        Several variables can be analysed at once by giving a list of names
+        (or 'all'), their monthly mean, standard deviation and number of
+        records are then computed in a single grouped aggregation and
+        returned as a tidy dataframe with one row per variable, year and
+        month.
+
         For the wave height series, a Seasonal Mann-Kendall test is also
         performed to determine monotonic trends in computed dataset using the
         package from Hussain & Mahmud (2019).
@@ -1599,17 +2796,19 @@ class waveAnalysis(object):
             the *heatmap* and the seasonal *boxplot*.
 
         Args:
-            series (str): name of the series to plot based on **timeseries** dataframe, choices are: 'wh', 'period', 'power', 'energy' and 'speed' [default: 'wh']
-            time (list): extent of years to plot for plotting time series from 1995 to 2010 user will set 'time' to [1995,2010] [default: None]
+            series (str): name of the series to plot based on **timeseries** dataframe, choices are: 'wh', 'period', 'power', 'energy' and 'speed', a list of names or 'all' for all of them [default: 'wh']
+            time (list): extent of years to plot for plotting time series from 1995 to 2010 user will set 'time' to [1995,2010], the entire record is used if set to None [default: None]
             lonlat (list): specifying the geographical extent of the season characteristics computation following the convention [lon min,lon max,lat min,lat max]  [default: None]
             fsave (str): saved image name without extension that will be written as a PNG file [default: None]
             plot (bool): flag specifying if plots have to been done [plot: True]
+            show (bool): show the figures and print information, when False the figures are only returned [default: True]
 
         Returns:
-            dfseason (dataframe): pandas dataframe containing for chosen series variable the seasonality parameter for specified time interval
+            dfseason (dataframe): pandas dataframe containing for chosen series variable the seasonality parameter for specified time interval, for several variables the tidy dataframe with the columns *variable*, *year*, *month*, *mean*, *std* & *count*
+            figures (list): matplotlib figure and axes of the heatmap, the box plot and the standard deviation graph of each variable (only when *plot* is True and *show* is False)
         """
 
-        if self.timeseries is None:
+        if self.timeseries is None and self.tsstore is None:
             raise ValueError(
                 "The time series dataframe does not exist, you \
                               need to run the **generateTimeSeries()** function \
@@ -1628,151 +2827,429 @@ class waveAnalysis(object):
                     "Error wrong definition of min and max \
                                  latitude in lonlat"
                 )
-            tdf = self.timeseries.drop(
-                self.timeseries[self.timeseries.lon < lonlat[0]].index
+
+        names = series
+        if isinstance(series, str):
+            names = ["wh", "period", "power", "energy", "speed"]
+            if series != "all":
+                names = [series]
+        stats = self._seasonalStatistics(list(names), time, lonlat)
+
+        months = {
+            1: "January",
+            2: "February",
+            3: "March",
+            4: "April",
+            5: "May",
+            6: "June",
+            7: "July",
+            8: "August",
+            9: "September",
+            10: "October",
+            11: "November",
+            12: "December",
+        }
+        figures = []
+        seasons = {}
+        for name, group in stats.groupby("variable", sort=False):
+            dfseason = group.pivot(index="year", columns="month", values="mean")
+            dfseason = dfseason.rename(columns=months)
+            seasons[name] = dfseason
+            if plot:
+                figures += self._plotSeasonal(dfseason, name, fsave, show)
+
+        if isinstance(series, str) and series != "all":
+            # No records in the selection gives an empty table
+            if series not in seasons:
+                seasons[series] = pd.DataFrame(
+                    columns=pd.Index(months.values(), name="month"),
+                    index=pd.Index([], name="year"),
+                    dtype=np.float64,
+                )
+            dfseason = seasons[series]
+            dfseason["mean"] = dfseason.mean(axis=1)
+        else:
+            dfseason = stats
+
+        if plot and not show:
+            return dfseason, figures
+
+        return dfseason
+
+    def computeClimatology(
+        self,
+        res=0.5,
+        series=("wh", "period", "power"),
+        lonlat=None,
+        time=None,
+        yearly=False,
+    ):
+        """
+        This function computes the monthly climatology of a set of wave
+        parameters on a regular longitude/latitude grid.
+
+        Each record is assigned to a (month, cell) key, or a (year, month,
+        cell) key when *yearly* is True, and the number of records, the sum
+        and the sum of squares of each parameter are accumulated for all the
+        keys at once with *numpy.bincount*.
+
+        The result is returned as a **xarray** dataset when the library is
+        installed, and otherwise as a dictionary holding the same variables
+        and coordinates as numpy arrays. For each parameter 'X' it contains:
+
+            * 'X_mean': mean value of the records of each cell,
+            * 'X_std': standard deviation of the records of each cell, and
+            * 'X_count': number of records of each cell.
+
+        The dimensions are ('month', 'lat', 'lon'), or ('year', 'month',
+        'lat', 'lon') when *yearly* is True, and the coordinates are given at
+        the centre of each cell.
+
+        Args:
+            res (float): size of the grid cells in degrees [default: 0.5]
+            series (list): names of the parameters based on **timeseries** dataframe, choices are: 'wh', 'period', 'power', 'energy' and 'speed' [default: ('wh', 'period', 'power')]
+            lonlat (list): geographical extent of the grid following the convention [lon min,lon max,lat min,lat max], the extent of the altimeter data is used if set to None [default: None]
+            time (list): first and last years to consider, the entire record is used if set to None [default: None]
+            yearly (bool): compute the monthly values of each year instead of the climatology [default: False]
+
+        Returns:
+            climatology (dataset): monthly climatology of each parameter (also stored as **climatology**)
+        """
+
+        if self.timeseries is None and self.tsstore is None:
+            raise ValueError(
+                "The time series dataframe does not exist, you \
+                              need to run the **generateTimeSeries()** function \
+                              first."
             )
-            tdf = tdf.drop(tdf[tdf.lon > lonlat[1]].index)
-            tdf = tdf.drop(tdf[tdf.lat < lonlat[2]].index)
-            tdf = tdf.drop(tdf[tdf.lat > lonlat[3]].index)
-            tdf = tdf.groupby(["year", "month"])[[series]].apply(np.mean).reset_index()
+        if res <= 0.0:
+            raise ValueError("Error res needs to be positive")
+
+        if lonlat is None:
+            lonlat = [self.lonmin, self.lonmax, self.latmin, self.latmax]
+        if lonlat[0] >= lonlat[1] or lonlat[2] >= lonlat[3]:
+            raise ValueError("Error wrong definition of min and max in lonlat")
+        series = list(series)
+
+        # Regular grid covering the extent
+        nx = max(1, int(np.ceil(round((lonlat[1] - lonlat[0]) / res, 6))))
+        ny = max(1, int(np.ceil(round((lonlat[3] - lonlat[2]) / res, 6))))
+        coords = {
+            "month": np.arange(1, 13),
+            "lat": lonlat[2] + res * (np.arange(ny) + 0.5),
+            "lon": lonlat[0] + res * (np.arange(nx) + 0.5),
+        }
+        dims = ("month", "lat", "lon")
+        year0, nyear = 0, 1
+        if yearly:
+            if time is not None:
+                year0, year1 = int(time[0]), int(time[1])
+            elif self.timeseries is not None:
+                year0 = int(self.timeseries["year"].min())
+                year1 = int(self.timeseries["year"].max())
+            else:
+                year = self.tsstore.column("year")
+                year0, year1 = int(year.min()), int(year.max())
+            nyear = year1 - year0 + 1
+            coords = dict(year=np.arange(year0, year1 + 1), **coords)
+            dims = ("year",) + dims
+        shape = (nyear, 12, ny, nx)
+        size = int(np.prod(shape))
+
+        # Records, sums and sums of squares of each key
+        moments = {name: np.zeros((3, size)) for name in series}
+        columns = ["lon", "lat", "year", "month"] + series
+        for tdf in self._records(columns, time, lonlat):
+            ix = ((tdf["lon"].to_numpy() - lonlat[0]) / res).astype(np.int64)
+            iy = ((tdf["lat"].to_numpy() - lonlat[2]) / res).astype(np.int64)
+            it = tdf["month"].to_numpy().astype(np.int64) - 1
+            if yearly:
+                it = it + 12 * (tdf["year"].to_numpy().astype(np.int64) - year0)
+            # Records on the upper bounds belong to the last cells
+            key = (it * ny + np.minimum(iy, ny - 1)) * nx + np.minimum(ix, nx - 1)
+            for name in series:
+                values = tdf[name].to_numpy(dtype=np.float64)
+                ok = np.isfinite(values)
+                moments[name] += [
+                    np.bincount(key[ok], minlength=size),
+                    np.bincount(key[ok], weights=values[ok], minlength=size),
+                    np.bincount(key[ok], weights=values[ok] ** 2, minlength=size),
+                ]
+
+        data = {}
+        for name in series:
+            count, total, squares = moments[name]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = total / count
+                std = np.sqrt(np.maximum(squares - total * mean, 0.0) / (count - 1))
+            std[count == 1] = np.nan
+            for key, values in zip(["mean", "std", "count"], [mean, std, count]):
+                values = values.reshape(shape)
+                if not yearly:
+                    values = values[0]
+                data[name + "_" + key] = values
+            data[name + "_count"] = data[name + "_count"].astype(np.int64)
+
+        try:
+            import xarray as xr
+        except ImportError:
+            self.climatology = dict(coords, **data)
         else:
-            tdf = (
-                self.timeseries.groupby(["year", "month"])[[series]]
-                .apply(np.mean)
-                .reset_index()
+            self.climatology = xr.Dataset(
+                {key: (dims, values) for key, values in data.items()}, coords=coords
             )
 
-        dftmp = tdf.drop(tdf[tdf.year < time[0]].index)
-        dftmp = dftmp.drop(dftmp[dftmp.year > time[1]].index)
-
-        dfseason = dftmp.pivot(index="year", columns="month", values=series)
-
-        dfseason = dfseason.rename(
-            columns={
-                1: "January",
-                2: "February",
-                3: "March",
-                4: "April",
-                5: "May",
-                6: "June",
-                7: "July",
-                8: "August",
-                9: "September",
-                10: "October",
-                11: "November",
-                12: "December",
-            }
+        return self.climatology
+
+    def _records(self, columns, time=None, lonlat=None):
+        """
+        Iterates over the records of the time series recorded during a set of
+        years and located inside a geographical box, by blocks when the time
+        series is read from an on-disk store.
+
+        Args:
+            columns (list): columns to extract
+            time (list): first and last years to consider, the entire record is used if set to None [default: None]
+            lonlat (list): geographical extent following the convention [lon min,lon max,lat min,lat max], all records are used if set to None [default: None]
+
+        Yields:
+            tdf (dataframe): pandas dataframe containing the selected records, with at least the requested columns
+        """
+
+        # Extract the considered years from the date-sorted time series
+        if time is None:
+            start, end = None, None
+        else:
+            start = pd.Timestamp(time[0], 1, 1)
+            end = pd.Timestamp(time[1] + 1, 1, 1)
+
+        if self.timeseries is not None:
+            # The region mask of the in-memory time series is cached
+            i0, i1 = self._bounds(start, end)
+            tdf = self.timeseries.iloc[i0:i1]
+            if lonlat is not None:
+                tdf = tdf[self._regionMask(lonlat)[i0:i1]]
+            yield tdf
+            return
+
+        blocks = self.tsstore.blocks(
+            start, end, columns=list(dict.fromkeys(["lon", "lat"] + columns))
         )
+        for tdf in blocks:
+            if lonlat is not None:
+                # Dates are not unique so rows are selected by mask, not by label
+                tdf = tdf[
+                    (tdf.lon >= lonlat[0])
+                    & (tdf.lon <= lonlat[1])
+                    & (tdf.lat >= lonlat[2])
+                    & (tdf.lat <= lonlat[3])
+                ]
+            yield tdf
+
+    def _seasonalStatistics(self, series, time=None, lonlat=None):
+        """
+        Computes the monthly mean, standard deviation and number of records
+        of several variables of the time series in a single grouped
+        aggregation.
+
+        Args:
+            series (list): names of the variables
+            time (list): first and last years to consider, the entire record is used if set to None [default: None]
+            lonlat (list): geographical extent following the convention [lon min,lon max,lat min,lat max], all records are used if set to None [default: None]
 
-        if plot:
-            fig, ax = plt.subplots(figsize=(8, 8))
-            sns.heatmap(
-                dfseason, annot=True, fmt=".2f", cmap="YlGnBu", linewidths=1, cbar=False
+        Returns:
+            stats (dataframe): pandas dataframe with one row per variable, year and month and the columns *variable*, *year*, *month*, *mean*, *std* & *count*
+        """
+
+        # Monthly sums and counts are accumulated over the blocks of records
+        sums = []
+        for tdf in self._records(["year", "month"] + series, time, lonlat):
+            values = tdf[series].astype(np.float64)
+            values = pd.concat([values, values.pow(2).add_suffix("_squares")], axis=1)
+            sums.append(
+                values.groupby([tdf["year"], tdf["month"]]).agg(["sum", "count"])
             )
-            if series == "wh":
-                ax.set_title("Significant Wave Height (m)", fontsize=12)
-            if series == "period":
-                ax.set_title("Wave Period (s)", fontsize=12)
-            if series == "power":
-                ax.set_title("Wave Power (kW/m)", fontsize=12)
-            if series == "energy":
-                ax.set_title("Wave Energy (J/m2)", fontsize=12)
-            if series == "speed":
-                ax.set_title("Wave Speed (m/s)", fontsize=12)
-            ax.set_ylabel("Years", fontsize=12)
-            ax.set_xlabel("Months", fontsize=11)
-            ax.yaxis.set_tick_params(labelsize=10)
-            ax.xaxis.set_tick_params(labelsize=10, rotation=45)
-            plt.tight_layout()
-            plt.show()
+        columns = ["variable", "year", "month", "mean", "std", "count"]
+        if len(sums) == 0:
+            return pd.DataFrame(columns=columns)
+        tot = pd.concat(sums).groupby(level=["year", "month"]).sum()
+
+        # Moments of each variable, the standard deviation uses n - 1
+        stats = []
+        for name in series:
+            total = tot[(name, "sum")].to_numpy()
+            count = tot[(name, "count")].to_numpy()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = total / count
+                squares = tot[(name + "_squares", "sum")].to_numpy()
+                std = np.sqrt(np.maximum(squares - total * mean, 0.0) / (count - 1))
+            stats.append(
+                pd.DataFrame(
+                    {
+                        "variable": name,
+                        "year": tot.index.get_level_values("year"),
+                        "month": tot.index.get_level_values("month"),
+                        "mean": mean,
+                        "std": std,
+                        "count": count,
+                    },
+                    columns=columns,
+                )
+            )
+
+        return pd.concat(stats, ignore_index=True)
+
+    def _plotSeasonal(self, dfseason, series, fsave=None, show=True):
+        """
+        Plots the seasonal characteristics of a variable as a heatmap, a box
+        plot and a standard deviation graph (see
+        *computeSeasonalCharacteristics*).
+
+        Args:
+            dfseason (dataframe): monthly means of the variable with one row per year and one column per month
+            series (str): name of the variable
+            fsave (str): saved image name without extension that will be written as a PNG file [default: None]
+            show (bool): show the figures and print information [default: True]
+
+        Returns:
+            figures (list): matplotlib figure and axes of each graph
+        """
+
+        import seaborn as sns
+
+        plt = render.pyplot()
+        figures = []
+        fig, ax = plt.subplots(figsize=(8, 8))
+        sns.heatmap(
+            dfseason,
+            annot=True,
+            fmt=".2f",
+            cmap="YlGnBu",
+            linewidths=1,
+            cbar=False,
+            ax=ax,
+        )
+        if series == "wh":
+            ax.set_title("Significant Wave Height (m)", fontsize=12)
+        if series == "period":
+            ax.set_title("Wave Period (s)", fontsize=12)
+        if series == "power":
+            ax.set_title("Wave Power (kW/m)", fontsize=12)
+        if series == "energy":
+            ax.set_title("Wave Energy (J/m2)", fontsize=12)
+        if series == "speed":
+            ax.set_title("Wave Speed (m/s)", fontsize=12)
+        ax.set_ylabel("Years", fontsize=12)
+        ax.set_xlabel("Months", fontsize=11)
+        ax.yaxis.set_tick_params(labelsize=10)
+        ax.xaxis.set_tick_params(labelsize=10, rotation=45)
+        fig.tight_layout()
+        figures.append((fig, ax))
 
-            if fsave is not None:
-                fig.savefig(fsave + "_" + series + "_heatmap", dpi=100)
+        if fsave is not None:
+            fig.savefig(fsave + "_" + series + "_heatmap", dpi=100)
+            if show:
                 print("Figure saved: ", fsave + "_" + series + "_heatmap")
 
-            fig, ax = plt.subplots(figsize=(8, 5))
-            sns.boxplot(data=dfseason, palette="Spectral")
-            ax.set_title("Monthly distributions for chosen time interval", fontsize=12)
-            if series == "wh":
-                ax.set_ylabel("Significant Wave Height (m)", fontsize=12)
-            if series == "period":
-                ax.set_ylabel("Wave Period (s)", fontsize=12)
-            if series == "power":
-                ax.set_ylabel("Wave Power (kW/m)", fontsize=12)
-            if series == "energy":
-                ax.set_ylabel("Wave Energy (J/m2)", fontsize=12)
-            if series == "speed":
-                ax.set_ylabel("Wave Speed (m/s)", fontsize=12)
-            ax.set_xlabel("Months", fontsize=11)
-            ax.yaxis.set_tick_params(labelsize=10)
-            ax.xaxis.set_tick_params(labelsize=10, rotation=45)
-            plt.tight_layout()
+        if show:
             plt.show()
 
-            if fsave is not None:
-                fig.savefig(fsave + "_" + series + "_distribution", dpi=100)
+        fig, ax = plt.subplots(figsize=(8, 5))
+        sns.boxplot(data=dfseason, palette="Spectral", ax=ax)
+        ax.set_title("Monthly distributions for chosen time interval", fontsize=12)
+        if series == "wh":
+            ax.set_ylabel("Significant Wave Height (m)", fontsize=12)
+        if series == "period":
+            ax.set_ylabel("Wave Period (s)", fontsize=12)
+        if series == "power":
+            ax.set_ylabel("Wave Power (kW/m)", fontsize=12)
+        if series == "energy":
+            ax.set_ylabel("Wave Energy (J/m2)", fontsize=12)
+        if series == "speed":
+            ax.set_ylabel("Wave Speed (m/s)", fontsize=12)
+        ax.set_xlabel("Months", fontsize=11)
+        ax.yaxis.set_tick_params(labelsize=10)
+        ax.xaxis.set_tick_params(labelsize=10, rotation=45)
+        fig.tight_layout()
+        figures.append((fig, ax))
+
+        if fsave is not None:
+            fig.savefig(fsave + "_" + series + "_distribution", dpi=100)
+            if show:
                 print("Figure saved: ", fsave + "_" + series + "_distribution")
 
-            monthly_sd = dfseason.std(axis=0)
-            fig, ax = plt.subplots(figsize=(8, 4))
-            monthly_sd.plot(
-                color="blue", marker="o", linestyle="dashed", linewidth=2, markersize=12
-            )
-            if series == "wh":
-                ax.set_title(
-                    "Standard deviation in significant wave height \
+        if show:
+            plt.show()
+
+        monthly_sd = dfseason.std(axis=0)
+        fig, ax = plt.subplots(figsize=(8, 4))
+        monthly_sd.plot(
+            ax=ax,
+            color="blue",
+            marker="o",
+            linestyle="dashed",
+            linewidth=2,
+            markersize=12,
+        )
+        if series == "wh":
+            ax.set_title(
+                "Standard deviation in significant wave height \
                              for chosen time interval",
-                    fontsize=12,
-                )
-            if series == "period":
-                ax.set_title(
-                    "Standard deviation in wave period for chosen \
+                fontsize=12,
+            )
+        if series == "period":
+            ax.set_title(
+                "Standard deviation in wave period for chosen \
                              time interval",
-                    fontsize=12,
-                )
-            if series == "power":
-                ax.set_title(
-                    "Standard deviation in wave power for chosen \
+                fontsize=12,
+            )
+        if series == "power":
+            ax.set_title(
+                "Standard deviation in wave power for chosen \
                              time interval",
-                    fontsize=12,
-                )
-            if series == "energy":
-                ax.set_title(
-                    "Standard deviation in wave energy for chosen \
+                fontsize=12,
+            )
+        if series == "energy":
+            ax.set_title(
+                "Standard deviation in wave energy for chosen \
                              time interval",
-                    fontsize=12,
-                )
-            if series == "speed":
-                ax.set_title(
-                    "Standard deviation in wave speed for chosen \
+                fontsize=12,
+            )
+        if series == "speed":
+            ax.set_title(
+                "Standard deviation in wave speed for chosen \
                              time interval",
-                    fontsize=12,
-                )
-            ax.set_ylabel("Standard deviation", fontsize=12)
-            ax.set_xlabel("Months", fontsize=11)
-            ax.yaxis.set_tick_params(labelsize=10)
-            ax.xaxis.set_tick_params(labelsize=10, rotation=45)
-            plt.tight_layout()
-            plt.show()
+                fontsize=12,
+            )
+        ax.set_ylabel("Standard deviation", fontsize=12)
+        ax.set_xlabel("Months", fontsize=11)
+        ax.yaxis.set_tick_params(labelsize=10)
+        ax.xaxis.set_tick_params(labelsize=10, rotation=45)
+        fig.tight_layout()
+        figures.append((fig, ax))
 
-            if fsave is not None:
-                fig.savefig(fsave + "_" + series + "_sd", dpi=100)
+        if fsave is not None:
+            fig.savefig(fsave + "_" + series + "_sd", dpi=100)
+            if show:
                 print("Figure saved: ", fsave + "_" + series + "_sd")
 
-            if series == "wh":
-                wh_stack = dfseason.stack()
-                seasonal_trend = mk.seasonal_test(wh_stack, period=12)
-                print(" ")
-                print(
-                    "Change in yearly wave height trend accounting \
-                      for seasonality:"
-                )
-                print("    +           trend: ", seasonal_trend.trend)
-                print(
-                    "    +    slope (cm/y): ",
-                    str(round(seasonal_trend.slope * 100.0, 2)),
-                )
+        if show:
+            plt.show()
 
-        dfseason["mean"] = dfseason.mean(axis=1)
+        if series == "wh" and show:
+            import pymannkendall as mk
 
-        return dfseason
+            wh_stack = dfseason.stack()
+            seasonal_trend = mk.seasonal_test(wh_stack, period=12)
+            print(" ")
+            print(
+                "Change in yearly wave height trend accounting \
+                      for seasonality:"
+            )
+            print("    +           trend: ", seasonal_trend.trend)
+            print(
+                "    +    slope (cm/y): ",
+                str(round(seasonal_trend.slope * 100.0, 2)),
+            )
+
+        return figures
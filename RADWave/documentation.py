@@ -15,9 +15,6 @@ You should have received a copy of the GNU Lesser General Public License
 along with RADWave.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import pkg_resources as _pkg_resources
-from distutils import dir_util as _dir_util
-
 
 def install_documentation(path="./RADWave-Notebooks"):
     """Install the example notebooks for RADWave in the given location
@@ -28,6 +25,10 @@ def install_documentation(path="./RADWave-Notebooks"):
     notebooks.
     """
 
+    # Imported here as pkg_resources is slow to import
+    import pkg_resources as _pkg_resources
+    from distutils import dir_util as _dir_util
+
     # Question - overwrite or not ? shutils fails if directory exists.
 
     Notebooks_Path = _pkg_resources.resource_filename('RADWave', 'Notebooks')
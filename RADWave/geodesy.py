@@ -0,0 +1,268 @@
+#!/usr/bin/python
+# -*- mode: python; coding: utf-8 -*
+# Copyright (c) 2020 Tristan Salles
+# Licensed under the GNU LGPL Version 3
+
+import numpy as np
+
+# Mean Earth radius (km)
+EARTH_RADIUS = 6371.0088
+
+# WGS-84 ellipsoid semi-major axis (km) and flattening
+WGS84_A = 6378.137
+WGS84_F = 1.0 / 298.257223563
+
+
+def haversine(lon1, lat1, lon2, lat2, radius=EARTH_RADIUS):
+    """
+    Great-circle distance between two sets of points on a sphere computed
+    with the haversine formula.
+
+    Args:
+        lon1 (numpy array): longitudes of the first set of points in degrees
+        lat1 (numpy array): latitudes of the first set of points in degrees
+        lon2 (numpy array): longitudes of the second set of points in degrees
+        lat2 (numpy array): latitudes of the second set of points in degrees
+        radius (float): radius of the sphere in kilometres [default: 6371.0088]
+
+    Returns:
+        dist (numpy array): great-circle distances (km)
+    """
+
+    lon1, lat1, lon2, lat2 = [
+        np.radians(x) for x in np.broadcast_arrays(lon1, lat1, lon2, lat2)
+    ]
+
+    hav = (
+        np.sin(0.5 * (lat2 - lat1)) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin(0.5 * (lon2 - lon1)) ** 2
+    )
+    dist = 2.0 * radius * np.arcsin(np.sqrt(np.clip(hav, 0.0, 1.0)))
+
+    return dist
+
+
+def vincenty(lon1, lat1, lon2, lat2, maxiter=200, tol=1.0e-12):
+    """
+    Geodesic distance between two sets of points on the WGS-84 ellipsoid
+    computed with the inverse formula of Vincenty (1975), evaluated on all
+    pairs at once.
+
+    The formula is accurate to a fraction of a millimetre. It does not
+    converge for nearly antipodal points: those pairs are computed with the
+    algorithm of Karney (2013) from the *geographiclib* package (installed
+    with geopy).
+
+    Vincenty T., 1975: Direct and inverse solutions of geodesics on the
+    ellipsoid with application of nested equations - Survey Review 23(176),
+    88–93.
+
+    Args:
+        lon1 (numpy array): longitudes of the first set of points in degrees
+        lat1 (numpy array): latitudes of the first set of points in degrees
+        lon2 (numpy array): longitudes of the second set of points in degrees
+        lat2 (numpy array): latitudes of the second set of points in degrees
+        maxiter (int): maximum number of iterations [default: 200]
+        tol (float): convergence tolerance on the longitude on the auxiliary sphere (radians) [default: 1e-12]
+
+    Returns:
+        dist (numpy array): geodesic distances (km)
+    """
+
+    lon1, lat1, lon2, lat2 = np.broadcast_arrays(lon1, lat1, lon2, lat2)
+    shape = lon1.shape
+    lon1, lat1, lon2, lat2 = [np.ravel(x) for x in (lon1, lat1, lon2, lat2)]
+    a = WGS84_A
+    f = WGS84_F
+    b = a * (1.0 - f)
+
+    L = np.radians(lon2 - lon1)
+    U1 = np.arctan((1.0 - f) * np.tan(np.radians(lat1)))
+    U2 = np.arctan((1.0 - f) * np.tan(np.radians(lat2)))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+
+    nb = len(L)
+    lam = L.copy()
+    sinsig = np.zeros(nb)
+    cossig = np.zeros(nb)
+    sig = np.zeros(nb)
+    cos2alpha = np.zeros(nb)
+    cos2sigm = np.zeros(nb)
+    converged = np.zeros(nb, dtype=bool)
+
+    # Iterations are only performed on the pairs that have not converged
+    active = np.arange(nb)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for it in range(maxiter):
+            if len(active) == 0:
+                break
+            lamk = lam[active]
+            s1, c1 = sinU1[active], cosU1[active]
+            s2, c2 = sinU2[active], cosU2[active]
+            sinlam = np.sin(lamk)
+            coslam = np.cos(lamk)
+            sinsigk = np.sqrt((c2 * sinlam) ** 2 + (c1 * s2 - s1 * c2 * coslam) ** 2)
+            cossigk = s1 * s2 + c1 * c2 * coslam
+            sigk = np.arctan2(sinsigk, cossigk)
+            sinalpha = np.where(sinsigk > 0.0, c1 * c2 * sinlam / sinsigk, 0.0)
+            cos2alphak = 1.0 - sinalpha ** 2
+            # Equatorial lines have cos2alpha = 0
+            cos2sigmk = np.where(
+                cos2alphak > 0.0, cossigk - 2.0 * s1 * s2 / cos2alphak, 0.0
+            )
+            C = f / 16.0 * cos2alphak * (4.0 + f * (4.0 - 3.0 * cos2alphak))
+            lam[active] = L[active] + (1.0 - C) * f * sinalpha * (
+                sigk
+                + C
+                * sinsigk
+                * (cos2sigmk + C * cossigk * (-1.0 + 2.0 * cos2sigmk ** 2))
+            )
+            sinsig[active] = sinsigk
+            cossig[active] = cossigk
+            sig[active] = sigk
+            cos2alpha[active] = cos2alphak
+            cos2sigm[active] = cos2sigmk
+            done = np.abs(lam[active] - lamk) < tol
+            converged[active[done]] = True
+            active = active[~done]
+
+        u2 = cos2alpha * (a ** 2 - b ** 2) / b ** 2
+        A = 1.0 + u2 / 16384.0 * (4096.0 + u2 * (-768.0 + u2 * (320.0 - 175.0 * u2)))
+        B = u2 / 1024.0 * (256.0 + u2 * (-128.0 + u2 * (74.0 - 47.0 * u2)))
+        dsig = (
+            B
+            * sinsig
+            * (
+                cos2sigm
+                + B
+                / 4.0
+                * (
+                    cossig * (-1.0 + 2.0 * cos2sigm ** 2)
+                    - B
+                    / 6.0
+                    * cos2sigm
+                    * (-3.0 + 4.0 * sinsig ** 2)
+                    * (-3.0 + 4.0 * cos2sigm ** 2)
+                )
+            )
+        )
+        dist = b * A * (sig - dsig)
+
+    # Nearly antipodal points are solved with Karney algorithm
+    failed = ~(converged & np.isfinite(dist))
+    if failed.any():
+        from geographiclib.geodesic import Geodesic
+
+        for k in np.nonzero(failed)[0]:
+            dist[k] = (
+                Geodesic.WGS84.Inverse(lat1[k], lon1[k], lat2[k], lon2[k])["s12"]
+                / 1000.0
+            )
+
+    return dist.reshape(shape)
+
+
+def bearing(lon1, lat1, lon2, lat2):
+    """
+    Initial bearing of the great circles going from a first set of points to
+    a second set of points.
+
+    Args:
+        lon1 (numpy array): longitudes of the first set of points in degrees
+        lat1 (numpy array): latitudes of the first set of points in degrees
+        lon2 (numpy array): longitudes of the second set of points in degrees
+        lat2 (numpy array): latitudes of the second set of points in degrees
+
+    Returns:
+        azimuth (numpy array): bearings in degrees clockwise from north in [0, 360)
+    """
+
+    lon1, lat1, lon2, lat2 = [
+        np.radians(x) for x in np.broadcast_arrays(lon1, lat1, lon2, lat2)
+    ]
+
+    dlon = lon2 - lon1
+    y = np.sin(dlon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+
+    return np.mod(np.degrees(np.arctan2(y, x)), 360.0)
+
+
+def greatCircle(lon1, lat1, lon2, lat2, fraction):
+    """
+    Intermediate points located at a given fraction of the great circles
+    going from a first set of points to a second set of points.
+
+    The returned longitudes are within 180 degrees of the first set of
+    longitudes, so that tracks crossing the 180 degree meridian remain
+    continuous.
+
+    Args:
+        lon1 (numpy array): longitudes of the first set of points in degrees
+        lat1 (numpy array): latitudes of the first set of points in degrees
+        lon2 (numpy array): longitudes of the second set of points in degrees
+        lat2 (numpy array): latitudes of the second set of points in degrees
+        fraction (numpy array): fraction of the great-circle arcs between 0 and 1
+
+    Returns:
+        lon (numpy array): longitudes of the intermediate points in degrees
+        lat (numpy array): latitudes of the intermediate points in degrees
+    """
+
+    lon1, lat1, lon2, lat2, fraction = np.broadcast_arrays(
+        lon1, lat1, lon2, lat2, fraction
+    )
+    dist = haversine(lon1, lat1, lon2, lat2, radius=1.0)
+    rlon1, rlat1, rlon2, rlat2 = [np.radians(x) for x in (lon1, lat1, lon2, lat2)]
+
+    # Weights of the end points (linear for coincident points)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sindist = np.sin(dist)
+        small = sindist < 1.0e-12
+        a = np.where(small, 1.0 - fraction, np.sin((1.0 - fraction) * dist) / sindist)
+        b = np.where(small, fraction, np.sin(fraction * dist) / sindist)
+
+    x = a * np.cos(rlat1) * np.cos(rlon1) + b * np.cos(rlat2) * np.cos(rlon2)
+    y = a * np.cos(rlat1) * np.sin(rlon1) + b * np.cos(rlat2) * np.sin(rlon2)
+    z = a * np.sin(rlat1) + b * np.sin(rlat2)
+    lat = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    lon = np.degrees(np.arctan2(y, x))
+    lon = lon1 + np.mod(lon - lon1 + 180.0, 360.0) - 180.0
+
+    return lon, lat
+
+
+def geodesicDistance(lon1, lat1, lon2, lat2, method="vincenty"):
+    """
+    Distance between two sets of geographical coordinates computed on numpy
+    arrays (the arrays are broadcast against each other).
+
+    The choices of method are:
+
+        * 'vincenty': geodesic distance on the WGS-84 ellipsoid, with an accuracy comparable to *geopy.distance.geodesic*
+        * 'haversine': great-circle distance on a sphere of radius 6371.0088 km, faster but with errors up to 0.5%
+
+    Args:
+        lon1 (numpy array): longitudes of the first set of points in degrees
+        lat1 (numpy array): latitudes of the first set of points in degrees
+        lon2 (numpy array): longitudes of the second set of points in degrees
+        lat2 (numpy array): latitudes of the second set of points in degrees
+        method (str): distance computation method, choices are 'vincenty' and 'haversine' [default: 'vincenty']
+
+    Returns:
+        dist (numpy array): distances (km)
+    """
+
+    lon1 = np.asarray(lon1, dtype=np.float64)
+    lat1 = np.asarray(lat1, dtype=np.float64)
+    lon2 = np.asarray(lon2, dtype=np.float64)
+    lat2 = np.asarray(lat2, dtype=np.float64)
+
+    if method == "vincenty":
+        return vincenty(lon1, lat1, lon2, lat2)
+    elif method == "haversine":
+        return haversine(lon1, lat1, lon2, lat2)
+    else:
+        raise ValueError("Not recognised distance method... choices are vincenty \
+                         and haversine")
@@ -0,0 +1,816 @@
+#!/usr/bin/python
+# -*- mode: python; coding: utf-8 -*
+# Copyright (c) 2020 Tristan Salles
+# Licensed under the GNU LGPL Version 3
+
+import os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+
+# Cartopy, shapely and matplotlib are imported by the functions using them,
+# so that importing RADWave for the analysis functions stays fast
+
+# Set once pyplot has been configured for RADWave figures
+_pyplotReady = False
+
+
+def pyplot():
+    """
+    Imports matplotlib pyplot, the pandas date converters and the RADWave
+    figure settings are registered on the first call.
+
+    Returns:
+        plt (module): matplotlib.pyplot
+    """
+
+    global _pyplotReady
+    import matplotlib.pyplot as plt
+
+    if not _pyplotReady:
+        from pandas.plotting import register_matplotlib_converters
+
+        register_matplotlib_converters()
+        plt.rcParams["mathtext.fontset"] = "cm"
+        _pyplotReady = True
+
+    return plt
+
+
+# Rendered map backgrounds, keyed by extent, resolution and image width
+_basemaps = {}
+_maxbasemaps = 8
+
+
+def basemap(extent, resolution="10m", width=2000):
+    """
+    Returns an image of the water, land and coastlines of a geographical
+    extent. Rasterising the land and coastlines is the most expensive part
+    of drawing a map, the image is therefore rendered once for each extent,
+    resolution and width and kept in memory for the following maps.
+
+    Args:
+        extent (list): geographical extent of the map following the convention [lon min,lon max,lat min,lat max]
+        resolution (str): resolution of the coastlines ('10m', '50m' or '110m'), no land nor coastline are drawn when set to None [default: '10m']
+        width (int): width of the image in pixels [default: 2000]
+
+    Returns:
+        image (numpy array): RGBA image of shape (height, width, 4)
+    """
+
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    extent = tuple(float(x) for x in extent)
+    key = (extent, resolution, int(width))
+    if key not in _basemaps:
+        dpi = 100.0
+        aspect = (extent[3] - extent[2]) / (extent[1] - extent[0])
+        fig = Figure(figsize=(width / dpi, width * aspect / dpi), dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_axes([0, 0, 1, 1], projection=ccrs.PlateCarree())
+        ax.set_extent(extent, crs=ccrs.PlateCarree())
+        ax.set_facecolor(cfeature.COLORS["water"])
+        if resolution is not None:
+            ax.add_feature(cfeature.LAND)
+            ax.coastlines(resolution=resolution)
+        ax.spines["geo"].set_visible(False)
+        canvas.draw()
+        if len(_basemaps) >= _maxbasemaps:
+            del _basemaps[next(iter(_basemaps))]
+        _basemaps[key] = np.asarray(canvas.buffer_rgba()).copy()
+
+    return _basemaps[key]
+
+
+def clearBasemaps():
+    """
+    Empties the cache of map backgrounds.
+    """
+
+    _basemaps.clear()
+
+
+def geoAxes(fig, extent, resolution="10m", cache=True):
+    """
+    Adds to a figure a map (GeoAxes) of a given geographical extent, with
+    the land and coastlines as background.
+
+    Args:
+        fig (Figure): matplotlib figure
+        extent (list): geographical extent of the map following the convention [lon min,lon max,lat min,lat max]
+        resolution (str): resolution of the coastlines ('10m', '50m' or '110m'), no land nor coastline are drawn when set to None [default: '10m']
+        cache (bool): draw the land and coastlines from the cached image of the extent (see *basemap*) instead of rasterising them again [default: True]
+
+    Returns:
+        ax (GeoAxes): map axes
+    """
+
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
+    extent = [extent[0], extent[1], extent[2], extent[3]]
+    ax = fig.add_subplot(1, 1, 1, projection=ccrs.PlateCarree())
+    ax.set_facecolor(cfeature.COLORS["water"])
+    if resolution is not None:
+        if cache:
+            ax.imshow(
+                basemap(extent, resolution),
+                origin="upper",
+                extent=extent,
+                transform=ccrs.PlateCarree(),
+                interpolation="antialiased",
+                zorder=0,
+            )
+        else:
+            ax.add_feature(cfeature.LAND)
+            ax.coastlines(resolution=resolution)
+    ax.set_extent(extent, crs=ccrs.PlateCarree())
+
+    return ax
+
+
+def trackCollection(lon, lat, **kwargs):
+    """
+    Builds a single collection holding all the segments of a track, so that
+    the track is drawn at once whatever its number of positions.
+
+    Args:
+        lon (numpy array): longitudes of the track positions
+        lat (numpy array): latitudes of the track positions
+        kwargs: properties of the collection (such as color, linewidth, alpha or zorder)
+
+    Returns:
+        lines (LineCollection): track segments in geographical coordinates
+    """
+
+    import cartopy.crs as ccrs
+    from matplotlib.collections import LineCollection
+
+    xy = np.column_stack([np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)])
+    segments = np.stack([xy[:-1], xy[1:]], axis=1)
+
+    return LineCollection(segments, transform=ccrs.PlateCarree(), **kwargs)
+
+
+def densityGrid(lon, lat, extent, nx=400, values=None):
+    """
+    Bins a set of points onto a regular grid covering a geographical extent.
+
+    Args:
+        lon (numpy array): longitudes of the points
+        lat (numpy array): latitudes of the points
+        extent (list): geographical extent of the grid following the convention [lon min,lon max,lat min,lat max]
+        nx (int): number of cells along the longitude, the number of cells along the latitude follows the aspect of the extent [default: 400]
+        values (numpy array): values of the points averaged in each cell, the number of points is returned when set to None [default: None]
+
+    Returns:
+        grid (numpy masked array): number of points (or mean value) of each cell with shape (ny, nx), empty cells are masked
+    """
+
+    lon = np.asarray(lon, dtype=np.float64).ravel()
+    lat = np.asarray(lat, dtype=np.float64).ravel()
+    dx = (extent[1] - extent[0]) / nx
+    ny = max(1, int(round((extent[3] - extent[2]) / dx)))
+    dy = (extent[3] - extent[2]) / ny
+
+    ix = np.floor((lon - extent[0]) / dx).astype(np.int64)
+    iy = np.floor((lat - extent[2]) / dy).astype(np.int64)
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    ids = iy[inside] * nx + ix[inside]
+
+    count = np.bincount(ids, minlength=nx * ny).reshape(ny, nx)
+    if values is None:
+        return np.ma.masked_equal(count, 0)
+
+    values = np.asarray(values, dtype=np.float64).ravel()[inside]
+    total = np.bincount(ids, weights=values, minlength=nx * ny).reshape(ny, nx)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.ma.masked_where(count == 0, total / count)
+
+
+def _minMax(y, npts):
+    """
+    Min-max decimation: keeps the lowest and highest value of regular
+    buckets of consecutive points.
+
+    Args:
+        y (numpy array): values of the points
+        npts (int): maximum number of points to keep
+
+    Returns:
+        ids (numpy array): sorted indices of the points to keep
+    """
+
+    nb = len(y)
+    nbucket = max(1, (npts - 2) // 2)
+    size = -(-nb // nbucket)
+    pad = np.full(nbucket * size - nb, np.nan)
+    buckets = np.concatenate([y, pad]).reshape(nbucket, size)
+
+    # Missing values are never selected
+    start = np.arange(nbucket) * size
+    imin = start + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    imax = start + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    ids = np.unique(np.concatenate([[0, nb - 1], imin, imax]))
+    ids = ids[ids < nb]
+
+    return ids[~np.isnan(y[ids])]
+
+
+def _lttb(x, y, npts):
+    """
+    Largest-Triangle-Three-Buckets decimation: keeps in each bucket the point
+    forming the largest triangle with the point kept in the previous bucket
+    and the average of the next bucket.
+
+    Args:
+        x (numpy array): abscissa of the points (sorted)
+        y (numpy array): values of the points
+        npts (int): maximum number of points to keep
+
+    Returns:
+        ids (numpy array): sorted indices of the points to keep
+    """
+
+    nb = len(y)
+    edges = np.linspace(1, nb - 1, npts - 1).astype(np.int64)
+    ok = ~np.isnan(y)
+    ids = np.zeros(npts, dtype=np.int64)
+    ids[-1] = nb - 1
+    last = 0
+    for k in range(npts - 2):
+        i0, i1 = edges[k], edges[k + 1]
+        if not ok[i0:i1].any():
+            # Buckets of missing values are skipped
+            ids[k + 1] = last
+            continue
+        j1 = edges[k + 2] if k + 2 < npts - 1 else nb
+        nxt = slice(i1, j1)
+        nok = ok[nxt]
+        if nok.any():
+            xn, yn = x[nxt][nok].mean(), y[nxt][nok].mean()
+        else:
+            xn, yn = x[j1 - 1], y[last]
+        area = np.abs(
+            (x[last] - xn) * (y[i0:i1] - y[last])
+            - (x[last] - x[i0:i1]) * (yn - y[last])
+        )
+        area[~ok[i0:i1]] = -1.0
+        last = i0 + int(np.argmax(area))
+        ids[k + 1] = last
+
+    return np.unique(ids)
+
+
+def decimate(x, y, npts=5000, method="minmax"):
+    """
+    Selects a subset of the points of a long series that preserves its
+    visual aspect (and in particular its peaks) when plotted.
+
+    The available methods are:
+
+        * 'minmax': lowest and highest value of regular buckets of points, which keeps every extreme of the series
+        * 'lttb': Largest-Triangle-Three-Buckets, one point per bucket chosen to preserve the shape of the line
+
+    Args:
+        x (numpy array): abscissa of the points (sorted), dates are accepted
+        y (numpy array): values of the points
+        npts (int): maximum number of points to keep [default: 5000]
+        method (str): decimation method either 'minmax' or 'lttb' [default: 'minmax']
+
+    Returns:
+        ids (numpy array): sorted indices of the points to keep
+    """
+
+    y = np.asarray(y, dtype=np.float64)
+    if npts < 3:
+        raise ValueError("Error npts needs to be at least 3")
+    if len(y) <= npts:
+        return np.arange(len(y))
+
+    if method == "minmax":
+        return _minMax(y, npts)
+    elif method == "lttb":
+        x = np.asarray(x)
+        if np.issubdtype(x.dtype, np.datetime64):
+            x = x.astype("datetime64[ns]").astype(np.int64)
+        return _lttb(x.astype(np.float64), y, npts)
+
+    raise ValueError("Not recognised decimation method... choices are minmax, lttb")
+
+
+def _cycloneMap(fig, clon, clat, extent, addcity, markersize, resolution, cache):
+    """
+    Draws the static part of the cyclone maps: background, cyclone track,
+    city marker and gridlines.
+
+    Args:
+        fig (Figure): matplotlib figure
+        clon (numpy array): longitudes of the cyclone track
+        clat (numpy array): latitudes of the cyclone track
+        extent (list): geographical extent of the figure following the convention [lon min,lon max,lat min,lat max]
+        addcity (list): defined a specific location using the following convention ['City Name', longitude, latitude]
+        markersize (int): size of the markers used to specify cyclone tracks
+        resolution (str): resolution of the coastlines, no land nor coastline are drawn when set to None
+        cache (bool): draw the land and coastlines from the cached image of the extent
+
+    Returns:
+        ax (GeoAxes): map axes
+    """
+
+    import cartopy.crs as ccrs
+    from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
+    from matplotlib.transforms import offset_copy
+
+    ax = geoAxes(fig, extent, resolution, cache)
+
+    geodetic_transform = ccrs.PlateCarree()._as_mpl_transform(ax)
+    text_transform = offset_copy(geodetic_transform, units="dots", x=-12)
+
+    # Cyclone track
+    ax.add_collection(
+        trackCollection(clon, clat, colors="k", linewidths=1, alpha=1.0, zorder=1)
+    )
+    ax.scatter(
+        [clon],
+        [clat],
+        marker="o",
+        color="w",
+        s=markersize * 0.5,
+        edgecolor="black",
+        linewidth=0.5,
+        alpha=1,
+        transform=ccrs.PlateCarree(),
+        zorder=5,
+    )
+
+    # Add a marker for a given city.
+    if addcity is not None:
+        ax.scatter(
+            addcity[1],
+            addcity[2],
+            marker="o",
+            color="navy",
+            s=100,
+            edgecolor="black",
+            linewidth=0.5,
+            alpha=0.7,
+            transform=ccrs.PlateCarree(),
+        )
+        ax.text(
+            addcity[1],
+            addcity[2],
+            addcity[0],
+            verticalalignment="center",
+            horizontalalignment="right",
+            transform=text_transform,
+            bbox=dict(facecolor="white", alpha=0.5, boxstyle="round"),
+        )
+
+    gl = ax.gridlines(
+        crs=ccrs.PlateCarree(),
+        draw_labels=True,
+        linewidth=0.5,
+        color="k",
+        alpha=0.5,
+        linestyle="--",
+    )
+    gl.top_labels = False
+    gl.left_labels = False
+    gl.xformatter = LONGITUDE_FORMATTER
+    gl.yformatter = LATITUDE_FORMATTER
+
+    return ax
+
+
+def _cycloneTitle(centre, date):
+    """
+    Returns the title of the map of a cyclone path position.
+
+    Args:
+        centre (tuple): longitude and latitude of the considered cyclone position
+        date: date of the considered cyclone position
+
+    Returns:
+        title (str): map title
+    """
+
+    return (
+        "Altimeter data close to cyclone path point ("
+        + str(centre[0])
+        + ","
+        + str(centre[1])
+        + ") at "
+        + str(date)
+    )
+
+
+def _circle(centre, radius_km):
+    """
+    Returns the points of a geodesic circle.
+
+    Args:
+        centre (tuple): longitude and latitude of the circle centre
+        radius_km (float): radius of the circle (km)
+
+    Returns:
+        points (numpy array): longitudes and latitudes of the circle with shape (100, 2)
+    """
+
+    import cartopy.geodesic
+
+    return cartopy.geodesic.Geodesic().circle(
+        lon=centre[0],
+        lat=centre[1],
+        radius=radius_km * 1000.0,
+        n_samples=100,
+        endpoint=False,
+    )
+
+
+def cycloneAltiFrame(
+    fig,
+    clon,
+    clat,
+    centre,
+    date,
+    alon,
+    alat,
+    extent,
+    radius_km,
+    addcity=None,
+    markersize=100,
+    resolution="10m",
+    cache=True,
+):
+    """
+    Draws on a figure the altimeter data close to one cyclone path position.
+
+    Args:
+        fig (Figure): matplotlib figure
+        clon (numpy array): longitudes of the cyclone track
+        clat (numpy array): latitudes of the cyclone track
+        centre (tuple): longitude and latitude of the considered cyclone position
+        date: date of the considered cyclone position
+        alon (numpy array): longitudes of the altimeter data matched to the position
+        alat (numpy array): latitudes of the altimeter data matched to the position
+        extent (list): geographical extent of the figure following the convention [lon min,lon max,lat min,lat max]
+        radius_km (float): radius of the circle drawn around the cyclone position (km)
+        addcity (list): defined a specific location using the following convention ['City Name', longitude, latitude] [default: None]
+        markersize (int): size of the markers used to specify cyclone tracks [default: 100]
+        resolution (str): resolution of the coastlines, no land nor coastline are drawn when set to None [default: '10m']
+        cache (bool): draw the land and coastlines from the cached image of the extent [default: True]
+
+    Returns:
+        ax (GeoAxes): map axes
+    """
+
+    import cartopy.crs as ccrs
+    import shapely.geometry
+
+    ax = _cycloneMap(fig, clon, clat, extent, addcity, markersize, resolution, cache)
+
+    ax.set_title(_cycloneTitle(centre, date))
+    ax.scatter(
+        centre[0],
+        centre[1],
+        marker="o",
+        s=markersize * 3,
+        color="k",
+        edgecolor="black",
+        linewidth=1,
+        alpha=1,
+        transform=ccrs.PlateCarree(),
+        zorder=5,
+    )
+    ax.scatter(
+        alon,
+        alat,
+        marker="o",
+        s=markersize * 2,
+        edgecolor="k",
+        linewidth=1,
+        alpha=1,
+        transform=ccrs.PlateCarree(),
+        zorder=5,
+    )
+
+    geom = shapely.geometry.Polygon(_circle(centre, radius_km))
+    ax.add_geometries(
+        (geom,),
+        crs=ccrs.PlateCarree(),
+        facecolor="None",
+        edgecolor="k",
+        linewidth=1.5,
+        zorder=31,
+    )
+
+    return ax
+
+
+def cycloneAltiAnimation(fig, frames, interval=500):
+    """
+    Animates on a figure the altimeter data close to successive cyclone path
+    positions.
+
+    The background, the cyclone track and the gridlines are drawn once, each
+    frame then only moves the current cyclone position, its circle, the
+    matched altimeter data and the title.
+
+    Args:
+        fig (Figure): matplotlib figure
+        frames (list): keyword arguments of each position as given to *cycloneAltiFrame*, the static part of the map is taken from the first one
+        interval (int): delay between frames in milliseconds [default: 500]
+
+    Returns:
+        animation (FuncAnimation): matplotlib animation
+    """
+
+    import cartopy.crs as ccrs
+    from matplotlib.animation import FuncAnimation
+
+    if len(frames) == 0:
+        raise ValueError("Error there is no frame to animate")
+
+    first = frames[0]
+    ax = _cycloneMap(
+        fig,
+        first["clon"],
+        first["clat"],
+        first["extent"],
+        first.get("addcity"),
+        first.get("markersize", 100),
+        first.get("resolution", "10m"),
+        first.get("cache", True),
+    )
+    markersize = first.get("markersize", 100)
+
+    # Moving artists
+    title = ax.set_title("")
+    centre = ax.scatter(
+        [np.nan],
+        [np.nan],
+        marker="o",
+        s=markersize * 3,
+        color="k",
+        edgecolor="black",
+        linewidth=1,
+        alpha=1,
+        transform=ccrs.PlateCarree(),
+        zorder=5,
+    )
+    alti = ax.scatter(
+        [np.nan],
+        [np.nan],
+        marker="o",
+        s=markersize * 2,
+        edgecolor="k",
+        linewidth=1,
+        alpha=1,
+        transform=ccrs.PlateCarree(),
+        zorder=5,
+    )
+    (circle,) = ax.plot(
+        [], [], color="k", linewidth=1.5, transform=ccrs.PlateCarree(), zorder=31
+    )
+
+    def update(k):
+        frame = frames[k]
+        title.set_text(_cycloneTitle(frame["centre"], frame["date"]))
+        centre.set_offsets(np.atleast_2d(frame["centre"]))
+        alti.set_offsets(np.column_stack([frame["alon"], frame["alat"]]))
+        ring = _circle(frame["centre"], frame["radius_km"])
+        circle.set_data(
+            np.append(ring[:, 0], ring[0, 0]), np.append(ring[:, 1], ring[0, 1])
+        )
+
+        return title, centre, alti, circle
+
+    return FuncAnimation(
+        fig, update, frames=len(frames), interval=interval, blit=False, repeat=True
+    )
+
+
+def animationWriter(path, fps=2):
+    """
+    Returns the matplotlib writer of an animation file, chosen from its
+    extension.
+
+    Args:
+        path (str): animation file name either a GIF ('.gif') or a MP4 ('.mp4') file
+        fps (int): number of frames per second [default: 2]
+
+    Returns:
+        writer (MovieWriter): matplotlib animation writer
+    """
+
+    from matplotlib.animation import FFMpegWriter, PillowWriter, writers
+
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext == ".gif":
+        return PillowWriter(fps=fps)
+    elif ext == ".mp4":
+        if not writers.is_available("ffmpeg"):
+            raise ValueError("ffmpeg is required to write MP4 animations")
+        return FFMpegWriter(fps=fps)
+
+    raise ValueError("Not recognised animation format... choices are .gif, .mp4")
+
+
+def saveAnimation(path, frames, fsize=(12, 10), dpi=100, fps=2):
+    """
+    Renders the animation of a cyclone path with the Agg backend and writes
+    it to a GIF or MP4 file.
+
+    Args:
+        path (str): animation file name either a GIF ('.gif') or a MP4 ('.mp4') file
+        frames (list): keyword arguments of each position (see *cycloneAltiAnimation*)
+        fsize (tuple): size of the figure [default: (12,10)]
+        dpi (int): resolution of the frames [default: 100]
+        fps (int): number of frames per second [default: 2]
+
+    Returns:
+        path (str): animation file name
+    """
+
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    writer = animationWriter(path, fps)
+
+    # The figure is not registered in pyplot and is freed once saved
+    fig = Figure(figsize=fsize)
+    FigureCanvasAgg(fig)
+    anim = cycloneAltiAnimation(fig, frames, interval=1000.0 / fps)
+    anim.save(str(path), writer=writer, dpi=dpi)
+
+    return path
+
+
+def _saveFrame(args):
+    """
+    Renders a figure with the Agg backend and writes it to a file.
+
+    Args:
+        args (tuple): file name, figure size, resolution of the image (dpi), drawing function and its keyword arguments
+
+    Returns:
+        path (str): file name
+    """
+
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    path, fsize, dpi, draw, kwargs = args
+
+    # The figure is not registered in pyplot and is freed once saved
+    fig = Figure(figsize=fsize)
+    FigureCanvasAgg(fig)
+    draw(fig, **kwargs)
+    fig.savefig(path, dpi=dpi)
+
+    return path
+
+
+def renderFrames(draw, frames, paths, fsize=(12, 10), dpi=100, nprocs=1):
+    """
+    Renders a series of figures to files with the Agg backend, possibly in
+    parallel worker processes.
+
+    Args:
+        draw (function): module-level function drawing a frame on a figure, called as draw(fig, \\*\\*kwargs)
+        frames (list): keyword arguments of each frame
+        paths (list): file name of each frame
+        fsize (tuple): size of the figures [default: (12,10)]
+        dpi (int): resolution of the images [default: 100]
+        nprocs (int): number of worker processes [default: 1]
+
+    Returns:
+        paths (list): file names of the written frames
+    """
+
+    args = [(path, fsize, dpi, draw, kwargs) for path, kwargs in zip(paths, frames)]
+    if nprocs is None or nprocs > 1:
+        with ProcessPoolExecutor(max_workers=nprocs) as executor:
+            return list(executor.map(_saveFrame, args))
+
+    return [_saveFrame(arg) for arg in args]
+
+
+def framePaths(outdir, nb, prefix="frame", fmt="png"):
+    """
+    Builds the file names of a series of frames and creates their directory.
+
+    Args:
+        outdir (str): output directory
+        nb (int): number of frames
+        prefix (str): prefix of the file names [default: 'frame']
+        fmt (str): image format [default: 'png']
+
+    Returns:
+        paths (list): file names
+    """
+
+    os.makedirs(str(outdir), exist_ok=True)
+    width = max(4, len(str(nb - 1)))
+
+    return [
+        os.path.join(str(outdir), prefix + "_" + str(k).zfill(width) + "." + fmt)
+        for k in range(nb)
+    ]
+
+
+# Object whose figures are rendered by the report worker processes
+_reportSource = None
+
+
+def _initReport(source):
+    """
+    Initialises a report worker process.
+
+    Args:
+        source (object): object providing the plotting methods of the report
+    """
+
+    global _reportSource
+    _reportSource = source
+    plt = pyplot()
+
+    # Worker processes never display the figures
+    plt.switch_backend("agg")
+
+
+def _figures(value):
+    """
+    Gathers the figures returned by a plotting method.
+
+    Args:
+        value: value returned by the plotting method
+
+    Returns:
+        figures (list): matplotlib figures in the order they are found
+    """
+
+    from matplotlib.figure import Figure
+
+    if isinstance(value, Figure):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [fig for item in value for fig in _figures(item)]
+
+    return []
+
+
+def _reportFigures(task):
+    """
+    Calls a plotting method of the report source and writes its figures.
+
+    Args:
+        task (tuple): name of the plotting method, its keyword arguments, the file name of each figure and the resolution of the images
+
+    Returns:
+        paths (list): file names of the written figures
+    """
+
+    plt = pyplot()
+    method, kwargs, paths, dpi = task
+    figures = _figures(getattr(_reportSource, method)(show=False, **kwargs))
+    for fig, path in zip(figures, paths):
+        fig.savefig(path, dpi=dpi)
+    for fig in figures:
+        plt.close(fig)
+
+    return paths[: len(figures)]
+
+
+def renderReport(source, tasks, dpi=100, nprocs=1):
+    """
+    Renders the figures of a report with the Agg backend in worker
+    processes, leaving the backend and the open figures of the current
+    session untouched.
+
+    Each task calls a plotting method of the source with *show=False* and
+    writes the returned figures to files.
+
+    Args:
+        source (object): object providing the plotting methods, it is sent once to each worker process
+        tasks (list): name of the plotting method, its keyword arguments and the file name of each of its figures
+        dpi (int): resolution of the images [default: 100]
+        nprocs (int): number of worker processes, None uses all processors [default: 1]
+
+    Returns:
+        paths (list): file names of the written figures
+    """
+
+    # A single worker process is used when nprocs is 1, so that the backend
+    # and the figures of the current session are left untouched
+    tasks = [(method, kwargs, paths, dpi) for method, kwargs, paths in tasks]
+    with ProcessPoolExecutor(
+        max_workers=nprocs, initializer=_initReport, initargs=(source,)
+    ) as executor:
+        written = list(executor.map(_reportFigures, tasks))
+
+    return [path for paths in written for path in paths]
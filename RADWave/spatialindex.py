@@ -0,0 +1,372 @@
+#!/usr/bin/python
+# -*- mode: python; coding: utf-8 -*
+# Copyright (c) 2020 Tristan Salles
+# Licensed under the GNU LGPL Version 3
+
+import pickle
+import hashlib
+import numpy as np
+from scipy.spatial import cKDTree as _cKDTree
+
+from .geodesy import EARTH_RADIUS
+
+
+def _hours(date, t0=0):
+    """
+    Converts dates to hours elapsed since a reference time.
+
+    Args:
+        date (numpy array): dates as numpy datetime64 values
+        t0 (int): reference time in nanoseconds since epoch [default: 0]
+
+    Returns:
+        hours (numpy array): elapsed hours
+    """
+
+    ns = np.asarray(date, dtype="datetime64[ns]").astype(np.int64)
+
+    return (ns - t0) / 3.6e12
+
+
+def _flatten(pts):
+    """
+    Flattens the neighbour lists returned by a *query_ball_point* call into
+    arrays of query and neighbour indices.
+
+    Args:
+        pts (numpy array): array of lists of neighbour indices
+
+    Returns:
+        qid (numpy array): query indices
+        aid (numpy array): neighbour indices
+    """
+
+    pts = np.atleast_1d(pts)
+    ngbhs = np.fromiter(map(len, pts), dtype=np.int64, count=len(pts))
+    qid = np.repeat(np.arange(len(pts), dtype=np.int64), ngbhs)
+    aid = np.zeros(ngbhs.sum(), dtype=np.int64)
+    if len(aid) > 0:
+        aid[:] = np.concatenate(pts)
+
+    return qid, aid
+
+
+def unitSphere(lon, lat):
+    """
+    Converts geographical coordinates to cartesian (ECEF) coordinates on the
+    unit sphere.
+
+    Args:
+        lon (numpy array): longitudes in degrees
+        lat (numpy array): latitudes in degrees
+
+    Returns:
+        xyz (numpy array): cartesian coordinates of shape (n, 3)
+    """
+
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    coslat = np.cos(lat)
+
+    return np.column_stack([coslat * np.cos(lon), coslat * np.sin(lon), np.sin(lat)])
+
+
+def chordLength(dist, radius=EARTH_RADIUS):
+    """
+    Converts great-circle distances to chord lengths on the unit sphere.
+
+    Args:
+        dist (numpy array): great-circle distances (km)
+        radius (float): radius of the sphere in kilometres [default: 6371.0088]
+
+    Returns:
+        chord (numpy array): chord lengths on the unit sphere
+    """
+
+    angle = np.minimum(np.asarray(dist, dtype=np.float64) / radius, np.pi)
+
+    return 2.0 * np.sin(0.5 * angle)
+
+
+class spaceTimeIndex(object):
+    """
+    Spatiotemporal index of altimeter records used to find the observations
+    recorded close to a set of positions in both space and time.
+
+    The records are split into consecutive time buckets of fixed duration
+    and a spatial KD-tree is built over the records of each bucket the
+    first time it is searched. A query only searches the buckets that
+    overlap the time window of each position, and the time difference
+    *dtmax* is then applied by an exact check, so that the same trees serve
+    any radius and any *dtmax* and the number of candidates stays
+    proportional to the number of actual matches rather than to the length
+    of the altimeter record. Radius queries that ignore the recording time
+    (see *queryRadius*) use a single KD-tree over all the records instead.
+
+    Two search modes are available:
+
+        * radius in degrees: positions are expressed as longitude and latitude
+        * radius in kilometres: positions are expressed as cartesian coordinates on the unit sphere and the radius as the corresponding chord length, which is exact at all latitudes and across the 180 degree meridian
+
+    Args:
+        lon (numpy array): altimeter longitudes
+        lat (numpy array): altimeter latitudes
+        date (numpy array): altimeter dates as numpy datetime64 values
+        bucket (float): duration of the time buckets in hours [default: 6.]
+    """
+
+    def __init__(self, lon, lat, date, bucket=6.0):
+
+        if bucket <= 0.0:
+            raise ValueError("Error bucket needs to be positive")
+
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        ns = np.asarray(date, dtype="datetime64[ns]").astype(np.int64)
+        self.t0 = int(ns.min()) if len(ns) > 0 else 0
+        self.hours = (ns - self.t0) / 3.6e12
+        self.bucket = float(bucket)
+        self.candidates = 0
+        self.modified = False
+        self._xyz = None
+        self._trees = {}
+        self._spatial = None
+
+        # Records ordered by time bucket and position of each bucket
+        bid = np.floor(self.hours / self.bucket).astype(np.int64)
+        self._order = np.argsort(bid, kind="mergesort")
+        nbucket = int(bid.max()) + 1 if len(bid) > 0 else 0
+        self._edges = np.searchsorted(bid[self._order], np.arange(nbucket + 1))
+
+        sha = hashlib.sha1()
+        for values in (self.lon, self.lat, ns):
+            sha.update(np.ascontiguousarray(values).tobytes())
+        self.fingerprint = sha.hexdigest()
+
+    def __len__(self):
+
+        return len(self.lon)
+
+    @property
+    def xyz(self):
+        """
+        Cartesian coordinates of the altimeter records on the unit sphere.
+        """
+
+        if self._xyz is None:
+            self._xyz = unitSphere(self.lon, self.lat)
+
+        return self._xyz
+
+    def _tree(self, coords, b):
+        """
+        Returns the spatial KD-tree of the records of a time bucket, each
+        tree is only built once.
+
+        Args:
+            coords (str): coordinate system either 'deg' (longitude/latitude) or 'xyz' (unit sphere)
+            b (int): time bucket
+
+        Returns:
+            tree (cKDTree): KD-tree over the positions of the bucket records
+        """
+
+        trees = self._trees.setdefault(coords, {})
+        if b not in trees:
+            ids = self._order[self._edges[b] : self._edges[b + 1]]
+            if coords == "xyz":
+                XY = self.xyz[ids]
+            else:
+                XY = np.column_stack([self.lon[ids], self.lat[ids]])
+            trees[b] = _cKDTree(XY)
+            self.modified = True
+
+        return trees[b]
+
+    def _spatialTree(self):
+        """
+        Returns the KD-tree over the unit sphere coordinates of all the
+        records, which is only built once.
+
+        Returns:
+            tree (cKDTree): KD-tree over the positions of all the records
+        """
+
+        if self._spatial is None:
+            self._spatial = _cKDTree(self.xyz)
+            self.modified = True
+
+        return self._spatial
+
+    def _search(self, coords, qXY, qid, bid, radius, workers=1):
+        """
+        Finds the records of a set of time buckets located within a given
+        radius of a set of positions.
+
+        Args:
+            coords (str): coordinate system either 'deg' or 'xyz'
+            qXY (numpy array): coordinates of the positions
+            qid (numpy array): position of each (position, bucket) pair
+            bid (numpy array): bucket of each (position, bucket) pair
+            radius (float): search radius in the coordinate system
+            workers (int): number of threads used to query the KD-trees [default: 1]
+
+        Returns:
+            qid (numpy array): indices of the positions
+            aid (numpy array): indices of the records
+        """
+
+        kwargs = {}
+        if workers != 1:
+            kwargs["workers"] = workers
+
+        qids = [np.zeros(0, dtype=np.int64)]
+        aids = [np.zeros(0, dtype=np.int64)]
+        order = np.argsort(bid, kind="mergesort")
+        qid, bid = qid[order], bid[order]
+        first = np.flatnonzero(np.diff(bid, prepend=-1) != 0)
+        for k0, k1 in zip(first, np.append(first[1:], len(bid))):
+            b = bid[k0]
+            if self._edges[b + 1] == self._edges[b]:
+                continue
+            pts = self._tree(coords, b).query_ball_point(
+                qXY[qid[k0:k1]], r=radius, **kwargs
+            )
+            local, ids = _flatten(pts)
+            qids.append(qid[k0:k1][local])
+            aids.append(self._order[self._edges[b] + ids])
+        qid = np.concatenate(qids)
+        aid = np.concatenate(aids)
+
+        # Sorted by position then record
+        order = np.lexsort((aid, qid))
+
+        return qid[order], aid[order]
+
+    def save(self, path):
+        """
+        Writes the index and all the KD-trees built so far to disk.
+
+        Args:
+            path (str): index file name
+        """
+
+        self.modified = False
+        with open(str(path), "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, fingerprint=None):
+        """
+        Reads an index previously written with the *save* function.
+
+        Args:
+            path (str): index file name
+            fingerprint (str): expected fingerprint of the indexed records, None is returned when the saved index does not match [default: None]
+
+        Returns:
+            index (spaceTimeIndex): loaded index
+        """
+
+        with open(str(path), "rb") as f:
+            index = pickle.load(f)
+        if not hasattr(index, "_spatial"):
+            return None
+        if fingerprint is not None and index.fingerprint != fingerprint:
+            return None
+
+        return index
+
+    def queryRadius(self, lon, lat, radius_km, workers=1):
+        """
+        Finds the altimeter records located within a given great-circle
+        distance of a set of fixed positions (such as wave buoys), whatever
+        their recording time.
+
+        Args:
+            lon (numpy array): longitudes of the positions
+            lat (numpy array): latitudes of the positions
+            radius_km (float): maximum great-circle distance in kilometres
+            workers (int): number of threads used to query the KD-trees, -1 uses all processors [default: 1]
+
+        Returns:
+            qid (numpy array): indices of the positions
+            aid (numpy array): indices of the matching altimeter records
+        """
+
+        if radius_km <= 0.0:
+            raise ValueError("Error radius_km needs to be positive")
+
+        kwargs = {}
+        if workers != 1:
+            kwargs["workers"] = workers
+
+        # The recording time is ignored so the time buckets are not used
+        pts = self._spatialTree().query_ball_point(
+            unitSphere(lon, lat), r=float(chordLength(radius_km)), **kwargs
+        )
+        qid, aid = _flatten(pts)
+        order = np.lexsort((aid, qid))
+        self.candidates = len(aid)
+
+        return qid[order], aid[order]
+
+    def query(self, lon, lat, date, radius=2.0, dtmax=6.0, radius_km=None, workers=1):
+        """
+        Finds the altimeter records located within a given radius and
+        recorded less than *dtmax* hours apart from a set of positions.
+
+        Args:
+            lon (numpy array): longitudes of the positions
+            lat (numpy array): latitudes of the positions
+            date (numpy array): dates of the positions as numpy datetime64 values
+            radius (float): maximum radius distance in degree [default: 2.]
+            dtmax (float): maximum difference in time (hours) [default: 6.]
+            radius_km (float): maximum great-circle distance in kilometres, when set *radius* is not used [default: None]
+            workers (int): number of threads used to query the KD-trees, -1 uses all processors [default: 1]
+
+        Returns:
+            qid (numpy array): indices of the positions
+            aid (numpy array): indices of the matching altimeter records
+            dhours (numpy array): altimeter time minus position time (hours)
+        """
+
+        if radius_km is not None:
+            coords = "xyz"
+            radius = float(chordLength(radius_km))
+        else:
+            coords = "deg"
+        if radius <= 0.0 or dtmax <= 0.0:
+            raise ValueError("Error radius and dtmax need to be positive")
+
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        hours = np.atleast_1d(_hours(date, self.t0))
+        if coords == "xyz":
+            qXY = unitSphere(lon, lat)
+        else:
+            qXY = np.column_stack([lon, lat])
+
+        # Time buckets overlapping the time window of each position
+        nbucket = len(self._edges) - 1
+        b0 = np.floor((hours - dtmax) / self.bucket).astype(np.int64)
+        b1 = np.floor((hours + dtmax) / self.bucket).astype(np.int64)
+        b0 = np.maximum(b0, 0)
+        b1 = np.minimum(b1, nbucket - 1)
+        nb = np.maximum(b1 - b0 + 1, 0)
+        qid = np.repeat(np.arange(len(hours), dtype=np.int64), nb)
+        bid = (
+            np.repeat(b0, nb) + np.arange(nb.sum()) - np.repeat(np.cumsum(nb) - nb, nb)
+        )
+        qid, aid = self._search(coords, qXY, qid, bid, radius, workers)
+        self.candidates = len(aid)
+
+        # Exact selection in space and time
+        dhours = self.hours[aid] - hours[qid]
+        if coords == "xyz":
+            dist = np.linalg.norm(self.xyz[aid] - qXY[qid], axis=1)
+        else:
+            dist = np.hypot(self.lon[aid] - lon[qid], self.lat[aid] - lat[qid])
+        inside = (np.abs(dhours) < dtmax) & (dist <= radius)
+
+        return qid[inside], aid[inside], dhours[inside]
@@ -0,0 +1,200 @@
+#!/usr/bin/python
+# -*- mode: python; coding: utf-8 -*
+# Copyright (c) 2020 Tristan Salles
+# Licensed under the GNU LGPL Version 3
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+
+class timeSeriesStore(object):
+    """
+    On-disk columnar store used to hold wave time series that do not fit in
+    memory.
+
+    Each column of the time series is written in its own binary file and the
+    store is read back through numpy memory maps, so that only the rows and
+    columns requested by the user are loaded. Rows are appended in time order
+    which allows date intervals to be found by binary search on the *date*
+    column.
+
+    Args:
+        path (str): directory containing the store
+        mode (str): 'r' to read an existing store or 'w' to create a new one (existing content is replaced) [default: 'r']
+        days (int): moving average window used to compute the rolling columns, only used when creating the store [default: None]
+    """
+
+    def __init__(self, path, mode="r", days=None):
+
+        self.path = str(path)
+        self.mode = mode
+        self._files = {}
+
+        if mode == "w":
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            self.columns = []
+            self.dtypes = {}
+            self.nrows = 0
+            self.days = days
+            self._writeMeta()
+        elif mode == "r":
+            try:
+                with open(os.path.join(self.path, "store.json")) as f:
+                    meta = json.load(f)
+            except IOError:
+                raise ValueError("Unable to open time series store " + self.path)
+            self.columns = meta["columns"]
+            self.dtypes = {k: np.dtype(v) for k, v in meta["dtypes"].items()}
+            self.nrows = meta["nrows"]
+            self.days = meta["days"]
+            self._maps = {}
+        else:
+            raise ValueError("Error mode needs to be either 'r' or 'w'")
+
+    def __len__(self):
+
+        return self.nrows
+
+    @property
+    def shape(self):
+
+        return (self.nrows, len(self.columns))
+
+    def _writeMeta(self):
+
+        meta = {
+            "columns": self.columns,
+            "dtypes": {k: v.str for k, v in self.dtypes.items()},
+            "nrows": self.nrows,
+            "days": self.days,
+        }
+        with open(os.path.join(self.path, "store.json"), "w") as f:
+            json.dump(meta, f)
+
+    def append(self, df):
+        """
+        Appends a block of rows at the end of the store. Blocks need to be
+        appended in time order.
+
+        Args:
+            df (dataframe): time series block containing a *date* column
+        """
+
+        if self.mode != "w":
+            raise ValueError("The time series store is opened in read mode")
+        if df.shape[0] == 0:
+            return
+
+        if len(self.columns) == 0:
+            self.columns = list(df.columns)
+            for col in self.columns:
+                self.dtypes[col] = df[col].to_numpy().dtype
+                self._files[col] = open(os.path.join(self.path, col + ".bin"), "wb")
+        elif list(df.columns) != self.columns:
+            raise ValueError("The appended block columns do not match the store")
+
+        for col in self.columns:
+            values = np.ascontiguousarray(df[col].to_numpy(), dtype=self.dtypes[col])
+            values.tofile(self._files[col])
+        self.nrows += df.shape[0]
+
+    def close(self):
+        """
+        Flushes the written columns and records the store description. The
+        store is then reopened in read mode.
+        """
+
+        if self.mode == "w":
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+            self._writeMeta()
+            self.mode = "r"
+            self._maps = {}
+
+    def column(self, name):
+        """
+        Returns a read-only memory map of a given column.
+
+        Args:
+            name (str): column name
+
+        Returns:
+            values (numpy memmap): column values
+        """
+
+        if name not in self.columns:
+            raise ValueError("Column " + str(name) + " is not in the store")
+        if self.nrows == 0:
+            return np.empty(0, dtype=self.dtypes[name])
+        if name not in self._maps:
+            self._maps[name] = np.memmap(
+                os.path.join(self.path, name + ".bin"),
+                dtype=self.dtypes[name],
+                mode="r",
+                shape=(self.nrows,),
+            )
+
+        return self._maps[name]
+
+    def _bounds(self, start=None, end=None):
+
+        dates = self.column("date")
+        if start is None:
+            i0 = 0
+        else:
+            i0 = np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), "left")
+        if end is None:
+            i1 = self.nrows
+        else:
+            i1 = np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), "left")
+
+        return i0, max(i0, i1)
+
+    def _frame(self, i0, i1, columns):
+
+        if columns is None:
+            columns = self.columns
+        data = {col: np.array(self.column(col)[i0:i1]) for col in columns}
+        index = pd.DatetimeIndex(np.array(self.column("date")[i0:i1]))
+
+        return pd.DataFrame(data=data, index=index, columns=columns)
+
+    def slice(self, start=None, end=None, columns=None):
+        """
+        Loads the rows recorded between two dates.
+
+        Args:
+            start: first date to consider (included) [default: None]
+            end: last date to consider (excluded) [default: None]
+            columns (list): columns to load, all columns are loaded when set to None [default: None]
+
+        Returns:
+            tmpdf (dataframe): pandas dataframe indexed by date
+        """
+
+        i0, i1 = self._bounds(start, end)
+
+        return self._frame(i0, i1, columns)
+
+    def blocks(self, start=None, end=None, columns=None, blocksize=1000000):
+        """
+        Iterates over the rows recorded between two dates by blocks of
+        consecutive rows.
+
+        Args:
+            start: first date to consider (included) [default: None]
+            end: last date to consider (excluded) [default: None]
+            columns (list): columns to load, all columns are loaded when set to None [default: None]
+            blocksize (int): maximum number of rows per block [default: 1000000]
+
+        Yields:
+            tmpdf (dataframe): pandas dataframe indexed by date
+        """
+
+        i0, i1 = self._bounds(start, end)
+        for k in range(i0, i1, int(blocksize)):
+            yield self._frame(k, min(k + int(blocksize), i1), columns)
@@ -0,0 +1,243 @@
+#!/usr/bin/python
+# -*- mode: python; coding: utf-8 -*
+# Copyright (c) 2020 Tristan Salles
+# Licensed under the GNU LGPL Version 3
+
+import numpy as np
+import pandas as pd
+
+from .geodesy import geodesicDistance
+from .spatialindex import spaceTimeIndex
+
+
+def _nanoseconds(date):
+    """
+    Converts dates to nanoseconds since epoch, dates with a time zone are
+    converted to UTC.
+
+    Args:
+        date: dates as any type understood by *pandas.to_datetime*
+
+    Returns:
+        ns (numpy array): dates in nanoseconds
+    """
+
+    date = pd.to_datetime(pd.Series(np.atleast_1d(date)))
+    if date.dt.tz is not None:
+        date = date.dt.tz_convert(None)
+
+    return date.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+class streamCollocator(object):
+    """
+    Incremental collocation of cyclone track positions and altimeter
+    observations received as they become available (for instance new
+    advisory positions and new altimeter passes during an active cyclone).
+
+    Each call to *addTrack* or *addAltimeter* only searches the new data
+    against the data already received from the other source, so that every
+    match is returned once, by the call that completes it. The selection
+    criteria are the same as in *close2Track*.
+
+    Each source is assumed to arrive in chronological order: a track
+    position recorded more than *dtmax* hours before the latest altimeter
+    observation cannot be matched by a later observation and is discarded
+    (and conversely). Each source is also assumed to lag the other one by at
+    most *latency* hours, so that the records older than *dtmax* plus
+    *latency* hours before the latest record of their own source are
+    discarded as well, even when the other source has not sent anything yet
+    or has stopped. The retained state is thus bounded by a sliding window.
+
+    Args:
+        radius (float): maximum radius distance in degree between cyclone position and altimeter data coordinates [default: 2.]
+        dtmax (float): maximum difference in time between cyclone position and altimeter data (hours) [default: 6.]
+        radius_km (float): maximum great-circle distance in kilometres, when set *radius* is not used [default: None]
+        waves (function): function applied to the variables passed to *addAltimeter* that returns the variables to report for each match [default: None]
+        latency (float): maximum delay between the two sources (hours) [default: 24.]
+    """
+
+    def __init__(self, radius=2.0, dtmax=6.0, radius_km=None, waves=None, latency=24.0):
+
+        if dtmax <= 0.0:
+            raise ValueError("Error dtmax needs to be positive")
+        if latency < 0.0:
+            raise ValueError("Error latency needs to be positive")
+
+        self.radius = radius
+        self.dtmax = dtmax
+        self.radius_km = radius_km
+        self.waves = waves
+        self.latency = latency
+        self.variables = None
+        self._track = {"lon": np.zeros(0), "lat": np.zeros(0)}
+        self._track["ns"] = np.zeros(0, dtype=np.int64)
+        self._alti = None
+        self._tlast = None
+        self._alast = None
+
+    @property
+    def trackSize(self):
+        """
+        Number of track positions retained in the sliding window.
+        """
+
+        return len(self._track["ns"])
+
+    @property
+    def altimeterSize(self):
+        """
+        Number of altimeter observations retained in the sliding window.
+        """
+
+        if self._alti is None:
+            return 0
+
+        return len(self._alti["ns"])
+
+    def _append(self, buffer, data):
+        """
+        Appends new records to a buffer.
+
+        Args:
+            buffer (dict): arrays of the retained records
+            data (dict): arrays of the new records
+
+        Returns:
+            buffer (dict): arrays of all records
+        """
+
+        if buffer is None:
+            return data
+
+        return {key: np.concatenate([buffer[key], data[key]]) for key in buffer}
+
+    def _prune(self):
+        """
+        Discards the records that can not be matched by data received later.
+        """
+
+        window = int(self.dtmax * 3.6e12)
+        lag = window + int(self.latency * 3.6e12)
+        if self._tlast is not None:
+            keep = self._track["ns"] > self._tlast - lag
+            if self._alast is not None:
+                keep &= self._track["ns"] > self._alast - window
+            self._track = {key: val[keep] for key, val in self._track.items()}
+        if self._alast is not None:
+            keep = self._alti["ns"] > self._alast - lag
+            if self._tlast is not None:
+                keep &= self._alti["ns"] > self._tlast - window
+            self._alti = {key: val[keep] for key, val in self._alti.items()}
+
+    def _match(self, track, alti):
+        """
+        Finds the altimeter observations close in space and time to a set of
+        track positions.
+
+        Args:
+            track (dict): arrays of track positions
+            alti (dict): arrays of altimeter observations
+
+        Returns:
+            matches (dataframe): pandas dataframe containing the matched altimeter observations
+        """
+
+        cid = aid = np.zeros(0, dtype=np.int64)
+        dhours = np.zeros(0)
+        if len(track["ns"]) > 0 and alti is not None and len(alti["ns"]) > 0:
+            index = spaceTimeIndex(
+                alti["lon"], alti["lat"], alti["ns"].astype("datetime64[ns]")
+            )
+            cid, aid, dhours = index.query(
+                track["lon"],
+                track["lat"],
+                track["ns"].astype("datetime64[ns]"),
+                radius=self.radius,
+                dtmax=self.dtmax,
+                radius_km=self.radius_km,
+            )
+
+        data = {}
+        for key in self.variables or []:
+            data[key] = alti[key][aid]
+        alon = np.zeros(0) if alti is None else alti["lon"][aid]
+        alat = np.zeros(0) if alti is None else alti["lat"][aid]
+        clon = track["lon"][cid]
+        clat = track["lat"][cid]
+        data["dist"] = np.round(geodesicDistance(clon, clat, alon, alat), 3)
+        data["date"] = track["ns"][cid].astype("datetime64[ns]")
+        data["lon"] = alon
+        data["lat"] = alat
+        data["clon"] = clon
+        data["clat"] = clat
+        data["hours"] = np.round(dhours, 3)
+
+        return pd.DataFrame(data)
+
+    def addTrack(self, lon, lat, date):
+        """
+        Adds new cyclone track positions and returns their matches with the
+        altimeter observations received so far.
+
+        Args:
+            lon (numpy array): longitudes of the new positions
+            lat (numpy array): latitudes of the new positions
+            date (numpy array): dates of the new positions
+
+        Returns:
+            matches (dataframe): pandas dataframe containing the new matches
+        """
+
+        track = {
+            "lon": np.atleast_1d(np.asarray(lon, dtype=np.float64)),
+            "lat": np.atleast_1d(np.asarray(lat, dtype=np.float64)),
+            "ns": _nanoseconds(date),
+        }
+        matches = self._match(track, self._alti)
+
+        self._track = self._append(self._track, track)
+        if len(track["ns"]) > 0:
+            tlast = int(track["ns"].max())
+            self._tlast = tlast if self._tlast is None else max(self._tlast, tlast)
+        self._prune()
+
+        return matches
+
+    def addAltimeter(self, lon, lat, date, **variables):
+        """
+        Adds new altimeter observations and returns their matches with the
+        cyclone track positions received so far.
+
+        Args:
+            lon (numpy array): longitudes of the new observations
+            lat (numpy array): latitudes of the new observations
+            date (numpy array): dates of the new observations
+            variables (numpy array): any additional variable of the observations (such as *wh* & *ws*) reported with the matches
+
+        Returns:
+            matches (dataframe): pandas dataframe containing the new matches
+        """
+
+        if self.waves is not None:
+            variables = self.waves(**variables)
+        alti = {key: np.atleast_1d(np.asarray(val)) for key, val in variables.items()}
+        if self.variables is None:
+            self.variables = list(alti.keys())
+        elif sorted(self.variables) != sorted(alti.keys()):
+            raise ValueError("Error the altimeter variables need to be the same for \
+                             all observations")
+        alti["lon"] = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        alti["lat"] = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        alti["ns"] = _nanoseconds(date)
+
+        # New observations are indexed and searched from the retained positions
+        matches = self._match(self._track, alti)
+
+        self._alti = self._append(self._alti, alti)
+        if len(alti["ns"]) > 0:
+            alast = int(alti["ns"].max())
+            self._alast = alast if self._alast is None else max(self._alast, alast)
+        self._prune()
+
+        return matches
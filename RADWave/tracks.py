@@ -0,0 +1,285 @@
+#!/usr/bin/python
+# -*- mode: python; coding: utf-8 -*
+# Copyright (c) 2020 Tristan Salles
+# Licensed under the GNU LGPL Version 3
+
+import numpy as np
+import pandas as pd
+
+
+class trackCatalog(object):
+    """
+    Compact catalog of cyclone tracks for several storms.
+
+    Track positions are stored in typed arrays (longitude, latitude, time and
+    pressure) ordered by storm and date, with an offset array giving the
+    first position of each storm. Sorted indices over the storm identifiers,
+    the storm names, the position times and longitudes allow storms to be
+    found by binary search. The catalog can be saved and loaded in binary
+    form, which avoids parsing the original CSV file in each session.
+
+    Args:
+        storms (numpy array): identifier of each storm (sorted)
+        offsets (numpy array): position of the first record of each storm, the last value being the total number of records
+        lon (numpy array): longitudes of the track positions
+        lat (numpy array): latitudes of the track positions
+        time (numpy array): dates of the track positions as numpy datetime64 values
+        pressure (numpy array): central pressure of the track positions [default: None]
+        names (numpy array): name of each storm [default: None]
+    """
+
+    def __init__(self, storms, offsets, lon, lat, time, pressure=None, names=None):
+
+        self.storms = np.asarray(storms).astype(str)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.time = np.asarray(time, dtype="datetime64[ns]")
+        if pressure is None:
+            pressure = np.full(len(self.lon), np.nan)
+        self.pressure = np.asarray(pressure, dtype=np.float32)
+        if names is None:
+            names = self.storms
+        self.names = np.char.upper(np.asarray(names).astype(str))
+
+        if len(self.offsets) != len(self.storms) + 1:
+            raise ValueError("Error the offsets do not match the number of storms")
+        if np.any(self.storms[1:] < self.storms[:-1]):
+            raise ValueError("Error the storm identifiers need to be sorted")
+
+        # Storm of each position, sorted indices and sorted keys used by the
+        # queries so that each query is only a binary search and a slice
+        self.sid = np.repeat(np.arange(len(self.storms)), np.diff(self.offsets))
+        self._names = np.argsort(self.names, kind="mergesort")
+        self._times = np.argsort(self.time, kind="mergesort")
+        self._lons = np.argsort(self.lon, kind="mergesort")
+        self._sortedNames = self.names[self._names]
+        self._sortedTimes = self.time[self._times]
+        self._sortedLons = self.lon[self._lons]
+
+    def __len__(self):
+
+        return len(self.storms)
+
+    @classmethod
+    def fromFrame(cls, df, stormid="sid"):
+        """
+        Builds the catalog from a pandas dataframe.
+
+        Args:
+            df (dataframe): track positions with a storm identifier column and the columns *lon*, *lat* & *datetime* (optionally *pressure* and *name*)
+            stormid (str): name of the column identifying each storm [default: 'sid']
+
+        Returns:
+            catalog (trackCatalog): cyclone track catalog
+        """
+
+        date = pd.to_datetime(df["datetime"], errors="coerce")
+        if date.dt.tz is not None:
+            date = date.dt.tz_convert(None)
+        df = df.assign(datetime=date, **{stormid: df[stormid].astype(str)})
+        df = df[df["datetime"].notna()]
+        df = df.sort_values(by=[stormid, "datetime"], kind="mergesort")
+
+        ids = df[stormid].to_numpy()
+        first = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        offsets = np.append(first, len(ids))
+        pressure = None
+        if "pressure" in df.columns:
+            pressure = pd.to_numeric(df["pressure"], errors="coerce").to_numpy()
+        names = None
+        if "name" in df.columns:
+            names = df["name"].to_numpy()[first]
+
+        return cls(
+            ids[first],
+            offsets,
+            pd.to_numeric(df["lon"]).to_numpy(),
+            pd.to_numeric(df["lat"]).to_numpy(),
+            df["datetime"].to_numpy(),
+            pressure=pressure,
+            names=names,
+        )
+
+    def save(self, path):
+        """
+        Writes the catalog in numpy binary format.
+
+        Args:
+            path (str): catalog file name (with the '.npz' extension)
+        """
+
+        np.savez(
+            str(path),
+            storms=self.storms,
+            names=self.names,
+            offsets=self.offsets,
+            lon=self.lon,
+            lat=self.lat,
+            time=self.time.astype(np.int64),
+            pressure=self.pressure,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a catalog written with the *save* function.
+
+        Args:
+            path (str): catalog file name
+
+        Returns:
+            catalog (trackCatalog): cyclone track catalog
+        """
+
+        with np.load(str(path), allow_pickle=False) as data:
+            return cls(
+                data["storms"],
+                data["offsets"],
+                data["lon"],
+                data["lat"],
+                data["time"].astype("datetime64[ns]"),
+                pressure=data["pressure"],
+                names=data["names"],
+            )
+
+    def frame(self, storms=None, stormid="sid"):
+        """
+        Returns the track positions of a set of storms as a pandas dataframe.
+
+        Args:
+            storms (list): identifiers of the storms, all storms are returned when set to None [default: None]
+            stormid (str): name of the storm identifier column [default: 'sid']
+
+        Returns:
+            df (dataframe): track positions with the columns *sid*, *name*, *lon*, *lat*, *datetime* & *pressure*
+        """
+
+        if storms is None:
+            ids = np.arange(self.offsets[-1])
+        else:
+            ks = self._storms(storms)
+            ids = np.concatenate(
+                [np.arange(self.offsets[k], self.offsets[k + 1]) for k in ks]
+                + [np.zeros(0, dtype=np.int64)]
+            )
+
+        return pd.DataFrame(
+            {
+                stormid: self.storms[self.sid[ids]],
+                "name": self.names[self.sid[ids]],
+                "lon": self.lon[ids],
+                "lat": self.lat[ids],
+                "datetime": self.time[ids],
+                "pressure": self.pressure[ids],
+            }
+        )
+
+    def _storms(self, storms):
+        """
+        Finds the positions of a set of storm identifiers by binary search.
+
+        Args:
+            storms (list): storm identifiers
+
+        Returns:
+            ks (numpy array): indices of the storms in the catalog
+        """
+
+        storms = np.atleast_1d(np.asarray(storms).astype(str))
+        ks = np.searchsorted(self.storms, storms)
+        found = ks < len(self.storms)
+        found[found] = self.storms[ks[found]] == storms[found]
+        if not found.all():
+            raise ValueError("Unknown storms " + str(list(storms[~found])))
+
+        return ks
+
+    def track(self, storm):
+        """
+        Returns the track positions of a single storm.
+
+        Args:
+            storm (str): storm identifier
+
+        Returns:
+            df (dataframe): track positions with the columns *lon*, *lat*, *datetime* & *pressure*
+        """
+
+        return self.frame([storm])
+
+    def byName(self, name):
+        """
+        Finds the storms with a given name (case insensitive).
+
+        Args:
+            name (str): storm name
+
+        Returns:
+            storms (numpy array): identifiers of the storms
+        """
+
+        names = self._sortedNames
+        i0 = np.searchsorted(names, str(name).upper(), side="left")
+        i1 = np.searchsorted(names, str(name).upper(), side="right")
+
+        return self.storms[np.sort(self._names[i0:i1])]
+
+    def byTime(self, start=None, end=None):
+        """
+        Finds the storms with at least one position recorded between two
+        dates.
+
+        Args:
+            start: first date to consider (included) [default: None]
+            end: last date to consider (excluded) [default: None]
+
+        Returns:
+            storms (numpy array): identifiers of the storms
+        """
+
+        times = self._sortedTimes
+        i0 = 0
+        i1 = len(times)
+        if start is not None:
+            i0 = np.searchsorted(times, np.datetime64(pd.Timestamp(start)), "left")
+        if end is not None:
+            i1 = np.searchsorted(times, np.datetime64(pd.Timestamp(end)), "left")
+
+        return self.storms[np.unique(self.sid[self._times[i0:i1]])]
+
+    def byYear(self, year):
+        """
+        Finds the storms with at least one position recorded during a given
+        year.
+
+        Args:
+            year (int): year
+
+        Returns:
+            storms (numpy array): identifiers of the storms
+        """
+
+        return self.byTime(
+            pd.Timestamp(int(year), 1, 1), pd.Timestamp(int(year) + 1, 1, 1)
+        )
+
+    def byBox(self, lonlat):
+        """
+        Finds the storms with at least one position inside a bounding box.
+
+        Args:
+            lonlat (list): bounding box following the convention [lon min,lon max,lat min,lat max]
+
+        Returns:
+            storms (numpy array): identifiers of the storms
+        """
+
+        lons = self._sortedLons
+        i0 = np.searchsorted(lons, lonlat[0], side="left")
+        i1 = np.searchsorted(lons, lonlat[1], side="right")
+        ids = self._lons[i0:i1]
+        lat = self.lat[ids]
+        ids = ids[(lat >= lonlat[2]) & (lat <= lonlat[3])]
+
+        return self.storms[np.unique(self.sid[ids])]
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+import pandas as pd
+import RADWave
+
+# Synthetic altimeter datasets: number of records, random seed, time range
+# (days since 1985-01-01), longitude and latitude ranges
+_day0 = (pd.Timestamp("2011-01-25") - pd.Timestamp("1985-01-01")).days
+_presets = {
+    # Ten years of records off the south-east Australian coast
+    "analysis": dict(
+        nb=5000, seed=42, times=(4750.0, 8750.0), lon=(152.0, 155.0), lat=(-36.0, -34.0)
+    ),
+    # Same period on a larger box, the wave height increasing eastward
+    "records": dict(
+        nb=200000,
+        seed=13,
+        times=(4750.0, 8750.0),
+        lon=(150.0, 160.0),
+        lat=(-40.0, -30.0),
+        gradient=True,
+        extent=True,
+    ),
+    # One year of records around the wave buoys of test_5
+    "stations": dict(
+        nb=20000,
+        seed=5,
+        times=(8000.0, 8365.0),
+        lon=(150.0, 156.0),
+        lat=(-37.0, -33.0),
+        days=30,
+    ),
+    # Twelve days of records around cyclone Yasi
+    "cyclone": dict(
+        nb=3000,
+        seed=7,
+        times=(_day0, _day0 + 12.0),
+        lon=(140.0, 180.0),
+        lat=(-22.0, -10.0),
+        cycloneCSV="tests/2010-YASI.csv",
+        days=30,
+    ),
+}
+
+
+def _synthetic(
+    nb,
+    seed,
+    times,
+    lon,
+    lat,
+    gradient=False,
+    extent=False,
+    cycloneCSV=None,
+    days=None,
+):
+
+    # Altimeter records built in memory so that no remote query is needed
+    rng = np.random.default_rng(seed)
+    wclass = RADWave.waveAnalysis(cycloneCSV=cycloneCSV)
+    if extent:
+        wclass.lonmin, wclass.lonmax = lon
+        wclass.latmin, wclass.latmax = lat
+    wclass.time_units = "days since 1985-01-01 00:00:00 UTC"
+    wclass.times = np.sort(rng.uniform(times[0], times[1], nb))
+    wclass.lon = rng.uniform(lon[0], lon[1], nb)
+    wclass.lat = rng.uniform(lat[0], lat[1], nb)
+    if gradient:
+        wclass.wh = 1.0 + 0.1 * (wclass.lon - lon[0]) + rng.normal(0.0, 0.1, nb)
+    else:
+        wclass.wh = rng.gamma(4.0, 0.6, nb) + 0.2
+    wclass.ws = rng.gamma(6.0, 1.4, nb) + 0.5
+    if days is not None:
+        wclass.generateTimeSeries(days=days)
+
+    return wclass
+
+
+@pytest.fixture
+def synthetic_waves():
+    """
+    Builds a waveAnalysis object holding synthetic altimeter records from one
+    of the presets ('analysis', 'records', 'stations' or 'cyclone'), any
+    preset value can be overridden by a keyword argument.
+    """
+
+    def build(preset="analysis", **kwargs):
+        return _synthetic(**dict(_presets[preset], **kwargs))
+
+    return build
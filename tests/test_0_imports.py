@@ -51,3 +51,21 @@ def test_jupyter_available():
     except:
         print("Jupyter not installed")
         print("Jupyter is needed to run the example documentation")
+
+def test_radwave_import_time():
+    import sys
+    from subprocess import run
+    # Import of the analysis path in a fresh interpreter
+    result = run([sys.executable, '-X', 'importtime', '-c', 'import RADWave'],
+                 capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    heavy = ['matplotlib', 'cartopy', 'seaborn', 'shapely', 'pymannkendall',
+             'geopy', 'pkg_resources', 'distutils']
+    loaded = [name for name in heavy if name in times]
+    assert loaded == [], "test failed because RADWave imports " + str(loaded)
+    assert times['RADWave'] < 3e6, (
+        "test failed because RADWave takes "
+        + str(times['RADWave'] / 1e6) + " s to import")
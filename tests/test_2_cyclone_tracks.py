@@ -1,4 +1,6 @@
 import pytest
+import numpy as np
+import pandas as pd
 import RADWave
 
 
@@ -83,3 +85,472 @@ def test_trackCyclone_class_building():
 #         pytest.approx(cyc.cyclone_data["speed"].max(), rel=1e-3) == 12.272
 #     ), "test failed"
 #     assert pytest.approx(cyc.cyclone_data["wH"].max(), rel=1e-3) == 1.735, "test failed"
+
+
+def brute_force_track(cyc, radius, dtmax):
+
+    ts = cyc.timeseries
+    pairs = []
+    for k in range(cyc.cyclone.shape[0]):
+        clon = cyc.cyclone["lon"].iloc[k]
+        clat = cyc.cyclone["lat"].iloc[k]
+        cdate = cyc.cyclone["datetime"].iloc[k].replace(tzinfo=None)
+        d = np.hypot(ts["lon"].to_numpy() - clon, ts["lat"].to_numpy() - clat)
+        dh = (ts["date"] - cdate).dt.total_seconds().to_numpy() / 3600.0
+        for p in np.where((d <= radius) & (np.abs(dh) < dtmax))[0]:
+            pairs.append((k, p, round(dh[p], 3)))
+
+    return pairs
+
+
+def test_close2Track_matches(synthetic_waves):
+
+    cyc = synthetic_waves("cyclone")
+    track = cyc.close2Track(radius=2.0, dtmax=16.0)
+    pairs = brute_force_track(cyc, 2.0, 16.0)
+
+    assert track.shape[0] == len(pairs), "test failed"
+    expected = sorted(
+        (cyc.cyclone["lon"].iloc[k], cyc.timeseries["lon"].iloc[p], h)
+        for k, p, h in pairs
+    )
+    found = sorted(zip(track["clon"], track["lon"], track["hours"]))
+    assert np.allclose(np.array(found), np.array(expected)), "test failed"
+    assert np.all(track["dist"] > 0.0), "test failed"
+    assert not np.allclose(track["energy"], track["speed"]), "test failed"
+
+
+def test_spacetime_index_candidates():
+
+    # Ten years of altimeter records around a short cyclone track
+    rng = np.random.default_rng(11)
+    nb = 200000
+    lon = rng.uniform(140.0, 180.0, nb)
+    lat = rng.uniform(-22.0, -10.0, nb)
+    date = np.datetime64("2005-01-01") + rng.integers(
+        0, 10 * 365 * 24 * 3600, nb
+    ).astype("timedelta64[s]")
+    index = RADWave.spaceTimeIndex(lon, lat, date)
+
+    cyc = RADWave.waveAnalysis(cycloneCSV="tests/2010-YASI.csv")
+    cdate = cyc.cyclone["datetime"].dt.tz_localize(None).to_numpy()
+    cid, aid, dhours = index.query(
+        cyc.cyclone["lon"], cyc.cyclone["lat"], cdate, radius=2.0, dtmax=12.0
+    )
+
+    dist = np.hypot(
+        lon[aid] - cyc.cyclone["lon"].to_numpy()[cid],
+        lat[aid] - cyc.cyclone["lat"].to_numpy()[cid],
+    )
+    assert np.all(dist <= 2.0) and np.all(np.abs(dhours) < 12.0), "test failed"
+    assert index.candidates <= 5 * max(len(aid), 1), "test failed"
+
+    # Positions outside of the recorded period
+    cid, aid, dhours = index.query(
+        cyc.cyclone["lon"], cyc.cyclone["lat"], cdate + np.timedelta64(3650, "D")
+    )
+    assert len(cid) == len(aid) == len(dhours) == 0, "test failed"
+
+
+def test_close2Track_radius_km_dateline(synthetic_waves):
+
+    # Altimeter records on both sides of the 180 degree meridian
+    cyc = synthetic_waves("cyclone", nb=4000)
+    cyc.lon = np.where(cyc.lon > 160.0, cyc.lon + 20.0, cyc.lon)
+    cyc.lon = np.where(cyc.lon > 180.0, cyc.lon - 360.0, cyc.lon)
+    cyc.generateTimeSeries(days=30)
+    track = cyc.close2Track(dtmax=12.0, radius_km=250.0)
+
+    ts = cyc.timeseries
+    count = 0
+    east = 0
+    for k in range(cyc.cyclone.shape[0]):
+        d = RADWave.geodesy.haversine(
+            ts["lon"].to_numpy(),
+            ts["lat"].to_numpy(),
+            cyc.cyclone["lon"].iloc[k],
+            cyc.cyclone["lat"].iloc[k],
+        )
+        cdate = cyc.cyclone["datetime"].iloc[k].replace(tzinfo=None)
+        dh = (ts["date"] - cdate).dt.total_seconds().to_numpy() / 3600.0
+        found = (d <= 250.0) & (np.abs(dh) < 12.0)
+        count += found.sum()
+        east += (found & (ts["lon"].to_numpy() < 0.0)).sum()
+
+    assert track.shape[0] == count, "test failed"
+    assert east > 0 and (track["lon"] < 0.0).sum() == east, "test failed"
+    assert np.all(track["dist"] < 1.01 * 250.0), "test failed"
+
+
+def test_close2Track_cached_index(tmp_path, synthetic_waves):
+
+    cyc = synthetic_waves("cyclone")
+    track1 = cyc.close2Track(radius=2.0, dtmax=16.0)
+    index = cyc.spatialIndex()
+    ntrees = len(index._trees["deg"])
+    track2 = cyc.close2Track(radius=1.0, dtmax=8.0)
+    cyc.close2Track(radius=2.0, dtmax=16.0)
+
+    assert cyc.spatialIndex() is index, "test failed"
+    assert len(index._trees) == 1, "test failed"
+    assert len(index._trees["deg"]) == ntrees, "test failed"
+    assert track2.shape[0] < track1.shape[0], "test failed"
+
+    # Sweeping radius and dtmax does not multiply the trees
+    for radius, dtmax in [(0.5, 24.0), (3.0, 2.0), (1.5, 11.0)]:
+        track = cyc.close2Track(radius=radius, dtmax=dtmax)
+        assert np.all(np.abs(track["hours"]) <= dtmax), "test failed"
+    assert len(index._trees) == 1, "test failed"
+    assert len(index._trees["deg"]) <= len(index._edges) - 1, "test failed"
+
+    cyc.generateTimeSeries(days=30)
+    assert cyc.spatialIndex() is not index, "test failed"
+
+    # Index saved next to the processed data and reused by a new session
+    cyc.saveCSV = str(tmp_path / "altimeterData.csv")
+    cyc.close2Track(radius_km=200.0, dtmax=12.0, persist=True)
+    cyc2 = synthetic_waves("cyclone")
+    cyc2.saveCSV = cyc.saveCSV
+    assert len(cyc2.spatialIndex(persist=True)._trees) == 1, "test failed"
+    track3 = cyc2.close2Track(radius_km=200.0, dtmax=12.0, persist=True)
+    assert track3.shape[0] == cyc.cyclone_data.shape[0], "test failed"
+
+    cyc3 = synthetic_waves("cyclone", seed=8)
+    cyc3.saveCSV = cyc.saveCSV
+    assert len(cyc3.spatialIndex(persist=True)._trees) == 0, "test failed"
+
+
+def write_catalog(path, nstorms=3):
+
+    # Catalog made of shifted copies of cyclone Yasi track
+    yasi = pd.read_csv("tests/2010-YASI.csv")
+    storms = []
+    for k in range(nstorms):
+        storm = yasi.copy()
+        storm["sid"] = "STORM" + str(k)
+        storm["lon"] = storm["lon"] - 6.0 * k
+        storm["datetime"] = (
+            pd.to_datetime(storm["datetime"]) + pd.Timedelta(hours=18 * k)
+        ).dt.strftime("%Y-%m-%d %H:%M:%S")
+        storms.append(storm)
+    catalog = pd.concat(storms[::-1])
+    catalog.to_csv(path, index=False)
+
+    return storms
+
+
+def test_match_catalog(tmp_path, synthetic_waves):
+
+    cyc = synthetic_waves("cyclone")
+    storms = write_catalog(str(tmp_path / "catalog.csv"))
+    catalog = cyc.readCycloneCatalog(str(tmp_path / "catalog.csv"))
+    catdata = cyc.matchCatalog(radius_km=200.0, dtmax=12.0, nprocs=2)
+
+    assert catalog.offsets[-1] == 3 * storms[0].shape[0], "test failed"
+    assert list(catdata.columns[:2]) == ["sid", "period"], "test failed"
+    for storm in storms:
+        cyc.cyclone = storm.assign(datetime=pd.to_datetime(storm["datetime"]))
+        track = cyc.close2Track(radius_km=200.0, dtmax=12.0)
+        match = catdata[catdata["sid"] == storm["sid"].iloc[0]]
+        assert match.shape[0] == track.shape[0], "test failed"
+        assert np.allclose(match["wH"], track["wH"]), "test failed"
+
+
+def test_track_catalog(tmp_path):
+
+    storms = write_catalog(str(tmp_path / "catalog.csv"), nstorms=4)
+    cyc = RADWave.waveAnalysis()
+    catalog = cyc.readCycloneCatalog(str(tmp_path / "catalog.csv"))
+
+    assert len(catalog) == 4, "test failed"
+    assert list(catalog.storms) == [
+        "STORM0",
+        "STORM1",
+        "STORM2",
+        "STORM3",
+    ], "test failed"
+    assert list(np.diff(catalog.offsets)) == [storms[0].shape[0]] * 4, "test failed"
+    assert np.allclose(
+        catalog.pressure[: storms[0].shape[0]], storms[0]["pressure"]
+    ), "test failed"
+
+    assert len(catalog.byName("yasi")) == 4, "test failed"
+    assert len(catalog.byName("ZELIA")) == 0, "test failed"
+    assert len(catalog.byYear(2011)) == 4, "test failed"
+    assert len(catalog.byYear(2012)) == 0, "test failed"
+    assert list(catalog.byTime("2011-02-05 06:00")) == ["STORM3"], "test failed"
+    lonmax = storms[0]["lon"].max()
+    assert list(catalog.byBox([lonmax - 1.0, lonmax + 1.0, -90, 90])) == [
+        "STORM0"
+    ], "test failed"
+
+    # Binary catalog
+    catalog.save(str(tmp_path / "catalog.npz"))
+    cyc2 = RADWave.waveAnalysis()
+    catalog2 = cyc2.readCycloneCatalog(str(tmp_path / "catalog.npz"))
+    assert catalog2.frame().equals(catalog.frame()), "test failed"
+
+    track = cyc2.selectStorm("STORM2")
+    assert np.allclose(track["lon"], storms[2]["lon"]), "test failed"
+    assert (
+        track["datetime"].to_numpy() == pd.to_datetime(storms[2]["datetime"]).to_numpy()
+    ).all(), "test failed"
+
+
+def test_stream_collocation(synthetic_waves):
+
+    cyc = synthetic_waves("cyclone")
+    track = cyc.close2Track(radius=2.0, dtmax=16.0)
+
+    # Track positions and altimeter observations received every 6 hours
+    ts = cyc.timeseries.assign(ws=cyc.ws)
+    cdate = cyc.cyclone["datetime"].dt.tz_localize(None)
+    stream = cyc.streamTrack(radius=2.0, dtmax=16.0)
+    matches = []
+    window = 0
+    steps = pd.date_range("2011-01-25", "2011-02-07", freq="6H")
+    for start, end in zip(steps[:-1], steps[1:]):
+        alti = ts[(ts["date"] >= start) & (ts["date"] < end)]
+        matches.append(
+            stream.addAltimeter(
+                alti["lon"], alti["lat"], alti["date"], wh=alti["wh"], ws=alti["ws"]
+            )
+        )
+        fix = cyc.cyclone[(cdate >= start) & (cdate < end)]
+        matches.append(stream.addTrack(fix["lon"], fix["lat"], fix["datetime"]))
+        if start > cdate.iloc[0] and end < cdate.iloc[-1]:
+            window = max(window, stream.altimeterSize)
+    matches = pd.concat(matches)
+
+    assert matches.shape[0] == track.shape[0], "test failed"
+    cols = ["clon", "lon", "hours", "wH", "power", "dist"]
+    expected = np.array(sorted(map(tuple, track[cols].to_numpy())))
+    found = np.array(sorted(map(tuple, matches[cols].to_numpy())))
+    assert np.allclose(found, expected), "test failed"
+    assert 0 < window < ts.shape[0] / 10, "test failed"
+
+
+def test_stream_collocation_bounded(synthetic_waves):
+
+    cyc = synthetic_waves("cyclone")
+    ts = cyc.timeseries.assign(ws=cyc.ws)
+
+    # Altimeter observations received long before the first track position
+    stream = cyc.streamTrack(radius=2.0, dtmax=6.0, latency=12.0)
+    size = 0
+    steps = pd.date_range("2011-01-01", "2011-01-27", freq="6H")
+    for start, end in zip(steps[:-1], steps[1:]):
+        alti = ts[(ts["date"] >= start) & (ts["date"] < end)]
+        stream.addAltimeter(
+            alti["lon"], alti["lat"], alti["date"], wh=alti["wh"], ws=alti["ws"]
+        )
+        size = max(size, stream.altimeterSize)
+    window = ts[
+        (ts["date"] > alti["date"].max() - pd.Timedelta(hours=18.0))
+        & (ts["date"] < end)
+    ]
+    assert stream.altimeterSize == window.shape[0], "test failed"
+    assert 0 < size < ts.shape[0] / 10, "test failed"
+
+    # Track positions received after the last altimeter observation
+    fix = cyc.cyclone
+    for k in range(fix.shape[0]):
+        stream.addTrack(
+            fix["lon"][k : k + 1], fix["lat"][k : k + 1], fix["datetime"][k : k + 1]
+        )
+    dates = fix["datetime"].dt.tz_convert(None)
+    recent = dates > dates.max() - pd.Timedelta(hours=18.0)
+    assert stream.trackSize == recent.sum(), "test failed"
+
+
+def test_close2Track_interpolate(synthetic_waves):
+
+    cyc = synthetic_waves("cyclone", nb=6000)
+    track = cyc.close2Track(radius_km=100.0, interpolate=True)
+    candidates = cyc.spatialIndex().candidates
+
+    # Storm centre interpolated on the unit sphere at each altimeter time
+    ts = cyc.timeseries
+    cdate = cyc.cyclone["datetime"].dt.tz_localize(None).to_numpy()
+    xyz = RADWave.spatialindex.unitSphere(cyc.cyclone["lon"], cyc.cyclone["lat"])
+    adate = ts["date"].to_numpy()
+    seg = np.searchsorted(cdate, adate, side="right") - 1
+    ok = (seg >= 0) & (seg < len(cdate) - 1)
+    seg = seg[ok]
+    frac = (adate[ok] - cdate[seg]) / (cdate[seg + 1] - cdate[seg])
+    omega = np.arccos(np.clip(np.sum(xyz[seg] * xyz[seg + 1], axis=1), -1.0, 1.0))
+    centre = (
+        np.sin((1.0 - frac) * omega)[:, None] * xyz[seg]
+        + np.sin(frac * omega)[:, None] * xyz[seg + 1]
+    ) / np.sin(omega)[:, None]
+    axyz = RADWave.spatialindex.unitSphere(
+        ts["lon"].to_numpy()[ok], ts["lat"].to_numpy()[ok]
+    )
+    angle = np.arccos(np.clip(np.sum(centre * axyz, axis=1), -1.0, 1.0))
+    found = angle * RADWave.geodesy.EARTH_RADIUS <= 100.0
+
+    assert found.sum() > 0, "test failed"
+    assert track.shape[0] == found.sum(), "test failed"
+    assert np.allclose(
+        np.sort(track["lon"]), np.sort(ts["lon"].to_numpy()[ok][found])
+    ), "test failed"
+    assert np.all(np.abs(track["hours"]) <= 3.0), "test failed"
+    assert np.all((track["bearing"] >= 0.0) & (track["bearing"] < 360.0)), "test failed"
+    assert track["date"].dt.tz is not None, "test failed"
+
+    # Much fewer matches than with the listed positions and a 6 hours window
+    fixed = cyc.close2Track(radius_km=100.0, dtmax=6.0)
+    assert fixed.shape[0] > track.shape[0], "test failed"
+
+    # Fewer candidates than the default search around the listed positions
+    cyc.close2Track(radius=2.0, dtmax=6.0)
+    assert candidates < cyc.spatialIndex().candidates, "test failed"
+
+
+def test_close2Track_timezone(synthetic_waves):
+
+    # Same track expressed in UTC and in Brisbane time
+    cyc = synthetic_waves("cyclone", nb=6000)
+    utc = cyc.close2Track(radius_km=150.0, dtmax=6.0)
+    iutc = cyc.close2Track(radius_km=100.0, interpolate=True)
+    cyc.cyclone["datetime"] = cyc.cyclone["datetime"].dt.tz_convert(
+        "Australia/Brisbane"
+    )
+    local = cyc.close2Track(radius_km=150.0, dtmax=6.0)
+    ilocal = cyc.close2Track(radius_km=100.0, interpolate=True)
+
+    assert utc.shape[0] > 0 and local.shape[0] == utc.shape[0], "test failed"
+    cols = ["lon", "lat", "clon", "hours", "wH"]
+    assert np.allclose(local[cols], utc[cols]), "test failed"
+    assert (local["date"] == utc["date"]).all(), "test failed"
+    assert str(local["date"].dt.tz) == "Australia/Brisbane", "test failed"
+
+    assert ilocal.shape[0] > 0 and ilocal.shape[0] == iutc.shape[0], "test failed"
+    assert np.allclose(ilocal[cols], iutc[cols]), "test failed"
+    assert (ilocal["date"] == iutc["date"]).all(), "test failed"
+
+
+def test_storm_composite(tmp_path, synthetic_waves):
+
+    cyc = synthetic_waves("cyclone", nb=6000)
+    track = cyc.close2Track(radius_km=400.0, dtmax=12.0)
+    comp = cyc.stormComposite(rmax=300.0, dr=100.0, nsectors=4)
+
+    # Reference binning with pandas
+    azimuth = RADWave.geodesy.bearing(
+        track["clon"], track["clat"], track["lon"], track["lat"]
+    )
+    ref = track.assign(ir=(track["dist"] // 100.0), isec=(azimuth // 90.0))
+    ref = ref[ref["ir"] < 3].groupby(["ir", "isec"])["wH"]
+    assert comp["count"].shape == (3, 4), "test failed"
+    assert comp["count"].sum() == (track["dist"] < 300.0).sum(), "test failed"
+    for (ir, isec), values in ref:
+        assert comp["count"][int(ir), int(isec)] == len(values), "test failed"
+        assert np.isclose(
+            comp["mean"][int(ir), int(isec)], values.mean()
+        ), "test failed"
+        assert np.isclose(
+            comp["std"][int(ir), int(isec)], values.std(), equal_nan=True
+        ), "test failed"
+
+    # Composite of each storm of a catalog
+    write_catalog(str(tmp_path / "catalog.csv"))
+    cyc.readCycloneCatalog(str(tmp_path / "catalog.csv"))
+    catdata = cyc.matchCatalog(radius_km=400.0, dtmax=12.0)
+    comp = cyc.stormComposite(catdata, rmax=400.0, dr=100.0, nsectors=8, by="sid")
+    assert comp["count"].shape == (3, 4, 8), "test failed"
+    assert list(comp["storms"]) == ["STORM0", "STORM1", "STORM2"], "test failed"
+    counts = catdata[catdata["dist"] < 400.0].groupby("sid").size().to_numpy()
+    assert np.array_equal(comp["count"].sum(axis=(1, 2)), counts), "test failed"
+
+
+def test_plotCycloneAltiPoint_batch(tmp_path, synthetic_waves):
+
+    import os
+    import matplotlib.pyplot as plt
+
+    cyc = synthetic_waves("cyclone")
+    cyc.lonmin, cyc.lonmax, cyc.latmin, cyc.latmax = 140.0, 180.0, -22.0, -10.0
+    cyc.close2Track(radius=1.0, dtmax=3.0)
+    nframes = cyc.cyclone_data[["clat", "clon", "date"]].drop_duplicates().shape[0]
+
+    paths = cyc.plotCycloneAltiPoint(
+        resolution=None, outdir=str(tmp_path / "frames"), nprocs=2, dpi=40
+    )
+    assert len(paths) == nframes > 0, "test failed"
+    assert all(os.path.getsize(path) > 0 for path in paths), "test failed"
+    assert paths == sorted(paths), "test failed"
+    assert len(plt.get_fignums()) == 0, "test failed"
+
+
+def test_animate_cyclone(tmp_path, synthetic_waves):
+
+    import matplotlib.pyplot as plt
+    from PIL import Image
+
+    cyc = synthetic_waves("cyclone")
+    cyc.lonmin, cyc.lonmax, cyc.latmin, cyc.latmax = 140.0, 180.0, -22.0, -10.0
+    cyc.close2Track(radius=1.0, dtmax=3.0)
+    nframes = cyc.cyclone_data[["clat", "clon", "date"]].drop_duplicates().shape[0]
+
+    path = cyc.animateCyclone(str(tmp_path / "cyclone.gif"), resolution=None, dpi=30)
+    with Image.open(path) as gif:
+        assert gif.n_frames == nframes > 1, "test failed"
+    assert len(plt.get_fignums()) == 0, "test failed"
+
+    # Only the moving artists change between frames
+    frames, _ = cyc._cycloneFrames(None, None, 100, None, True)
+    fig = plt.figure()
+    anim = RADWave.render.cycloneAltiAnimation(fig, frames)
+    ax = fig.axes[0]
+    nartists = len(ax.get_children())
+    for k in [0, nframes - 1]:
+        title, centre, alti, circle = anim._func(k)
+        assert np.allclose(centre.get_offsets()[0], frames[k]["centre"]), "test failed"
+        assert len(alti.get_offsets()) == len(frames[k]["alon"]), "test failed"
+        assert len(ax.get_children()) == nartists, "test failed"
+    plt.close("all")
+
+    with pytest.raises(ValueError):
+        cyc.animateCyclone(str(tmp_path / "cyclone.avi"), resolution=None)
+
+
+def test_basemap_cache():
+
+    import cartopy.feature as cfeature
+    from matplotlib.colors import to_rgba
+
+    RADWave.render.clearBasemaps()
+    image = RADWave.render.basemap([140.0, 180.0, -22.0, -10.0], None, width=400)
+    assert image.shape == (120, 400, 4), "test failed"
+    water = np.round(255 * np.array(to_rgba(cfeature.COLORS["water"])))
+    assert np.allclose(image[60, 200], water, atol=1), "test failed"
+
+    again = RADWave.render.basemap([140, 180, -22, -10], None, width=400)
+    assert again is image, "test failed"
+    other = RADWave.render.basemap([140.0, 170.0, -22.0, -10.0], None, width=400)
+    assert other is not image and other.shape == (160, 400, 4), "test failed"
+    assert len(RADWave.render._basemaps) == 2, "test failed"
+    RADWave.render.clearBasemaps()
+    assert len(RADWave.render._basemaps) == 0, "test failed"
+
+
+def test_track_collections(synthetic_waves):
+
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    cyc = synthetic_waves("cyclone")
+    cyc.lonmin, cyc.lonmax, cyc.latmin, cyc.latmax = 140.0, 180.0, -22.0, -10.0
+    nb = cyc.cyclone.shape[0]
+
+    cyc.plotCycloneTracks(resolution=None)
+    lines = [c for c in plt.gcf().axes[0].collections if isinstance(c, LineCollection)]
+    assert len(lines) == 1 and len(lines[0].get_segments()) == nb - 1, "test failed"
+    assert len(plt.gcf().axes[0].lines) == 0, "test failed"
+    plt.close("all")
+
+    cyc.visualiseData(resolution=None)
+    lines = [c for c in plt.gcf().axes[0].collections if isinstance(c, LineCollection)]
+    assert len(lines) == 1 and len(lines[0].get_segments()) == nb - 1, "test failed"
+    plt.close("all")
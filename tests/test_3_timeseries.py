@@ -0,0 +1,331 @@
+import pytest
+import numpy as np
+import pandas as pd
+import RADWave
+
+
+def test_timeseries_slice(synthetic_waves):
+
+    wclass = synthetic_waves("analysis")
+    ts = wclass.generateTimeSeries(days=30)
+
+    assert ts.index.is_monotonic_increasing, "test failed"
+
+    tmpdf = wclass.slice("1999-03-01", "2001-07-15")
+    mask = (ts["date"] >= "1999-03-01") & (ts["date"] < "2001-07-15")
+    assert tmpdf.shape[0] == mask.sum(), "test failed"
+    assert np.array_equal(tmpdf["wh"].to_numpy(), ts["wh"][mask].to_numpy())
+    assert wclass.slice().shape[0] == ts.shape[0], "test failed"
+    assert wclass.slice("2030-01-01").shape[0] == 0, "test failed"
+
+
+def test_seasonal_characteristics_time_and_box(synthetic_waves):
+
+    wclass = synthetic_waves("analysis")
+    ts = wclass.generateTimeSeries(days=30)
+    wh_season = wclass.computeSeasonalCharacteristics(
+        series="wh", time=[1999, 2002], lonlat=[153.0, 154.0, -35.5, -34.5], plot=False
+    )
+
+    tdf = ts[
+        (ts.year >= 1999)
+        & (ts.year <= 2002)
+        & (ts.lon >= 153.0)
+        & (ts.lon <= 154.0)
+        & (ts.lat >= -35.5)
+        & (ts.lat <= -34.5)
+    ]
+    expected = tdf.groupby(["year", "month"])["wh"].mean()
+
+    assert list(wh_season.index) == [1999, 2000, 2001, 2002], "test failed"
+    assert (
+        pytest.approx(wh_season.loc[2000, "March"], rel=1e-9) == expected[(2000, 3)]
+    ), "test failed"
+
+
+def test_seasonal_region_masks(synthetic_waves):
+
+    wclass = synthetic_waves("analysis")
+    ts = wclass.generateTimeSeries(days=30)
+    boxes = [[152.0 + 0.5 * k, 153.0 + 0.5 * k, -36.0, -35.0] for k in range(4)]
+
+    for box in boxes + boxes:
+        season = wclass.computeSeasonalCharacteristics(lonlat=box, plot=False)
+        tdf = ts[
+            (ts.lon >= box[0])
+            & (ts.lon <= box[1])
+            & (ts.lat >= box[2])
+            & (ts.lat <= box[3])
+        ]
+        expected = tdf.groupby("year")["wh"].count()
+        assert season.index.equals(expected.index), "test failed"
+    assert len(wclass._masks) == 4, "test failed"
+
+    # A new time series discards the masks
+    wclass.generateTimeSeries(days=15)
+    assert len(wclass._masks) == 0, "test failed"
+
+
+def test_seasonal_characteristics_all_series(synthetic_waves):
+
+    wclass = synthetic_waves("analysis")
+    ts = wclass.generateTimeSeries(days=30)
+    box = [153.0, 154.0, -35.5, -34.5]
+
+    stats = wclass.computeSeasonalCharacteristics(
+        series="all", time=[1999, 2002], lonlat=box, plot=False
+    )
+    assert list(stats.columns) == ["variable", "year", "month", "mean", "std", "count"]
+    assert list(stats.variable.unique()) == ["wh", "period", "power", "energy", "speed"]
+
+    tdf = ts[
+        (ts.year >= 1999)
+        & (ts.year <= 2002)
+        & (ts.lon >= box[0])
+        & (ts.lon <= box[1])
+        & (ts.lat >= box[2])
+        & (ts.lat <= box[3])
+    ]
+    expected = tdf.groupby(["year", "month"])["power"].agg(["mean", "std", "count"])
+    power = stats[stats.variable == "power"].set_index(["year", "month"])
+    assert np.allclose(power["mean"], expected["mean"], rtol=1e-9), "test failed"
+    assert np.allclose(power["std"], expected["std"], rtol=1e-6, equal_nan=True)
+    assert np.array_equal(power["count"], expected["count"]), "test failed"
+
+    # Same monthly means as the single variable analysis
+    period = wclass.computeSeasonalCharacteristics(
+        series="period", time=[1999, 2002], lonlat=box, plot=False
+    )
+    subset = wclass.computeSeasonalCharacteristics(
+        series=["period", "wh"], time=[1999, 2002], lonlat=box, plot=False
+    )
+    means = subset[subset.variable == "period"].pivot(
+        index="year", columns="month", values="mean"
+    )
+    assert np.allclose(means.to_numpy(), period.iloc[:, :12].to_numpy(), equal_nan=True)
+    assert len(subset) == 2 * len(means.stack()), "test failed"
+
+
+def test_seasonal_characteristics_empty_box(tmp_path, synthetic_waves):
+
+    wclass = synthetic_waves("analysis")
+    write_processed_csv(wclass, str(tmp_path / "altimeterData.csv"))
+    wclass.generateTimeSeries(days=30)
+    columns = ["variable", "year", "month", "mean", "std", "count"]
+
+    # No records inside the box
+    season = wclass.computeSeasonalCharacteristics(
+        series="wh", lonlat=[10.0, 11.0, 0.0, 1.0], plot=False
+    )
+    assert season.shape[0] == 0, "test failed"
+    assert len(season.columns) == 13 and season.columns[0] == "January", "test failed"
+    assert season.columns[-1] == "mean", "test failed"
+    stats = wclass.computeSeasonalCharacteristics(
+        series="all", lonlat=[10.0, 11.0, 0.0, 1.0], plot=False
+    )
+    assert stats.shape[0] == 0 and list(stats.columns) == columns, "test failed"
+
+    # No blocks of the store in the selected years
+    wclass.generateTimeSeries(days=30, chunksize=700)
+    stats = wclass.computeSeasonalCharacteristics(
+        series="all", time=[2030, 2031], plot=False
+    )
+    assert stats.shape[0] == 0 and list(stats.columns) == columns, "test failed"
+    season = wclass.computeSeasonalCharacteristics(
+        series="wh", time=[2030, 2031], plot=False
+    )
+    assert season.shape[0] == 0 and season.columns[-1] == "mean", "test failed"
+
+
+def test_gridded_climatology(tmp_path, synthetic_waves):
+
+    wclass = synthetic_waves("analysis", nb=20000)
+    write_processed_csv(wclass, str(tmp_path / "altimeterData.csv"))
+    ts = wclass.generateTimeSeries(days=30)
+    box = [152.0, 155.0, -36.0, -34.0]
+
+    clim = wclass.computeClimatology(res=0.5, lonlat=box)
+    assert clim is wclass.climatology, "test failed"
+    assert clim["wh_mean"].shape == (12, 4, 6), "test failed"
+    assert np.allclose(clim["lon"], 152.25 + 0.5 * np.arange(6)), "test failed"
+    assert int(clim["power_count"].sum()) == len(ts), "test failed"
+
+    # Same values as a grouped aggregation of the cell records
+    cell = ts[(ts.lon >= 153.0) & (ts.lon < 153.5) & (ts.lat >= -35.0)]
+    cell = cell[cell.lat < -34.5]
+    expected = cell.groupby("month")["period"].agg(["mean", "std", "count"])
+    months = expected.index.to_numpy() - 1
+    assert np.allclose(clim["period_mean"][months, 2, 2], expected["mean"])
+    assert np.allclose(clim["period_std"][months, 2, 2], expected["std"], rtol=1e-6)
+    assert np.array_equal(clim["period_count"][months, 2, 2], expected["count"])
+
+    yearly = wclass.computeClimatology(
+        res=1.0, series=["wh"], lonlat=box, time=[2000, 2003], yearly=True
+    )
+    assert list(yearly["year"]) == [2000, 2001, 2002, 2003], "test failed"
+    assert yearly["wh_mean"].shape == (4, 12, 2, 3), "test failed"
+    expected = ts[(ts.year >= 2000) & (ts.year <= 2003)].groupby(["year", "month"])
+    assert np.array_equal(
+        yearly["wh_count"].sum(axis=(2, 3)).ravel(), expected["wh"].count()
+    ), "test failed"
+
+    # Same climatology from the on-disk store
+    wclass.generateTimeSeries(days=30, chunksize=3000)
+    stored = wclass.computeClimatology(res=0.5, lonlat=box)
+    assert np.allclose(stored["wh_mean"], clim["wh_mean"], equal_nan=True)
+    assert np.array_equal(stored["wh_count"], clim["wh_count"]), "test failed"
+
+
+def test_timeseries_float32_accuracy(synthetic_waves):
+
+    wclass = synthetic_waves("analysis")
+    ts64 = wclass.generateTimeSeries(days=30).copy()
+    ts32 = wclass.generateTimeSeries(days=30, dtype="float32")
+
+    assert ts32["wh"].dtype == np.float32, "test failed"
+    assert ts32["year"].dtype == np.int16, "test failed"
+    assert ts32["month"].dtype == np.int8, "test failed"
+    for var in ["wh", "period", "power", "energy", "speed", "wh_rolling"]:
+        assert np.allclose(ts32[var].to_numpy(), ts64[var].to_numpy(), rtol=1.0e-5), (
+            "test failed for " + var
+        )
+    assert np.array_equal(ts32["year"].to_numpy(), ts64["year"].to_numpy())
+
+
+def test_timeseries_float32_memory(synthetic_waves):
+
+    wclass = synthetic_waves("analysis", nb=20000)
+    mem64 = wclass.generateTimeSeries(days=30).memory_usage(deep=True).sum()
+    mem32 = (
+        wclass.generateTimeSeries(days=30, dtype="float32")
+        .memory_usage(deep=True)
+        .sum()
+    )
+    print("\t\t Time series memory float64 {} / float32 {}".format(mem64, mem32))
+
+    assert mem32 < 0.55 * mem64, "test failed"
+
+
+def write_processed_csv(wclass, saveCSV):
+
+    pd.DataFrame(
+        {
+            "lat": wclass.lat,
+            "lon": wclass.lon,
+            "wh": wclass.wh,
+            "time": wclass.times,
+            "ws": wclass.ws,
+        }
+    ).to_csv(saveCSV, sep=" ", index=False)
+    wclass.saveCSV = saveCSV
+
+
+def test_read_altimeter_float32(tmp_path, synthetic_waves):
+
+    wclass = synthetic_waves("analysis", nb=100)
+    saveCSV = str(tmp_path / "altimeterData.csv")
+    write_processed_csv(wclass, saveCSV)
+
+    wclass._storeAltimeterData(
+        pd.read_csv(saveCSV, sep=r"\s+").sort_values(by=["time"]), dtype="float32"
+    )
+
+    assert wclass.wh.dtype == np.float32, "test failed"
+    assert wclass.times.dtype == np.float64, "test failed"
+    assert wclass.generateTimeSeries()["wh"].dtype == np.float32, "test failed"
+
+
+def test_timeseries_chunks(tmp_path, synthetic_waves):
+
+    wclass = synthetic_waves("analysis")
+    write_processed_csv(wclass, str(tmp_path / "altimeterData.csv"))
+    ts = wclass.generateTimeSeries(days=30).copy()
+    season = wclass.computeSeasonalCharacteristics(
+        series="period",
+        time=[1999, 2003],
+        lonlat=[153.0, 154.5, -36.0, -34.5],
+        plot=False,
+    )
+
+    store = wclass.generateTimeSeries(days=30, chunksize=700)
+    assert wclass.timeseries is None, "test failed"
+    assert len(store) == ts.shape[0], "test failed"
+
+    tsc = wclass.slice()
+    assert list(tsc.columns) == list(ts.columns), "test failed"
+    for var in ["wh", "power", "wh_rolling", "period_rolling", "energy_rolling"]:
+        assert np.allclose(tsc[var].to_numpy(), ts[var].to_numpy()), "test failed"
+
+    wclass.readTimeSeriesStore(str(tmp_path / "altimeterData_timeseries"))
+    tmpdf = wclass.slice("2001-01-01", "2002-01-01", columns=["wh_rolling"])
+    assert np.allclose(
+        tmpdf["wh_rolling"].to_numpy(),
+        ts.loc["2001-01-01":"2001-12-31", "wh_rolling"].to_numpy(),
+    ), "test failed"
+
+    seasonc = wclass.computeSeasonalCharacteristics(
+        series="period",
+        time=[1999, 2003],
+        lonlat=[153.0, 154.5, -36.0, -34.5],
+        plot=False,
+    )
+    assert np.allclose(seasonc.to_numpy(), season.to_numpy(), equal_nan=True)
+
+
+def test_timeseries_chunks_unsorted(tmp_path, synthetic_waves):
+
+    wclass = synthetic_waves("analysis", nb=200)
+    wclass.times = wclass.times[::-1]
+    write_processed_csv(wclass, str(tmp_path / "altimeterData.csv"))
+
+    with pytest.raises(ValueError):
+        wclass.generateTimeSeries(days=30, chunksize=50)
+
+
+def test_timeseries_chunks_requirements(tmp_path, synthetic_waves):
+
+    # Chunks are read from the processed altimeter data file
+    wclass = synthetic_waves("analysis", nb=200)
+    with pytest.raises(ValueError, match="processed"):
+        wclass.generateTimeSeries(days=30, chunksize=50)
+
+    # The spatiotemporal index needs the time series in memory
+    write_processed_csv(wclass, str(tmp_path / "altimeterData.csv"))
+    wclass.generateTimeSeries(days=30, chunksize=50)
+    with pytest.raises(ValueError, match="on-disk store"):
+        wclass.spatialIndex()
+
+
+def test_timeseries_chunks_plot(tmp_path, monkeypatch, synthetic_waves):
+
+    import matplotlib.pyplot as plt
+
+    wclass = synthetic_waves("analysis", nb=20000)
+    write_processed_csv(wclass, str(tmp_path / "altimeterData.csv"))
+    wclass.generateTimeSeries(days=30)
+    box = [153.0, 154.0, -35.5, -34.5]
+    _, _, stats = wclass.plotTimeSeries(series="P", stats=True, show=False)
+    _, ax, region = wclass.plotTimeSeries(
+        series="P", decimate=None, lonlat=box, stats=True, show=False
+    )
+    rolling = ax.get_lines()[1].get_ydata()
+
+    # Store read by small blocks, each decimated with its share of the points
+    monkeypatch.setattr(RADWave.altiwave, "_blocksize", 3000)
+    wclass.generateTimeSeries(days=30, chunksize=3000)
+    _, ax, sstats = wclass.plotTimeSeries(series="P", npts=1000, stats=True, show=False)
+    assert all(len(line.get_xdata()) <= 1000 for line in ax.get_lines())
+    assert ax.get_lines()[0].get_ydata().max() == pytest.approx(stats["max"])
+    for key in ["max", "mean", "median", "p95"]:
+        assert sstats[key] == pytest.approx(stats[key], rel=1e-9), "test failed"
+
+    # Moving average of the region carried over the blocks
+    _, ax, sregion = wclass.plotTimeSeries(
+        series="P", decimate=None, lonlat=box, stats=True, show=False
+    )
+    assert np.allclose(ax.get_lines()[1].get_ydata(), rolling), "test failed"
+    _, ax = wclass.plotTimeSeries(series="P", npts=500, lonlat=box, show=False)
+    assert all(400 <= len(line.get_xdata()) <= 500 for line in ax.get_lines())
+    for key in ["max", "mean", "median", "p95"]:
+        assert sregion[key] == pytest.approx(region[key], rel=1e-9), "test failed"
+    plt.close("all")
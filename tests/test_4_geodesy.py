@@ -0,0 +1,119 @@
+import os
+import time
+import pytest
+import numpy as np
+import geopy.distance
+import RADWave
+from RADWave import geodesy
+
+
+def random_pairs(nb, seed=3):
+
+    rng = np.random.default_rng(seed)
+    lon1 = rng.uniform(-180.0, 180.0, nb)
+    lat1 = rng.uniform(-89.0, 89.0, nb)
+    # Half of the pairs are short distances as found in cyclone matching
+    lon2 = np.where(
+        np.arange(nb) % 2 == 0,
+        rng.uniform(-180.0, 180.0, nb),
+        lon1 + rng.normal(0, 1, nb),
+    )
+    lat2 = np.where(
+        np.arange(nb) % 2 == 0,
+        rng.uniform(-89.0, 89.0, nb),
+        lat1 + rng.normal(0, 1, nb),
+    )
+
+    return lon1, lat1, lon2, np.clip(lat2, -90.0, 90.0)
+
+
+def geopy_distance(lon1, lat1, lon2, lat2):
+
+    return np.array(
+        [
+            geopy.distance.geodesic((lat1[k], lon1[k]), (lat2[k], lon2[k])).km
+            for k in range(len(lon1))
+        ]
+    )
+
+
+def test_vincenty_accuracy():
+
+    lon1, lat1, lon2, lat2 = random_pairs(2000)
+    ref = geopy_distance(lon1, lat1, lon2, lat2)
+    dist = RADWave.geodesicDistance(lon1, lat1, lon2, lat2)
+
+    assert np.abs(dist - ref).max() < 1.0e-6, "test failed"
+
+
+def test_vincenty_antipodal():
+
+    lon1 = np.array([0.0, 10.0, 20.0])
+    lat1 = np.array([0.0, 0.0, 45.0])
+    lon2 = np.array([179.5, 10.0, -160.0])
+    lat2 = np.array([0.5, 0.0, -45.0])
+    ref = geopy_distance(lon1, lat1, lon2, lat2)
+    dist = RADWave.geodesicDistance(lon1, lat1, lon2, lat2)
+
+    assert np.abs(dist - ref).max() < 1.0e-6, "test failed"
+    assert dist[1] == 0.0, "test failed"
+    assert (
+        pytest.approx(float(geodesy.vincenty(0.0, 0.0, 90.0, 0.0)), rel=1e-6)
+        == 10018.754
+    )
+
+
+def test_haversine_accuracy():
+
+    lon1, lat1, lon2, lat2 = random_pairs(500)
+    ref = geopy_distance(lon1, lat1, lon2, lat2)
+    dist = RADWave.geodesicDistance(lon1, lat1, lon2, lat2, method="haversine")
+
+    assert np.all(np.abs(dist - ref) <= 0.006 * ref + 1.0e-9), "test failed"
+
+
+@pytest.mark.skipif(
+    not os.environ.get("RADWAVE_BENCHMARK"),
+    reason="timing benchmark, set RADWAVE_BENCHMARK=1 to run it",
+)
+def test_geodesic_throughput():
+
+    # Wall-clock comparison, the accuracy is checked by test_vincenty_accuracy
+    lon1, lat1, lon2, lat2 = random_pairs(2000)
+    t0 = time.perf_counter()
+    geopy_distance(lon1, lat1, lon2, lat2)
+    t_geopy = time.perf_counter() - t0
+
+    lon1, lat1, lon2, lat2 = random_pairs(200000)
+    t0 = time.perf_counter()
+    RADWave.geodesicDistance(lon1, lat1, lon2, lat2)
+    t_vincenty = time.perf_counter() - t0
+
+    print(
+        "\t\t geopy {:.0f} pairs/s - vectorised vincenty {:.0f} pairs/s".format(
+            2000 / t_geopy, 200000 / t_vincenty
+        )
+    )
+    assert 200000 / t_vincenty > 10 * 2000 / t_geopy, "test failed"
+
+
+def test_bearing_great_circle():
+
+    assert np.allclose(
+        RADWave.geodesy.bearing(0.0, 0.0, [0.0, 10.0, 0.0], [10.0, 0.0, -10.0]),
+        [0.0, 90.0, 180.0],
+    ), "test failed"
+
+    # Midpoint across the 180 degree meridian
+    lon, lat = RADWave.geodesy.greatCircle(170.0, 0.0, -170.0, 0.0, 0.5)
+    assert np.isclose(lon, 180.0) and np.isclose(lat, 0.0), "test failed"
+
+    # Intermediate points lie on the great circle
+    lon1, lat1, lon2, lat2 = random_pairs(1000)
+    frac = np.random.default_rng(3).uniform(0.0, 1.0, 1000)
+    lon, lat = RADWave.geodesy.greatCircle(lon1, lat1, lon2, lat2, frac)
+    d1 = RADWave.geodesy.haversine(lon1, lat1, lon, lat)
+    d2 = RADWave.geodesy.haversine(lon, lat, lon2, lat2)
+    d = RADWave.geodesy.haversine(lon1, lat1, lon2, lat2)
+    assert np.allclose(d1 + d2, d, atol=1.0e-6), "test failed"
+    assert np.allclose(d1, frac * d, atol=1.0e-6), "test failed"
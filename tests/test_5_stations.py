@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import pandas as pd
+import RADWave
+
+
+def write_stations(path):
+
+    # Hourly buoy records of three stations
+    stations = pd.DataFrame(
+        {
+            "station": ["SYDNEY", "BYRON", "EDEN"],
+            "lon": [151.4, 153.7, 150.2],
+            "lat": [-33.8, -34.6, -37.0],
+        }
+    )
+    dates = pd.date_range("2006-11-25", "2007-12-01", freq="1H")
+    records = pd.concat(
+        [
+            pd.DataFrame(
+                {"station": name, "datetime": dates, "hs": k + np.arange(len(dates))}
+            )
+            for k, name in enumerate(stations["station"])
+        ]
+    )
+    stations.to_csv(str(path / "stations.csv"), index=False)
+    records.to_csv(str(path / "records.csv"), index=False)
+
+    return stations, dates
+
+
+def test_match_stations(tmp_path, synthetic_waves):
+
+    wclass = synthetic_waves("stations")
+    stations, dates = write_stations(tmp_path)
+    wclass.readStations(str(tmp_path / "stations.csv"), str(tmp_path / "records.csv"))
+    data = wclass.matchStations(radius_km=40.0, dtmax=0.25)
+
+    # Brute force collocation of each station
+    ts = wclass.timeseries
+    count = 0
+    for k in range(stations.shape[0]):
+        d = RADWave.geodesy.haversine(
+            ts["lon"].to_numpy(),
+            ts["lat"].to_numpy(),
+            stations["lon"].iloc[k],
+            stations["lat"].iloc[k],
+        )
+        close = ts["date"][d <= 40.0]
+        nearest = close.dt.round("1H")
+        dh = np.abs((close - nearest).dt.total_seconds().to_numpy()) / 3600.0
+        found = data[data["station"] == stations["station"].iloc[k]]
+        assert found.shape[0] == (dh < 0.25).sum(), "test failed"
+        assert np.array_equal(
+            found["sdate"].to_numpy(), np.sort(nearest[dh < 0.25].to_numpy())
+        ), "test failed"
+        hs = k + (found["sdate"] - dates[0]) / pd.Timedelta(hours=1)
+        assert np.allclose(found["hs"], hs), "test failed"
+        count += found.shape[0]
+
+    assert count > 0 and data.shape[0] == count, "test failed"
+    assert np.all(np.abs(data["hours"]) <= 0.25), "test failed"
+    assert np.all(data["dist"] <= 40.5), "test failed"
+    assert list(data.columns[:10]) == [
+        "station",
+        "date",
+        "wH",
+        "lon",
+        "lat",
+        "slon",
+        "slat",
+        "dist",
+        "sdate",
+        "hours",
+    ], "test failed"
+
+    # A single KD-tree over all the records, the time buckets are not used
+    index = wclass.spatialIndex()
+    assert index._spatial is not None and "xyz" not in index._trees, "test failed"
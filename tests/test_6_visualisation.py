@@ -0,0 +1,181 @@
+import pytest
+import numpy as np
+import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from matplotlib.collections import PathCollection
+import RADWave
+
+
+def scatters(ax):
+
+    return [c for c in ax.collections if isinstance(c, PathCollection)]
+
+
+def test_density_grid(synthetic_waves):
+
+    wclass = synthetic_waves("records")
+    extent = [150.0, 160.0, -40.0, -30.0]
+    grid = RADWave.render.densityGrid(wclass.lon, wclass.lat, extent, nx=50)
+    ref, _, _ = np.histogram2d(
+        wclass.lat, wclass.lon, bins=[50, 50], range=[extent[2:], extent[:2]]
+    )
+    assert grid.shape == (50, 50), "test failed"
+    assert np.array_equal(grid.filled(0), ref), "test failed"
+
+    mean = RADWave.render.densityGrid(
+        wclass.lon, wclass.lat, extent, nx=10, values=wclass.wh
+    )
+    assert np.allclose(mean.mean(axis=0), 1.05 + 0.1 * np.arange(10), atol=0.01)
+
+
+def test_visualise_density(synthetic_waves):
+
+    wclass = synthetic_waves("records")
+
+    wclass.visualiseData(resolution=None)
+    ax = plt.gcf().axes[0]
+    assert len(ax.images) == 1 and len(scatters(ax)) == 0, "test failed"
+    plt.close("all")
+
+    wclass.visualiseData(resolution=None, colorby="wh", nx=100)
+    ax = plt.gcf().axes[0]
+    assert ax.images[0].get_array().shape == (100, 100), "test failed"
+    plt.close("all")
+
+    wclass.visualiseData(resolution=None, density=False, markersize=1)
+    ax = plt.gcf().axes[0]
+    assert len(ax.images) == 0 and len(scatters(ax)) == 1, "test failed"
+    plt.close("all")
+
+
+def test_decimate():
+
+    rng = np.random.default_rng(3)
+    x = np.arange(100000)
+    y = rng.normal(0.0, 1.0, len(x))
+    y[[17, 54321, 99998]] = [15.0, -12.0, 20.0]
+    y[1000:1200] = np.nan
+
+    for method in ["minmax", "lttb"]:
+        ids = RADWave.render.decimate(x, y, npts=1000, method=method)
+        assert len(ids) <= 1000, "test failed"
+        assert np.all(np.diff(ids) > 0), "test failed"
+        assert ids[0] == 0 and ids[-1] == len(x) - 1, "test failed"
+        assert {17, 54321, 99998} <= set(ids), "test failed"
+        assert not np.isnan(y[ids]).any(), "test failed"
+
+    ids = RADWave.render.decimate(x[:500], y[:500], npts=1000)
+    assert np.array_equal(ids, np.arange(500)), "test failed"
+
+    with pytest.raises(ValueError):
+        RADWave.render.decimate(x, y, method="other")
+
+
+def test_plot_timeseries_decimated(synthetic_waves):
+
+    wclass = synthetic_waves("records")
+    wclass.generateTimeSeries()
+    wh = wclass.timeseries.wh.to_numpy()
+
+    stats = wclass.plotTimeSeries(npts=2000, stats=True)
+    lines = plt.gcf().axes[0].get_lines()
+    assert all(len(line.get_xdata()) <= 2000 for line in lines), "test failed"
+    assert max(lines[0].get_ydata()) == wh.max(), "test failed"
+    assert np.isclose(stats["max"], wh.max()), "test failed"
+    assert np.isclose(stats["mean"], wh.mean()), "test failed"
+    assert np.isclose(stats["median"], np.median(wh)), "test failed"
+    assert np.isclose(stats["p95"], np.percentile(wh, 95)), "test failed"
+    plt.close("all")
+
+    assert wclass.plotTimeSeries(series="T", decimate="lttb") is None, "test failed"
+    assert len(plt.gcf().axes[0].get_lines()[0].get_xdata()) <= 5000, "test failed"
+    plt.close("all")
+
+    wclass.plotTimeSeries(series="E", decimate=None)
+    assert len(plt.gcf().axes[0].get_lines()[0].get_xdata()) == len(wh)
+    plt.close("all")
+
+    # Records of a region and their own moving average
+    ts = wclass.timeseries
+    box = [150.0, 152.0, -40.0, -38.0]
+    inside = (ts.lon <= 152.0) & (ts.lat <= -38.0)
+    fig, ax, stats = wclass.plotTimeSeries(
+        lonlat=box, decimate=None, stats=True, show=False
+    )
+    raw, average = ax.get_lines()
+    assert len(raw.get_xdata()) == inside.sum(), "test failed"
+    assert np.isclose(stats["mean"], ts.wh[inside].mean()), "test failed"
+    assert np.isclose(stats["max"], ts.wh[inside].max()), "test failed"
+    assert np.all(average.get_ydata() < 1.4), "test failed"
+    plt.close("all")
+
+    # The points are shared over the records of the region
+    fig, ax = wclass.plotTimeSeries(lonlat=box, npts=1000, show=False)
+    for line in ax.get_lines():
+        assert 900 <= len(line.get_xdata()) <= 1000, "test failed"
+    plt.close("all")
+
+
+def test_figures_not_shown(synthetic_waves):
+
+    wclass = synthetic_waves("records", nb=20000)
+    wclass.generateTimeSeries()
+    plt.close("all")
+
+    fig, ax = wclass.visualiseData(resolution=None, show=False)
+    assert ax in fig.axes, "test failed"
+    fig, ax, stats = wclass.plotTimeSeries(series="P", stats=True, show=False)
+    assert len(ax.get_lines()) == 2 and stats["max"] > 0, "test failed"
+    dfseason, figures = wclass.computeSeasonalCharacteristics(show=False)
+    assert len(figures) == 3 and "mean" in dfseason.columns, "test failed"
+    assert wclass.computeSeasonalCharacteristics(plot=False, show=False) is not None
+    plt.close("all")
+
+
+def test_seasonal_saved_before_shown(tmp_path, monkeypatch, synthetic_waves):
+
+    import os
+
+    wclass = synthetic_waves("records", nb=20000)
+    wclass.generateTimeSeries()
+    plt.close("all")
+
+    # Each figure is written before being displayed
+    fsave = str(tmp_path / "season")
+    shown = []
+    monkeypatch.setattr(plt, "show", lambda: shown.append(len(os.listdir(tmp_path))))
+    wclass.computeSeasonalCharacteristics(series="period", fsave=fsave)
+    assert shown == [1, 2, 3], "test failed"
+    plt.close("all")
+
+
+def test_generate_report(tmp_path, synthetic_waves):
+
+    import os
+
+    wclass = synthetic_waves("records", nb=20000)
+    wclass.generateTimeSeries()
+    plt.close("all")
+
+    region = [152.0, 158.0, -38.0, -32.0]
+    paths = wclass.generateReport(
+        region, str(tmp_path), resolution=None, dpi=30, nprocs=2
+    )
+    assert len(paths) == 1 + 5 + 15, "test failed"
+    assert all(os.path.getsize(path) > 0 for path in paths), "test failed"
+    assert os.path.join(str(tmp_path), "seasonal_wh_sd.png") in paths, "test failed"
+    assert len(plt.get_fignums()) == 0, "test failed"
+
+    # The serial rendering leaves the backend and the open figures alone
+    plt.switch_backend("svg")
+    fig = plt.figure()
+    paths = wclass.generateReport(region, str(tmp_path / "serial"), None, 30, 1)
+    assert len(paths) == 21, "test failed"
+    assert plt.get_fignums() == [fig.number], "test failed"
+    assert matplotlib.get_backend() == "svg", "test failed"
+    plt.close("all")
+    plt.switch_backend("agg")